@@ -0,0 +1,92 @@
+"""
+Memory held per chunk by an in-memory vector index
+
+Builds the same chunks as slotted CodeChunk objects and as the plain
+dataclass they replaced, and reports the bytes allocated per chunk by
+each. Chunk content is shared between both runs, so the figures are the
+per-object overhead the chunk representation adds. Run from the
+repository root:
+
+    PYTHONPATH=src python benchmarks/chunk_memory.py [--chunks N]
+"""
+
+import argparse
+import hashlib
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from moatless_mcp.vector.code_splitter import CodeChunk
+
+FILES = 2000
+CHUNKS_PER_CLASS = 6
+
+
+@dataclass
+class PlainChunk:
+    """The chunk representation before slots, for comparison"""
+    id: str
+    content: str
+    file_path: str
+    start_line: int
+    end_line: int
+    chunk_type: str
+    name: str
+    parent_name: Optional[str] = None
+    language: str = "unknown"
+    metadata: Dict[str, Any] = None
+
+    def __post_init__(self):
+        if self.metadata is None:
+            self.metadata = {}
+        if not self.id:
+            content_hash = hashlib.md5(self.content.encode()).hexdigest()[:8]
+            self.id = f"{self.file_path}:{self.start_line}:{content_hash}"
+
+
+def build(chunk_class, count: int, contents):
+    chunks = []
+    for i in range(count):
+        method = i % CHUNKS_PER_CLASS
+        # Paths, types and names are built per chunk, as the splitter does
+        chunks.append(chunk_class(
+            id="",
+            content=contents[i % len(contents)],
+            file_path=f"src/package_{i % FILES % 40}/module_{i % FILES}.py",
+            start_line=i % 400 + 1,
+            end_line=i % 400 + 12,
+            chunk_type="method" if method else "class_header",
+            name=f"method_{method}",
+            parent_name=f"Model{i // CHUNKS_PER_CLASS % 300}",
+            language="python",
+            metadata={"parameters": ["self", "value"], "decorators": []} if method else None,
+        ))
+    return chunks
+
+
+def measure(chunk_class, count: int, contents) -> int:
+    tracemalloc.start()
+    chunks = build(chunk_class, count, contents)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del chunks
+    return allocated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=200_000, help="chunks to build")
+    args = parser.parse_args()
+
+    contents = [f"    def method(self, value):\n        return value * {i}\n" for i in range(1000)]
+    print(f"{'representation':<16} {'total MB':>9} {'bytes/chunk':>12}")
+    results = {}
+    for label, chunk_class in (("dataclass", PlainChunk), ("slotted", CodeChunk)):
+        allocated = measure(chunk_class, args.chunks, contents)
+        results[label] = allocated
+        print(f"{label:<16} {allocated / 2 ** 20:>9.1f} {allocated / args.chunks:>12.0f}")
+    print(f"saved {1 - results['slotted'] / results['dataclass']:.0%} per chunk")
+
+
+if __name__ == "__main__":
+    main()
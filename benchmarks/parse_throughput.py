@@ -0,0 +1,138 @@
+"""
+Throughput of definition extraction per language
+
+Parses a generated file of classes with methods, plus free functions, for
+every language with a definition query and reports lines and definitions
+extracted per second. Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/parse_throughput.py [--classes N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from moatless_mcp.treesitter import CodeParser
+from moatless_mcp.treesitter.languages import LANGUAGE_EXTENSIONS
+
+METHODS_PER_CLASS = 8
+
+# (file header, class template, method template, function template) per language;
+# {name} and {body} are filled in, {{ and }} are literal braces
+TEMPLATES = {
+    'python': (
+        "",
+        "class {name}(Base):\n{body}\n",
+        "    def {name}(self, value, count=1):\n        total = value * count\n        return total\n\n",
+        "def {name}(value, count=1):\n    return value * count\n\n",
+    ),
+    'javascript': (
+        "",
+        "class {name} extends Base {{\n{body}}}\n",
+        "  {name}(value, count = 1) {{\n    const total = value * count;\n    return total;\n  }}\n",
+        "function {name}(value, count = 1) {{\n  return value * count;\n}}\n",
+    ),
+    'typescript': (
+        "",
+        "class {name} extends Base {{\n{body}}}\n",
+        "  {name}(value: number, count: number = 1): number {{\n    const total = value * count;\n    return total;\n  }}\n",
+        "function {name}(value: number, count: number = 1): number {{\n  return value * count;\n}}\n",
+    ),
+    'java': (
+        "package bench;\n",
+        "public class {name} extends Base {{\n{body}}}\n",
+        "    @Override\n    public int {name}(int value, int count) {{\n        int total = value * count;\n        return total;\n    }}\n",
+        "",
+    ),
+    'c': (
+        "#include <stdio.h>\n",
+        "struct {name} {{\n    int value;\n    int count;\n}};\n{body}",
+        "static int {name}(int value, int count) {{\n    int total = value * count;\n    return total;\n}}\n",
+        "int {name}(int value, int count) {{\n    return value * count;\n}}\n",
+    ),
+    'cpp': (
+        "#include <vector>\n",
+        "class {name} : public Base {{\npublic:\n{body}}};\n",
+        "    int {name}(int value, int count) const {{\n        int total = value * count;\n        return total;\n    }}\n",
+        "int {name}(int value, int count) {{\n    return value * count;\n}}\n",
+    ),
+    'go': (
+        "package bench\n",
+        "type {name} struct {{\n    value int\n}}\n{body}",
+        "func (s *{owner}) {name}(value int, count int) int {{\n    total := value * count\n    return total\n}}\n",
+        "func {name}(value int, count int) int {{\n    return value * count\n}}\n",
+    ),
+    'rust': (
+        "",
+        "struct {name} {{\n    value: i32,\n}}\nimpl {name} {{\n{body}}}\n",
+        "    pub fn {name}(&self, value: i32, count: i32) -> i32 {{\n        let total = value * count;\n        total\n    }}\n",
+        "fn {name}(value: i32, count: i32) -> i32 {{\n    value * count\n}}\n",
+    ),
+    'c_sharp': (
+        "using System;\n",
+        "public class {name} : Base {{\n{body}}}\n",
+        "    [Obsolete]\n    public int {name}(int value, int count) {{\n        int total = value * count;\n        return total;\n    }}\n",
+        "",
+    ),
+    'ruby': (
+        "",
+        "class {name} < Base\n{body}end\n",
+        "  def {name}(value, count = 1)\n    total = value * count\n    total\n  end\n",
+        "def {name}(value, count = 1)\n  value * count\nend\n",
+    ),
+    'php': (
+        "<?php\n",
+        "class {name} extends Base {{\n{body}}}\n",
+        "    public function {name}($value, $count = 1) {{\n        $total = $value * $count;\n        return $total;\n    }}\n",
+        "function {name}($value, $count = 1) {{\n    return $value * $count;\n}}\n",
+    ),
+}
+
+
+def generate_source(language: str, classes: int) -> str:
+    header, class_template, method_template, function_template = TEMPLATES[language]
+    parts = [header]
+    for i in range(classes):
+        owner = f"Model{i}"
+        body = "".join(
+            method_template.format(name=f"method_{i}_{j}", owner=owner)
+            for j in range(METHODS_PER_CLASS)
+        )
+        parts.append(class_template.format(name=owner, body=body))
+        if function_template:
+            parts.append(function_template.format(name=f"helper_{i}"))
+    return "".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classes", type=int, default=500, help="classes per generated file")
+    parser.add_argument("--repeat", type=int, default=3, help="parses per language; the best is reported")
+    args = parser.parse_args()
+
+    code_parser = CodeParser()
+    if not code_parser.available:
+        raise SystemExit("tree-sitter is not installed")
+
+    print(f"{'language':<12} {'lines':>8} {'defs':>7} {'best ms':>9} {'lines/s':>11} {'defs/s':>10}")
+    for language, extensions in LANGUAGE_EXTENSIONS.items():
+        source = generate_source(language, args.classes)
+        file_name = f"bench{extensions[0]}"
+        line_count = source.count("\n") + 1
+
+        best = float("inf")
+        result = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = code_parser.parse_file(file_name, source)
+            best = min(best, time.perf_counter() - started)
+
+        if not result.success:
+            print(f"{language:<12} failed: {result.error}")
+            continue
+        definitions = len(result.all_blocks)
+        print(f"{language:<12} {line_count:>8} {definitions:>7} {best * 1000:>9.1f} "
+              f"{line_count / best:>11,.0f} {definitions / best:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
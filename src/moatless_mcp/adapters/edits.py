@@ -0,0 +1,403 @@
+"""
+String replacement edits and atomic file writes
+"""
+
+import difflib
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from moatless_mcp.utils.file_types import UTF8_TEXT, FileKind
+
+logger = logging.getLogger(__name__)
+
+
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# New files get the permissions open() would give them; os.umask() can only
+# be read by setting it, which is not thread-safe, so it is read once here
+_UMASK = _read_umask()
+
+
+@dataclass
+class Replacement:
+    """Replace an occurrence of old_str in a file (1-based, 0 for all)
+
+    With ``regex``, old_str is a regular expression and new_str may refer
+    to its groups (``\\1``, ``\\g<name>``).
+    """
+    file_path: str
+    old_str: str
+    new_str: str
+    occurrence: int = 1
+    regex: bool = False
+
+
+@dataclass
+class EditOutcome:
+    """Result of one applied Replacement"""
+    file_path: str
+    replacements_made: int
+    total_occurrences: int
+
+
+@dataclass
+class LineRange:
+    """Lines of the old content replaced by lines of the new content (1-based)"""
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    
+    def header(self) -> str:
+        """The range as a unified diff hunk header"""
+        return f"@@ -{_hunk_range(self.old_start, self.old_count)} +{_hunk_range(self.new_start, self.new_count)} @@"
+
+
+@dataclass
+class FileChange:
+    """A write that changed a file, with the line ranges it replaced"""
+    file_path: str
+    created: bool = False
+    ranges: List[LineRange] = field(default_factory=list)
+    
+    @property
+    def lines_added(self) -> int:
+        return sum(r.new_count for r in self.ranges)
+    
+    @property
+    def lines_removed(self) -> int:
+        return sum(r.old_count for r in self.ranges)
+
+
+class EditError(ValueError):
+    """An edit could not be applied; ``index`` is its position in the batch"""
+
+    def __init__(self, message: str, index: Optional[int] = None):
+        super().__init__(message)
+        self.index = index
+
+
+def replace_occurrences(file_path: str, content: str, old_str: str, new_str: str,
+                        occurrence: int = 1, regex: bool = False) -> Tuple[str, int, int]:
+    """Apply one replacement to content
+
+    Returns the new content, the number of replacements made and the number
+    of occurrences found. Raises EditError if the occurrence does not exist.
+    """
+    new_content, counts, _ = apply_replacements(
+        file_path, content, [Replacement(file_path, old_str, new_str, occurrence, regex)],
+        with_edits=False
+    )
+    return new_content, counts[0][0], counts[0][1]
+
+
+def apply_replacements(file_path: str, content: str, replacements: List[Replacement],
+                       with_edits: bool = True) -> Tuple[str, List[Tuple[int, int]], List[Tuple[int, int, str]]]:
+    """Apply independent replacements to content in a single pass
+
+    Every replacement is located in the original content with one scan,
+    and the result is built with a single join, so the content is copied
+    once however many targets there are. Targets of different replacements
+    must not overlap.
+
+    Returns the new content, (replacements made, occurrences found) per
+    replacement, and the (start, end, new text) edits of the original
+    content in order. Raises EditError if a replacement cannot be applied.
+    Without ``with_edits`` the edit list may be left empty, which lets a
+    single literal replace-all run as one str.replace.
+    """
+    if not with_edits and len(replacements) == 1:
+        replacement = replacements[0]
+        if not replacement.regex and replacement.occurrence == 0 and replacement.old_str:
+            total = content.count(replacement.old_str)
+            if total == 0:
+                raise EditError(f"String not found in {file_path}: '{replacement.old_str}'")
+            return content.replace(replacement.old_str, replacement.new_str), [(total, total)], []
+
+    edits: List[Tuple[int, int, str]] = []
+    counts = []
+    for replacement in replacements:
+        targets, total = _locate(file_path, content, replacement)
+        edits.extend(targets)
+        counts.append((len(targets), total))
+
+    edits.sort(key=lambda edit: edit[0])
+    pieces = []
+    position = 0
+    for start, end, text in edits:
+        if start < position:
+            raise EditError(f"Overlapping replacements in {file_path} at offset {start}")
+        pieces.append(content[position:start])
+        pieces.append(text)
+        position = end
+    pieces.append(content[position:])
+
+    return "".join(pieces), counts, edits
+
+
+def _locate(file_path: str, content: str, replacement: Replacement) -> Tuple[List[Tuple[int, int, str]], int]:
+    """Find the spans a replacement applies to and their new text, in one scan"""
+    old_str = replacement.old_str
+    if not old_str:
+        raise EditError(f"Empty search string for {file_path}")
+
+    occurrence = replacement.occurrence
+    targets = []
+
+    if replacement.regex:
+        try:
+            pattern = re.compile(old_str, re.MULTILINE)
+        except re.error as e:
+            raise EditError(f"Invalid regular expression '{old_str}': {e}") from e
+        total = 0
+        for match in pattern.finditer(content):
+            if match.end() == match.start():
+                continue
+            total += 1
+            if occurrence in (0, total):
+                try:
+                    text = match.expand(replacement.new_str)
+                except (re.error, IndexError) as e:
+                    raise EditError(f"Invalid replacement for '{old_str}': {e}") from e
+                targets.append((match.start(), match.end(), text))
+    else:
+        # Occurrences are counted without overlap, like str.count; only the
+        # requested ones are located individually
+        total = content.count(old_str)
+        matches = re.finditer(re.escape(old_str), content)
+        if occurrence == 0:
+            new_str = replacement.new_str
+            targets = [(m.start(), m.end(), new_str) for m in matches]
+        elif occurrence <= total:
+            match = next(islice(matches, occurrence - 1, None))
+            targets = [(match.start(), match.end(), replacement.new_str)]
+
+    if total == 0:
+        raise EditError(f"String not found in {file_path}: '{old_str}'")
+    if not targets:
+        raise EditError(f"Occurrence {occurrence} not found (only {total} occurrences exist)")
+    return targets, total
+
+
+def changed_line_ranges(old: str, new: str) -> List[LineRange]:
+    """Line ranges that differ between two versions of a file
+    
+    Lines shared at the start and end are skipped before the remainder is
+    compared, so a local change to a large file is cheap to describe.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    
+    limit = min(len(old_lines), len(new_lines))
+    prefix = 0
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    
+    matcher = difflib.SequenceMatcher(
+        None, old_lines[prefix:len(old_lines) - suffix], new_lines[prefix:len(new_lines) - suffix]
+    )
+    return [
+        LineRange(prefix + i1 + 1, i2 - i1, prefix + j1 + 1, j2 - j1)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def unified_diff(file_path: str, old: str, new: str, context: int = 3) -> str:
+    """Unified diff between two versions of a file"""
+    lines = difflib.unified_diff(
+        old.splitlines(keepends=True), new.splitlines(keepends=True),
+        fromfile=f"a/{file_path}", tofile=f"b/{file_path}", n=context
+    )
+    return "".join(_terminate(line) for line in lines)
+
+
+def edits_diff(file_path: str, content: str, edits: List[Tuple[int, int, str]],
+               context: int = 3) -> str:
+    """Unified diff for spans replaced in content, as returned by apply_replacements
+
+    Hunks are built directly from the replaced spans instead of comparing
+    the two versions line by line, so the cost depends on the size of the
+    changes rather than the size of the file. Changed lines are shown whole:
+    all old lines are removed, then all new lines added.
+    """
+    hunks = []
+    group: List[Tuple[int, int, str, int, int]] = []
+    old_line = 1  # line number at position
+    position = 0
+    line_delta = 0  # new line number minus old line number
+
+    for start, end, new_text in _line_changes(content, edits):
+        if group and content.count("\n", group[-1][1], start) > 2 * context:
+            hunks.append(_render_hunk(content, group, context))
+            group = []
+        old_line += content.count("\n", position, start)
+        position = start
+        group.append((start, end, new_text, old_line, old_line + line_delta))
+        line_delta += _count_lines(new_text) - _count_lines(content[start:end])
+
+    if group:
+        hunks.append(_render_hunk(content, group, context))
+    if not hunks:
+        return ""
+    return f"--- a/{file_path}\n+++ b/{file_path}\n" + "".join(hunks)
+
+
+def _line_changes(content: str, edits: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+    """Widen sorted edits to whole lines, merging edits that share a line"""
+    changes: List[Tuple[int, int, str]] = []
+    for start, end, text in edits:
+        line_start = content.rfind("\n", 0, start) + 1
+        if end > start and content[end - 1] == "\n":
+            line_end = end
+        else:
+            newline = content.find("\n", end)
+            line_end = len(content) if newline == -1 else newline + 1
+
+        if changes and line_start < changes[-1][1]:
+            # Drop the previous change's tail after this edit's start and continue from here
+            prev_start, prev_end, prev_text = changes.pop()
+            prefix = prev_text[:len(prev_text) - (prev_end - start)]
+            line_start, new_text = prev_start, prefix + text + content[end:line_end]
+        else:
+            new_text = content[line_start:start] + text + content[end:line_end]
+
+        # New text without a final newline joins the following line, which then changes too
+        while new_text and not new_text.endswith("\n") and line_end < len(content):
+            newline = content.find("\n", line_end)
+            next_end = len(content) if newline == -1 else newline + 1
+            new_text += content[line_end:next_end]
+            line_end = next_end
+        changes.append((line_start, line_end, new_text))
+    return changes
+
+
+def _render_hunk(content: str, group: List[Tuple[int, int, str, int, int]], context: int) -> str:
+    first_start, _, _, first_old_line, first_new_line = group[0]
+    before_start = first_start
+    for _ in range(context):
+        if before_start == 0:
+            break
+        before_start = content.rfind("\n", 0, before_start - 1) + 1
+
+    before = content[before_start:first_start].splitlines(keepends=True)
+    body = [" " + line for line in before]
+    old_count = new_count = len(before)
+
+    for index, (start, end, new_text, _, _) in enumerate(group):
+        removed = content[start:end].splitlines(keepends=True)
+        added = new_text.splitlines(keepends=True)
+        body.extend("-" + line for line in removed)
+        body.extend("+" + line for line in added)
+        old_count += len(removed)
+        new_count += len(added)
+
+        if index + 1 < len(group):
+            following = content[end:group[index + 1][0]]
+        else:
+            after_end = end
+            for _ in range(context):
+                if after_end >= len(content):
+                    break
+                newline = content.find("\n", after_end)
+                after_end = len(content) if newline == -1 else newline + 1
+            following = content[end:after_end]
+        unchanged = following.splitlines(keepends=True)
+        body.extend(" " + line for line in unchanged)
+        old_count += len(unchanged)
+        new_count += len(unchanged)
+
+    old_start = first_old_line - len(before)
+    new_start = first_new_line - len(before)
+    header = f"@@ -{_hunk_range(old_start, old_count)} +{_hunk_range(new_start, new_count)} @@\n"
+    return header + "".join(_terminate(line) for line in body)
+
+
+def _count_lines(text: str) -> int:
+    return text.count("\n") + (bool(text) and not text.endswith("\n"))
+
+
+def _hunk_range(start: int, count: int) -> str:
+    # Empty ranges refer to the line before, as in GNU diff
+    if count == 0:
+        return f"{start - 1},0"
+    return str(start) if count == 1 else f"{start},{count}"
+
+
+def _terminate(line: str) -> str:
+    if line.endswith("\n"):
+        return line
+    return line + "\n\\ No newline at end of file\n"
+
+
+def real_path(path: Path) -> Path:
+    """The file that path refers to, with symlinks followed
+
+    Replacing this file rather than path itself writes through symlinks
+    instead of turning them into regular files.
+    """
+    return Path(os.path.realpath(path))
+
+
+def stage_text(path: Path, content: str, kind: FileKind = UTF8_TEXT) -> Path:
+    """Write content to a temporary file next to path and return its path
+
+    The content is encoded in ``kind.encoding`` with ``kind.newline`` line
+    endings, so a file keeps the format it was read in; content that the
+    encoding cannot represent raises ValueError. The temporary file takes
+    over the permissions of an existing file, so that replacing the
+    original does not change them either. path should already be
+    resolved with real_path.
+    """
+    if kind.newline != "\n":
+        content = content.replace(kind.newline, "\n")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    temp_path = Path(temp_name)
+    try:
+        with os.fdopen(fd, "w", encoding=kind.encoding or "utf-8", newline=kind.newline) as f:
+            try:
+                f.write(content)
+            except UnicodeEncodeError as e:
+                raise ValueError(f"Content cannot be written to {path.name} as {e.encoding}: {e.reason}") from e
+        try:
+            os.chmod(temp_path, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+    except BaseException:
+        discard_staged(temp_path)
+        raise
+    return temp_path
+
+
+def discard_staged(temp_path: Path) -> None:
+    try:
+        temp_path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove temporary file {temp_path}: {e}")
+
+
+def write_text_atomic(path: Path, content: str, kind: FileKind = UTF8_TEXT) -> None:
+    """Replace a file's content so readers never see a partial write"""
+    path = real_path(path)
+    temp_path = stage_text(path, content, kind)
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        discard_staged(temp_path)
+        raise
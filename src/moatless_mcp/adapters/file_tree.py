@@ -0,0 +1,98 @@
+"""
+Directory tree summaries for workspace overviews
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from moatless_mcp.treesitter.languages import EXTENSION_TO_LANGUAGE
+
+
+@dataclass
+class DirectorySummary:
+    """Files under a directory, aggregated over all of its subdirectories"""
+    path: str
+    file_count: int = 0
+    total_bytes: int = 0
+    # language -> bytes, for files with a recognised source extension
+    language_bytes: Dict[str, int] = field(default_factory=dict)
+    children: Dict[str, "DirectorySummary"] = field(default_factory=dict)
+    # (name, size) of the files directly in this directory
+    files: List[Tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def language(self) -> Optional[str]:
+        """Language with the most bytes of source, if any"""
+        if not self.language_bytes:
+            return None
+        return max(self.language_bytes, key=self.language_bytes.get)
+
+    def find(self, directory: str) -> Optional["DirectorySummary"]:
+        """Summary of a subdirectory given relative to this one"""
+        node = self
+        for part in PurePosixPath(directory).parts:
+            if part == ".":
+                continue
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def iter_files(self, recursive: bool = True) -> Iterator[str]:
+        """Yield the files under this directory as root-relative paths"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            base = f"{node.path}/" if node.path else ""
+            for name, _ in node.files:
+                yield base + name
+            if recursive:
+                stack.extend(node.children.values())
+
+    def walk(self, max_depth: int) -> Iterator[Tuple[int, "DirectorySummary"]]:
+        """Yield (depth, summary) for subdirectories down to max_depth, breadth first"""
+        queue = deque((1, child) for _, child in sorted(self.children.items()))
+        while queue:
+            depth, node = queue.popleft()
+            yield depth, node
+            if depth < max_depth:
+                queue.extend((depth + 1, child) for _, child in sorted(node.children.items()))
+
+
+def build_file_tree(files: Iterable[Tuple[str, int]]) -> DirectorySummary:
+    """Aggregate (relative path, size) pairs into a tree of directory summaries"""
+    root = DirectorySummary("")
+    for rel_path, size in files:
+        parts = rel_path.split("/")
+        language = EXTENSION_TO_LANGUAGE.get(PurePosixPath(parts[-1]).suffix.lower())
+
+        node = root
+        _count(node, size, language)
+        for part in parts[:-1]:
+            child = node.children.get(part)
+            if child is None:
+                child = DirectorySummary(f"{node.path}/{part}" if node.path else part)
+                node.children[part] = child
+            node = child
+            _count(node, size, language)
+        node.files.append((parts[-1], size))
+    return root
+
+
+def _count(node: DirectorySummary, size: int, language: Optional[str]) -> None:
+    node.file_count += 1
+    node.total_bytes += size
+    if language is not None:
+        node.language_bytes[language] = node.language_bytes.get(language, 0) + size
+
+
+def format_bytes(size: int) -> str:
+    """Human readable size, e.g. 12.3 MB"""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{int(value)} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{size} B"
@@ -0,0 +1,120 @@
+"""
+File listing and change detection backed by the git index
+"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import git
+from git.exc import GitCommandError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GitChanges:
+    """Work tree changes relative to a commit, as workspace-relative paths"""
+    base_commit: str
+    head_commit: Optional[str]
+    modified: List[str] = field(default_factory=list)
+    added: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> Set[str]:
+        """Paths whose current content must be (re)processed"""
+        return set(self.modified) | set(self.added)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.modified or self.added or self.deleted)
+
+
+class GitFileIndex:
+    """Lists work tree files and detects changes using git itself
+
+    Tracked files come from the index, so git's stat cache does the work
+    instead of a Python tree walk. Untracked files are included unless
+    excluded by the standard ignore files, and tracked files deleted from
+    the work tree and submodule entries are left out.
+    """
+
+    def __init__(self, repo: git.Repo):
+        self.repo = repo
+        self.root = Path(repo.working_tree_dir)
+
+    def head_commit(self) -> Optional[str]:
+        """SHA of HEAD, or None in a repository without commits"""
+        try:
+            return self.repo.head.commit.hexsha
+        except (ValueError, GitCommandError):
+            return None
+
+    def list_files(self, directory: str = "") -> List[str]:
+        """Files in the work tree under directory, relative to the root"""
+        pathspec = [directory] if directory else []
+        listed = self._ls_files("--cached", "--others", "--exclude-standard", *pathspec)
+        deleted = set(self._ls_files("--deleted", *pathspec))
+        submodules = self._submodule_paths()
+
+        files = []
+        seen = set()
+        for path in listed:
+            if path in seen or path in deleted or path in submodules:
+                continue
+            seen.add(path)
+            files.append(path)
+        return files
+
+    def changed_since(self, commit: str) -> GitChanges:
+        """Compare the work tree with commit, including untracked files
+
+        Raises ValueError if the commit is unknown (e.g. after a history
+        rewrite), in which case callers should fall back to a full rebuild.
+        """
+        try:
+            self.repo.git.rev_parse("--verify", "--quiet", f"{commit}^{{commit}}")
+        except GitCommandError as e:
+            raise ValueError(f"Unknown commit: {commit}") from e
+
+        changes = GitChanges(base_commit=commit, head_commit=self.head_commit())
+
+        output = self.repo.git.diff("--name-status", "--no-renames", "-z", commit, "--")
+        fields = [f for f in output.split("\0") if f]
+        for status, path in zip(fields[::2], fields[1::2]):
+            if status.startswith("D"):
+                changes.deleted.append(path)
+            elif status.startswith("A"):
+                changes.added.append(path)
+            else:
+                changes.modified.append(path)
+
+        changes.added.extend(self._ls_files("--others", "--exclude-standard"))
+        return changes
+
+    def _ls_files(self, *args: str) -> List[str]:
+        output = self.repo.git.ls_files("-z", *args)
+        return [path for path in output.split("\0") if path]
+
+    def _submodule_paths(self) -> Set[str]:
+        if not (self.root / ".gitmodules").exists():
+            return set()
+        try:
+            output = self.repo.git.config("-f", ".gitmodules", "--get-regexp", r"\.path$")
+        except GitCommandError:
+            return set()
+        return {line.split(" ", 1)[1] for line in output.splitlines() if " " in line}
+
+
+def file_fingerprints(root: Path, paths: Set[str]) -> Dict[str, str]:
+    """Cheap content fingerprints (mtime and size) for files that exist"""
+    fingerprints = {}
+    for path in paths:
+        try:
+            stat = (root / path).stat()
+        except OSError:
+            continue
+        fingerprints[path] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    return fingerprints
@@ -0,0 +1,193 @@
+"""
+Pool of open workspaces for serving many repositories from one process
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+
+from moatless_mcp.adapters.workspace import WorkspaceAdapter
+from moatless_mcp.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledWorkspace:
+    """An open workspace together with the tool registry bound to it"""
+    adapter: WorkspaceAdapter
+    registry: Any
+    last_used: float
+    active: int = 0
+    pinned: bool = False
+
+    @property
+    def path(self) -> Path:
+        return self.adapter.workspace_path
+
+
+class WorkspacePool:
+    """Keeps workspaces open across requests, evicting idle ones
+
+    Every workspace gets its own WorkspaceAdapter (caches, cursors, lock and
+    index state) and a registry built by ``registry_factory``. At most
+    ``config.max_workspaces`` stay open; beyond that, and after
+    ``config.workspace_idle_ttl`` seconds without use, the least recently
+    used workspaces are closed. Pinned workspaces, workspaces with a call
+    in flight and the workspace being opened are never evicted; the pool
+    may then exceed its capacity until those calls finish.
+
+    Workspaces other than pinned ones must lie under one of
+    ``config.workspace_roots``.
+    """
+
+    def __init__(self, config: Config, registry_factory: Callable[[WorkspaceAdapter], Any]):
+        self.config = config
+        self.registry_factory = registry_factory
+        self.roots = [Path(root).resolve() for root in config.workspace_roots]
+        self._entries: "OrderedDict[Path, PooledWorkspace]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return Path(path).resolve() in self._entries
+
+    @property
+    def paths(self) -> List[str]:
+        """Open workspaces, least recently used first"""
+        return [str(path) for path in self._entries]
+
+    def open_pinned(self, path: str) -> PooledWorkspace:
+        """Open a workspace that is never evicted, bypassing the root check"""
+        entry = self._open(Path(path).resolve())
+        entry.pinned = True
+        return entry
+
+    def resolve(self, path: str) -> Path:
+        """Resolve a requested workspace path and check it is allowed
+
+        Relative paths are looked up under each configured root in turn.
+        """
+        requested = Path(path).expanduser()
+        if requested.is_absolute():
+            candidates = [requested.resolve()]
+        else:
+            candidates = [(root / requested).resolve() for root in self.roots]
+
+        for candidate in candidates:
+            if candidate in self._entries and self._entries[candidate].pinned:
+                return candidate
+            if any(candidate == root or root in candidate.parents for root in self.roots):
+                if not candidate.is_dir():
+                    raise FileNotFoundError(f"Workspace not found: {path}")
+                return candidate
+
+        if not self.roots:
+            raise PermissionError("Multiple workspaces are not enabled on this server")
+        raise PermissionError(f"Workspace is outside the allowed roots: {path}")
+
+    def get(self, path: str) -> PooledWorkspace:
+        """Return the open workspace for path, opening it if needed"""
+        return self._get(path, claim=False)
+
+    @contextmanager
+    def acquire(self, path: str) -> Iterator[PooledWorkspace]:
+        """Use a workspace for the duration of a call, protecting it from eviction"""
+        entry = self._get(path, claim=True)
+        try:
+            yield entry
+        finally:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+            self._evict_over_capacity()
+
+    def _get(self, path: str, claim: bool) -> PooledWorkspace:
+        self.evict_idle()
+
+        resolved = self.resolve(path)
+        entry = self._entries.get(resolved)
+        opened = entry is None
+        if opened:
+            entry = self._open(resolved)
+        else:
+            self._entries.move_to_end(resolved)
+
+        # Claimed before evicting, so that it cannot be chosen as the victim
+        if claim:
+            entry.active += 1
+        entry.last_used = time.monotonic()
+        if opened:
+            self._evict_over_capacity(keep=resolved)
+        return entry
+
+    def evict_idle(self) -> List[str]:
+        """Close workspaces unused for longer than the idle TTL"""
+        ttl = self.config.workspace_idle_ttl
+        if ttl <= 0:
+            return []
+
+        deadline = time.monotonic() - ttl
+        idle = [
+            path for path, entry in self._entries.items()
+            if entry.last_used < deadline and self._evictable(entry)
+        ]
+        for path in idle:
+            self._close(path)
+        return [str(path) for path in idle]
+
+    def close(self, path: str) -> bool:
+        """Close a workspace explicitly, returning False if it is not open"""
+        resolved = Path(path).resolve()
+        if resolved not in self._entries:
+            return False
+        self._close(resolved)
+        return True
+
+    def close_all(self) -> None:
+        """Close every open workspace, pinned ones included"""
+        for path in list(self._entries):
+            self._close(path)
+
+    def _open(self, path: Path) -> PooledWorkspace:
+        entry = self._entries.get(path)
+        if entry is not None:
+            return entry
+
+        adapter = WorkspaceAdapter(str(path), self.config)
+        entry = PooledWorkspace(
+            adapter=adapter,
+            registry=self.registry_factory(adapter),
+            last_used=time.monotonic()
+        )
+        self._entries[path] = entry
+        logger.info(f"Opened workspace {path} ({len(self._entries)} open)")
+        return entry
+
+    def _evict_over_capacity(self, keep: Optional[Path] = None) -> None:
+        excess = len(self._entries) - max(self.config.max_workspaces, 1)
+        if excess <= 0:
+            return
+
+        victims = [
+            path for path, entry in self._entries.items()
+            if path != keep and self._evictable(entry)
+        ]
+        for path in victims[:excess]:
+            self._close(path)
+
+    @staticmethod
+    def _evictable(entry: PooledWorkspace) -> bool:
+        return not entry.pinned and not entry.active
+
+    def _close(self, path: Path) -> None:
+        entry = self._entries.pop(path)
+        try:
+            entry.adapter.close()
+        except Exception as e:
+            logger.warning(f"Error closing workspace {path}: {e}")
+        logger.info(f"Closed workspace {path}")
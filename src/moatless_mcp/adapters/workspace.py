@@ -4,13 +4,30 @@ Workspace adapter for managing project files and state
 
 import asyncio
 import logging
+import os
+import re
 import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
 import git
-from git.exc import InvalidGitRepositoryError
+from git.exc import GitCommandError, InvalidGitRepositoryError
 
+from moatless_mcp.adapters.edits import (
+    EditError, EditOutcome, FileChange, Replacement, changed_line_ranges, discard_staged,
+    real_path, replace_occurrences, stage_text, write_text_atomic
+)
+from moatless_mcp.adapters.file_tree import DirectorySummary, build_file_tree
+from moatless_mcp.adapters.git_index import GitChanges, GitFileIndex
 from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.cursors import CursorStore
+from moatless_mcp.utils.file_types import FileKind, file_classifier
+from moatless_mcp.utils.globbing import compile_glob, translate_glob
+from moatless_mcp.utils.locks import AsyncRWLock
+from moatless_mcp.utils.path_policy import PathPolicy
 
 # Add moatless path to sys.path
 current_file = Path(__file__).resolve()
@@ -35,88 +52,376 @@ except ImportError:
     IndexSettings = None
     FileRepository = None
 
+# Parsed views of workspace files, dropped when a file is written
+try:
+    from moatless_mcp.treesitter import (
+        reference_indexes, span_index_cache, symbol_search_indexes, symbol_table_cache
+    )
+    CODE_CACHES_AVAILABLE = True
+except ImportError:
+    CODE_CACHES_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
 class FileContext:
     """Simple file context manager"""
     
-    def __init__(self, workspace_path: Path, config: Config):
+    def __init__(self, workspace_path: Path, config: Config,
+                 git_index: Optional[GitFileIndex] = None):
         self.workspace_path = workspace_path
         self.config = config
-        self._file_cache: Dict[str, str] = {}
+        self.git_index = git_index
+        # path -> (mtime_ns, size, content), least recently used first
+        self._file_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._cache_bytes = 0
+        # Reads and writes also run on the I/O thread pool
+        self._cache_lock = threading.Lock()
+        self._change_listeners: List[Callable[[FileChange], None]] = []
+        # (built at, tree) of the last full workspace walk
+        self._tree_cache: Optional[Tuple[float, DirectorySummary]] = None
+    
+    @property
+    def path_policy(self) -> PathPolicy:
+        """Compiled access policy for this workspace"""
+        return self.config.path_policy_for(self.workspace_path)
+    
+    @property
+    def cache_bytes(self) -> int:
+        """Approximate size of the cached file contents"""
+        return self._cache_bytes
     
     def get_file_content(self, file_path: str) -> str:
-        """Get file content with caching"""
+        """Get file content with caching
+        
+        Cached content is reused while the file's mtime and size are
+        unchanged. The cache is bounded by ``config.file_cache_bytes``.
+        The encoding is detected from the file's first bytes, and binary
+        files raise ValueError.
+        """
         full_path = self.workspace_path / file_path
         
         if not full_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        if not self.config.is_file_allowed(full_path):
+        if not self.path_policy.is_file_allowed(full_path):
             raise PermissionError(f"File access not allowed: {file_path}")
         
         # Check file size
-        if full_path.stat().st_size > self.config.max_file_size:
+        stat = full_path.stat()
+        if stat.st_size > self.config.max_file_size:
             raise ValueError(f"File too large: {file_path}")
         
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                self._file_cache[file_path] = content
-                return content
-        except UnicodeDecodeError:
-            # Try with different encoding
-            with open(full_path, 'r', encoding='latin1') as f:
-                content = f.read()
-                self._file_cache[file_path] = content
-                return content
-    
-    def write_file_content(self, file_path: str, content: str) -> None:
-        """Write content to file"""
+        with self._cache_lock:
+            cached = self._file_cache.get(file_path)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._file_cache.move_to_end(file_path)
+                return cached[2]
+        
+        content = file_classifier.read_text(full_path)
+        if content is None:
+            raise ValueError(f"Binary file not supported: {file_path}")
+        
+        self._cache_put(file_path, stat.st_mtime_ns, stat.st_size, content)
+        return content
+    
+    async def get_file_content_async(self, file_path: str) -> str:
+        """Like get_file_content, without blocking the event loop"""
+        return await self.config.io_executor.run(self.get_file_content, file_path)
+    
+    def _cache_put(self, file_path: str, mtime_ns: int, size: int, content: str) -> None:
+        with self._cache_lock:
+            self._cache_discard(file_path)
+            
+            budget = self.config.file_cache_bytes
+            if size > budget:
+                return
+            
+            self._file_cache[file_path] = (mtime_ns, size, content)
+            self._cache_bytes += size
+            
+            while self._cache_bytes > budget:
+                _, (_, evicted_size, _) = self._file_cache.popitem(last=False)
+                self._cache_bytes -= evicted_size
+    
+    def _cache_discard(self, file_path: str) -> None:
+        cached = self._file_cache.pop(file_path, None)
+        if cached is not None:
+            self._cache_bytes -= cached[1]
+    
+    def clear_cache(self) -> None:
+        """Drop all cached file contents"""
+        with self._cache_lock:
+            self._file_cache.clear()
+            self._cache_bytes = 0
+    
+    def add_change_listener(self, callback: Callable[[FileChange], None]) -> None:
+        """Register a callback invoked with the changed line ranges after each write
+        
+        Callbacks run on the thread that wrote the file, usually an I/O
+        pool thread. Writes that leave a file unchanged are not reported.
+        """
+        self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback: Callable[[FileChange], None]) -> None:
+        """Remove a previously registered change callback"""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_change_listeners(self, change: FileChange) -> None:
+        for callback in list(self._change_listeners):
+            try:
+                callback(change)
+            except Exception as e:
+                logger.warning(f"File change listener failed for {change.file_path}: {e}")
+    
+    def write_file_content(self, file_path: str, content: str) -> Optional[FileChange]:
+        """Write content to file
+        
+        The content is written to a temporary file that then replaces the
+        original, so a failed write never leaves a truncated file. If the
+        file already has this content it is left untouched and None is
+        returned; otherwise the change is returned and reported to the
+        change listeners. An existing text file keeps its encoding and line
+        endings.
+        """
         full_path = self.workspace_path / file_path
         
-        if not self.config.is_file_allowed(full_path):
+        if not self.path_policy.is_file_allowed(full_path):
             raise PermissionError(f"File access not allowed: {file_path}")
         
-        # Create parent directories if needed
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        kind = file_classifier.text_format(full_path)
+        if kind.newline != "\n":
+            # Read content has its line endings normalized; compare and cache it that way
+            content = content.replace(kind.newline, "\n")
+        
+        # Binary, oversized and missing files have no text to compare against
+        try:
+            previous = self.get_file_content(file_path)
+        except (OSError, ValueError):
+            previous = None
+        if previous == content:
+            return None
+        
+        existed = previous is not None or full_path.exists()
+        
+        # Parent directories are created if needed
+        write_text_atomic(full_path, content, kind)
+        
+        return self._record_change(file_path, previous or "", content, created=not existed)
+    
+    async def write_file_content_async(self, file_path: str, content: str) -> Optional[FileChange]:
+        """Like write_file_content, without blocking the event loop"""
+        return await self.config.io_executor.run(self.write_file_content, file_path, content)
+    
+    def _record_change(self, file_path: str, old: str, new: str, created: bool = False) -> FileChange:
+        """Cache the written content and report its changed lines"""
+        stat = (self.workspace_path / file_path).stat()
+        self._cache_put(file_path, stat.st_mtime_ns, stat.st_size, new)
+        self._tree_cache = None
+        
+        change = FileChange(file_path, created, changed_line_ranges(old, new))
+        self._notify_change_listeners(change)
+        return change
+    
+    async def apply_edits_async(self, edits: List[Replacement]) -> List[EditOutcome]:
+        """Apply string replacements across files, all or nothing
+        
+        Edits are applied in order, so later edits see the result of earlier
+        ones in the same file, however its path is spelled. Every edit is
+        validated against the current (cached) content before anything is
+        written; an EditError carries the index of the first failing edit.
+        Changed files are then staged as temporary files in parallel and
+        moved into place with os.replace. If a move fails, the files already
+        replaced are written back with their original content.
+        """
+        io = self.config.io_executor
+        outcomes, originals, updated = await io.run(self._plan_edits, edits)
         
-        with open(full_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        changed = {path: content for path, content in updated.items() if content != originals[path]}
+        # Symlinked files are replaced at their target, as plain writes do
+        targets = {path: real_path(self.workspace_path / path) for path in changed}
+        # Each file is written back in the encoding and line endings it was read in
+        formats = {path: file_classifier.text_format(target) for path, target in targets.items()}
+        staged = await asyncio.gather(
+            *(io.run(stage_text, targets[path], content, formats[path]) for path, content in changed.items()),
+            return_exceptions=True
+        )
+        
+        failures = [result for result in staged if isinstance(result, BaseException)]
+        if failures:
+            for result in staged:
+                if not isinstance(result, BaseException):
+                    discard_staged(result)
+            raise failures[0]
+        
+        pending = list(zip(changed, staged))
+        replaced = []
+        try:
+            while pending:
+                path, temp_path = pending[0]
+                os.replace(temp_path, targets[path])
+                replaced.append(pending.pop(0)[0])
+        except BaseException:
+            self._restore_originals(replaced, originals, formats)
+            raise
+        finally:
+            for _, temp_path in pending:
+                discard_staged(temp_path)
+        
+        await asyncio.gather(*(
+            io.run(self._record_change, path, originals[path], content) for path, content in changed.items()
+        ))
+        
+        return outcomes
+    
+    def _restore_originals(self, paths: List[str], originals: Dict[str, str],
+                           formats: Dict[str, FileKind]) -> None:
+        for path in reversed(paths):
+            try:
+                write_text_atomic(self.workspace_path / path, originals[path], formats[path])
+            except OSError as e:
+                logger.error(f"Could not restore {path} after a failed edit: {e}")
+    
+    def _plan_edits(self, edits: List[Replacement]) -> Tuple[List[EditOutcome], Dict[str, str], Dict[str, str]]:
+        outcomes = []
+        originals: Dict[str, str] = {}
+        updated: Dict[str, str] = {}
+        
+        for index, edit in enumerate(edits):
+            # "a.py", "./a.py" and "src/../a.py" name the same file
+            path = Path(os.path.normpath(edit.file_path)).as_posix()
+            if path not in updated:
+                try:
+                    originals[path] = self.get_file_content(path)
+                except (OSError, ValueError) as e:
+                    raise EditError(f"Edit {index + 1}: {e}", index) from e
+                updated[path] = originals[path]
+            
+            try:
+                updated[path], made, total = replace_occurrences(
+                    path, updated[path], edit.old_str, edit.new_str, edit.occurrence, edit.regex
+                )
+            except EditError as e:
+                raise EditError(f"Edit {index + 1}: {e}", index) from e
+            outcomes.append(EditOutcome(path, made, total))
         
-        # Update cache
-        self._file_cache[file_path] = content
+        return outcomes, originals, updated
     
     def list_files(self, directory: str = "", recursive: bool = False, 
                    max_results: int = 100) -> List[str]:
         """List files in directory"""
+        return sorted(islice(self.iter_files(directory, recursive), max_results))
+    
+    def iter_files(self, directory: str = "", recursive: bool = False) -> Iterator[str]:
+        """Lazily yield allowed files in directory, relative to the workspace"""
         base_path = self.workspace_path / directory if directory else self.workspace_path
         
         if not base_path.exists():
             raise FileNotFoundError(f"Directory not found: {directory}")
         
-        files = []
+        return self._iter_files(base_path, recursive)
+    
+    def _iter_files(self, base_path: Path, recursive: bool) -> Iterator[str]:
+        for file_path in self.iter_workspace_files(base_path, recursive):
+            yield str(file_path.relative_to(self.workspace_path))
+    
+    def iter_workspace_files(self, base_path: Optional[Path] = None,
+                             recursive: bool = True) -> Iterator[Path]:
+        """Yield allowed, non-ignored files under base_path
         
-        try:
-            if recursive:
-                for file_path in base_path.rglob("*"):
-                    if file_path.is_file() and self.config.is_file_allowed(file_path):
-                        rel_path = file_path.relative_to(self.workspace_path)
-                        files.append(str(rel_path))
-                        if len(files) >= max_results:
-                            break
+        Recursive listings of a git work tree come from the git index (plus
+        untracked files) rather than a directory walk; other listings walk
+        the tree, pruning forbidden and ignored directories.
+        """
+        base_path = base_path or self.workspace_path
+        
+        if recursive and self._use_git_index():
+            try:
+                rel_dir = base_path.relative_to(self.workspace_path).as_posix()
+                listed = self.git_index.list_files("" if rel_dir == "." else rel_dir)
+            except (ValueError, GitCommandError) as e:
+                logger.debug(f"Falling back to directory walk for {base_path}: {e}")
             else:
-                for file_path in base_path.iterdir():
-                    if file_path.is_file() and self.config.is_file_allowed(file_path):
-                        rel_path = file_path.relative_to(self.workspace_path)
-                        files.append(str(rel_path))
-                        if len(files) >= max_results:
-                            break
-        except PermissionError as e:
-            logger.warning(f"Permission denied accessing directory {base_path}: {e}")
-        
-        return sorted(files)
+                for rel_path in self.path_policy.filter_relative(listed):
+                    yield self.workspace_path / rel_path
+                return
+        
+        yield from self.path_policy.iter_files(base_path, recursive)
+    
+    def file_tree(self, directory: str = "") -> DirectorySummary:
+        """Summary tree of the allowed files under directory
+        
+        The whole workspace is walked once and the tree reused for
+        ``config.listing_cache_ttl`` seconds or until a file is written
+        through this context.
+        """
+        base_path = self.workspace_path / directory if directory else self.workspace_path
+        if not base_path.is_dir():
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        
+        tree = self._fresh_tree()
+        if tree is None:
+            started = time.monotonic()
+            tree = build_file_tree(self._iter_sizes())
+            self._tree_cache = (started, tree)
+        
+        rel_dir = base_path.resolve().relative_to(self.workspace_path).as_posix()
+        return tree.find(rel_dir) or DirectorySummary(rel_dir)
+    
+    def iter_relative_files(self, directory: str = "", recursive: bool = True) -> Iterator[str]:
+        """Yield allowed files under directory as '/'-separated workspace-relative paths
+        
+        Listed from the git index or a walk of that directory only, never
+        from the file tree cache, which does not see files created outside
+        this context. Missing directories and directories outside the
+        workspace, such as ``../other``, yield nothing.
+        """
+        directory = self._contained_directory(directory)
+        if directory is None:
+            return
+        
+        base_path = self.workspace_path / directory if directory else self.workspace_path
+        if not base_path.is_dir():
+            return
+        for file_path in self.iter_workspace_files(base_path, recursive):
+            yield file_path.relative_to(self.workspace_path).as_posix()
+    
+    def _contained_directory(self, directory: str) -> Optional[str]:
+        """directory normalized to a workspace-relative path; None if it lies outside"""
+        if not directory:
+            return ""
+        normalized = Path(os.path.normpath(directory)).as_posix()
+        if normalized == ".":
+            return ""
+        if os.path.isabs(normalized) or normalized == ".." or normalized.startswith("../"):
+            return None
+        try:
+            (self.workspace_path / normalized).resolve().relative_to(self.workspace_path)
+        except ValueError:
+            return None
+        return normalized
+    
+    def _fresh_tree(self) -> Optional[DirectorySummary]:
+        cached = self._tree_cache
+        if cached is None or time.monotonic() - cached[0] > self.config.listing_cache_ttl:
+            return None
+        return cached[1]
+    
+    def _iter_sizes(self) -> Iterator[Tuple[str, int]]:
+        root = self.workspace_path
+        for file_path in self.iter_workspace_files(root):
+            try:
+                size = file_path.stat().st_size
+            except OSError:
+                continue
+            yield file_path.relative_to(root).as_posix(), size
+    
+    def _use_git_index(self) -> bool:
+        # git applies .gitignore itself, so it can only list for us when those are honoured
+        return (self.git_index is not None and
+                self.config.use_git_index and
+                self.config.respect_gitignore)
 
 
 class WorkspaceAdapter:
@@ -125,7 +430,12 @@ class WorkspaceAdapter:
     def __init__(self, workspace_path: str, config: Config):
         self.workspace_path = Path(workspace_path).resolve()
         self.config = config
-        self.file_context = FileContext(self.workspace_path, config)
+        
+        # Continuation cursors for paginated tool results
+        self.cursors = CursorStore(ttl=config.cursor_ttl, max_entries=config.max_cursors)
+        
+        # Serializes mutating tool calls against reads when clients share the workspace
+        self.lock = AsyncRWLock()
         
         # Initialize code index for semantic search
         self._code_index: Optional[CodeIndex] = None
@@ -133,14 +443,34 @@ class WorkspaceAdapter:
         
         # Try to initialize git repository
         self.git_repo: Optional[git.Repo] = None
+        self.git_index: Optional[GitFileIndex] = None
         try:
             self.git_repo = git.Repo(self.workspace_path)
+            self.git_index = GitFileIndex(self.git_repo)
             logger.info(f"Git repository detected at {self.workspace_path}")
         except InvalidGitRepositoryError:
             logger.info(f"No git repository found at {self.workspace_path}")
         
+        self.file_context = FileContext(self.workspace_path, config, self.git_index)
+        self.file_context.add_change_listener(self._discard_parsed_file)
+        
         logger.info(f"Workspace initialized at {self.workspace_path}")
     
+    def _discard_parsed_file(self, change: FileChange) -> None:
+        """Drop a written file from the span, symbol and reference caches
+        
+        The caches also compare mtime and size, but a rewrite within the
+        mtime granularity that keeps the size would otherwise go unnoticed.
+        """
+        if not CODE_CACHES_AVAILABLE:
+            return
+        rel_path = Path(os.path.normpath(change.file_path)).as_posix()
+        full_path = self.workspace_path / rel_path
+        span_index_cache.discard(full_path)
+        symbol_table_cache.discard(full_path)
+        symbol_search_indexes.discard(str(self.workspace_path), rel_path)
+        reference_indexes.discard(self.workspace_path, rel_path)
+    
     @property
     def code_index(self) -> Optional[CodeIndex]:
         """Get the code index for semantic search"""
@@ -246,18 +576,17 @@ class WorkspaceAdapter:
         language_counts = {}
         
         # Count files by extension
-        for file_path in self.workspace_path.rglob("*"):
-            if file_path.is_file() and self.config.is_file_allowed(file_path):
-                ext = file_path.suffix.lower()
-                if ext in ['.py', '.pyw']:
-                    language_counts['python'] = language_counts.get('python', 0) + 1
-                elif ext in ['.js', '.jsx', '.ts', '.tsx']:
-                    language_counts['javascript'] = language_counts.get('javascript', 0) + 1
-                elif ext in ['.java']:
-                    language_counts['java'] = language_counts.get('java', 0) + 1
-                elif ext in ['.cpp', '.cxx', '.cc', '.c']:
-                    language_counts['cpp'] = language_counts.get('cpp', 0) + 1
-        
+        for file_path in self.file_context.iter_workspace_files():
+            ext = file_path.suffix.lower()
+            if ext in ['.py', '.pyw']:
+                language_counts['python'] = language_counts.get('python', 0) + 1
+            elif ext in ['.js', '.jsx', '.ts', '.tsx']:
+                language_counts['javascript'] = language_counts.get('javascript', 0) + 1
+            elif ext in ['.java']:
+                language_counts['java'] = language_counts.get('java', 0) + 1
+            elif ext in ['.cpp', '.cxx', '.cc', '.c']:
+                language_counts['cpp'] = language_counts.get('cpp', 0) + 1
+    
         # Return the most common language, default to python
         if language_counts:
             return max(language_counts, key=language_counts.get)
@@ -267,6 +596,23 @@ class WorkspaceAdapter:
         """Get file context manager"""
         return self.file_context
     
+    def close(self) -> None:
+        """Release caches and handles held for this workspace"""
+        self.cursors.clear()
+        self.file_context.clear_cache()
+        self._code_index = None
+        self._index_initialized = False
+        
+        if self.git_repo is not None:
+            self.git_repo.close()
+            self.git_repo = None
+            self.git_index = None
+            self.file_context.git_index = None
+        
+        self.config.release_path_policy(self.workspace_path)
+        
+        logger.info(f"Workspace closed at {self.workspace_path}")
+    
     def get_workspace_info(self) -> Dict[str, Any]:
         """Get workspace information"""
         info = {
@@ -286,61 +632,76 @@ class WorkspaceAdapter:
         
         return info
     
+    def changed_files_since(self, commit: str) -> Optional[GitChanges]:
+        """Files changed in the work tree relative to commit
+        
+        Returns None if the workspace is not a git repository. Raises
+        ValueError if the commit no longer exists.
+        """
+        if self.git_index is None:
+            return None
+        return self.git_index.changed_since(commit)
+    
     def search_files(self, pattern: str, max_results: int = 100) -> List[str]:
         """Search for files matching a pattern"""
-        import fnmatch
-        
-        matching_files = []
+        return sorted(islice(self.iter_search_files(pattern), max_results))
+    
+    def iter_search_files(self, pattern: str) -> Iterator[str]:
+        """Lazily yield files whose workspace-relative path matches a glob pattern
         
+        Only the subtree under the pattern's literal leading directories is
+        listed, e.g. ``src/api`` for ``src/api/**/*.py``.
+        """
+        glob = compile_glob(pattern)
         try:
-            for file_path in self.workspace_path.rglob("*"):
-                if file_path.is_file() and self.config.is_file_allowed(file_path):
-                    rel_path = file_path.relative_to(self.workspace_path)
-                    if fnmatch.fnmatch(str(rel_path), pattern):
-                        matching_files.append(str(rel_path))
-                        if len(matching_files) >= max_results:
-                            break
+            for rel_path in self.file_context.iter_relative_files(glob.prefix, glob.recursive):
+                if glob.match(rel_path):
+                    yield rel_path
         except Exception as e:
             logger.error(f"Error searching files: {e}")
-        
-        return sorted(matching_files)
     
     def grep_files(self, pattern: str, file_pattern: str = "*", 
                    max_results: int = 100) -> List[Dict[str, Any]]:
         """Search for text pattern in files"""
-        import re
-        import fnmatch
+        return list(islice(self.iter_grep(pattern, file_pattern), max_results))
+    
+    def iter_grep(self, pattern: str, file_pattern: str = "*") -> Iterator[Dict[str, Any]]:
+        """Lazily yield matching lines for a regex pattern
         
-        results = []
+        The pattern is compiled eagerly so that invalid regexes raise here
+        rather than on first iteration.
+        """
         regex = re.compile(pattern, re.IGNORECASE)
+        return self._iter_grep(regex, file_pattern)
+    
+    def _iter_grep(self, regex: "re.Pattern", file_pattern: str) -> Iterator[Dict[str, Any]]:
+        # Like rglob(file_pattern), the pattern matches the trailing components of
+        # each path; matching while walking lets ignored directories be pruned
+        path_matches = re.compile("(?:^|/)" + translate_glob(file_pattern) + "$").search
+        candidates = (
+            path for path in self.file_context.iter_workspace_files()
+            if path_matches(path.relative_to(self.workspace_path).as_posix())
+        )
         
         try:
-            for file_path in self.workspace_path.rglob(file_pattern):
-                if (file_path.is_file() and 
-                    self.config.is_file_allowed(file_path) and
-                    file_path.stat().st_size <= self.config.max_file_size):
+            for file_path in candidates:
+                if (file_path.stat().st_size <= self.config.max_file_size and
+                        not file_classifier.is_binary(file_path)):
                     
+                    rel_path = str(file_path.relative_to(self.workspace_path))
                     try:
-                        content = self.file_context.get_file_content(
-                            str(file_path.relative_to(self.workspace_path))
-                        )
-                        
-                        for line_num, line in enumerate(content.splitlines(), 1):
-                            if regex.search(line):
-                                results.append({
-                                    "file": str(file_path.relative_to(self.workspace_path)),
-                                    "line": line_num,
-                                    "content": line.strip()
-                                })
-                                
-                                if len(results) >= max_results:
-                                    return results
-                                    
+                        content = self.file_context.get_file_content(rel_path)
                     except Exception as e:
                         logger.warning(f"Error reading file {file_path}: {e}")
                         continue
+                    
+                    for line_num, line in enumerate(content.splitlines(), 1):
+                        if regex.search(line):
+                            yield {
+                                "file": rel_path,
+                                "line": line_num,
+                                "content": line.strip()
+                            }
                         
         except Exception as e:
             logger.error(f"Error during grep: {e}")
-        
-        return results
\ No newline at end of file
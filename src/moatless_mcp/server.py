@@ -6,48 +6,150 @@ Moatless MCP Server - Enhanced implementation with semantic search support
 import asyncio
 import logging
 import sys
+import weakref
 from pathlib import Path
 from typing import Any, Optional
 
 import anyio
 from mcp import stdio_server
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 from mcp.types import (
-    ServerCapabilities,
-    ToolsCapability,
     Tool,
     TextContent,
     CallToolResult,
 )
 
+from moatless_mcp.adapters.pool import WorkspacePool
 from moatless_mcp.tools.registry import ToolRegistry
+from moatless_mcp.transport import HTTP_TRANSPORTS, serve_http
 from moatless_mcp.adapters.workspace import WorkspaceAdapter
 from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.output import paginate_texts, render_result_texts
 
 logger = logging.getLogger(__name__)
 
+
+class MoatlessServer(Server):
+    """Server advertising tools/list_changed support by default
+    
+    The streamable HTTP session manager builds initialization options
+    without arguments, so the default has to carry our capabilities.
+    """
+    
+    def create_initialization_options(
+        self,
+        notification_options: Optional[NotificationOptions] = None,
+        experimental_capabilities: Optional[dict] = None,
+    ) -> InitializationOptions:
+        return super().create_initialization_options(
+            notification_options or NotificationOptions(tools_changed=True),
+            experimental_capabilities
+        )
+
+
 # Create global server instance
-server = Server("moatless-tools")
+server = MoatlessServer("moatless-tools", version="0.2.0")
 
-# Global state
+# Global state; workspace_adapter and tool_registry belong to the default workspace
+workspace_pool: Optional[WorkspacePool] = None
 workspace_adapter: Optional[WorkspaceAdapter] = None
 tool_registry: Optional[ToolRegistry] = None
 
+# Sessions that have talked to us, used for tools/list_changed notifications
+_active_sessions: "weakref.WeakSet" = weakref.WeakSet()
+
+# Workspace each session last selected with the workspace argument
+_session_workspaces: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+# Tool argument selecting the workspace when several are hosted
+WORKSPACE_ARGUMENT = "workspace"
+WORKSPACE_ARGUMENT_SCHEMA = {
+    "type": "string",
+    "description": "Workspace to run in (path under an allowed root). Remembered for later calls in this session; defaults to the server's workspace"
+}
 
-async def init_server(workspace_path: str) -> None:
+
+def _create_registry(adapter: WorkspaceAdapter) -> ToolRegistry:
+    extra_arguments = None
+    if adapter.config.workspace_roots:
+        extra_arguments = {WORKSPACE_ARGUMENT: WORKSPACE_ARGUMENT_SCHEMA}
+    
+    registry = ToolRegistry(adapter, extra_arguments)
+    registry.add_change_listener(_on_tool_list_changed)
+    registry.load_plugins()
+    return registry
+
+
+async def init_server(workspace_path: str, config: Optional[Config] = None) -> None:
     """Initialize the server with workspace"""
-    global workspace_adapter, tool_registry
+    global workspace_pool, workspace_adapter, tool_registry
     
-    config = Config()
-    workspace_adapter = WorkspaceAdapter(workspace_path, config)
+    config = config or Config.from_env()
+    if workspace_pool is not None:
+        workspace_pool.close_all()
+    workspace_pool = WorkspacePool(config, _create_registry)
     
     # Vector index is now built on-demand using the build_vector_index tool
     logger.info("Server initialized with on-demand vector index building")
     
-    tool_registry = ToolRegistry(workspace_adapter)
+    default = workspace_pool.open_pinned(workspace_path)
+    workspace_adapter = default.adapter
+    tool_registry = default.registry
     
     logger.info(f"🚀 Initialized Moatless MCP Server with workspace: {workspace_path}")
+    if config.workspace_roots:
+        logger.info(f"📂 Serving additional workspaces under: {', '.join(config.workspace_roots)}")
+
+
+def _current_session() -> Optional[Any]:
+    try:
+        return server.request_context.session
+    except LookupError:
+        # Called outside of a request (e.g. directly from tests)
+        return None
+
+
+def _track_session() -> None:
+    """Remember the session of the current request for later notifications"""
+    session = _current_session()
+    if session is not None:
+        _active_sessions.add(session)
+
+
+def _select_workspace(requested: Optional[str]) -> str:
+    """Pick the workspace for this request, binding it to the session if given"""
+    session = _current_session()
+    
+    if requested:
+        resolved = str(workspace_pool.resolve(requested))
+        if session is not None:
+            _session_workspaces[session] = resolved
+        return resolved
+    
+    if session is not None and session in _session_workspaces:
+        return _session_workspaces[session]
+    
+    return str(workspace_adapter.workspace_path)
+
+
+def _on_tool_list_changed() -> None:
+    """Notify connected clients that the tool list has changed"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    
+    for session in list(_active_sessions):
+        loop.create_task(_send_tool_list_changed(session))
+
+
+async def _send_tool_list_changed(session) -> None:
+    try:
+        await session.send_tool_list_changed()
+    except Exception as e:
+        logger.debug(f"Failed to send tools/list_changed notification: {e}")
+        _active_sessions.discard(session)
 
 
 @server.list_tools()
@@ -56,8 +158,14 @@ async def handle_list_tools() -> list[Tool]:
     if not tool_registry:
         raise RuntimeError("Server not initialized")
     
-    tools = tool_registry.get_tools()
-    logger.debug(f"Listed {len(tools)} tools")
+    _track_session()
+    registry = tool_registry
+    session = _current_session()
+    bound = _session_workspaces.get(session) if session is not None else None
+    if bound and bound in workspace_pool:
+        registry = workspace_pool.get(bound).registry
+    tools = registry.get_tools()
+    logger.debug("Listed %d tools", len(tools))
     
     return tools
 
@@ -68,30 +176,20 @@ async def handle_call_tool(name: str, arguments: dict | None = None) -> list[Tex
     if not tool_registry:
         raise RuntimeError("Server not initialized")
     
-    arguments = arguments or {}
+    _track_session()
+    arguments = dict(arguments or {})
+    requested_workspace = arguments.pop(WORKSPACE_ARGUMENT, None)
     logger.info(f"Executing tool: {name} with args: {arguments}")
     
     try:
-        result = await tool_registry.execute_tool(name, arguments)
-        
-        content = []
-        
-        if result.message:
-            content.append(TextContent(
-                type="text",
-                text=result.message
-            ))
-        
-        # Add any additional properties as text
-        if hasattr(result, 'properties') and result.properties:
-            for key, value in result.properties.items():
-                if key != 'message':
-                    content.append(TextContent(
-                        type="text",
-                        text=f"{key}: {value}"
-                    ))
+        with workspace_pool.acquire(_select_workspace(requested_workspace)) as workspace:
+            result = await workspace.registry.execute_tool(name, arguments)
+            
+            adapter = workspace.adapter
+            texts = render_result_texts(result.message, result.properties, adapter.config)
+            texts = paginate_texts(texts, adapter.config.max_response_chars, adapter.cursors)
         
-        return content
+        return [TextContent(type="text", text=text) for text in texts]
         
     except Exception as e:
         error_msg = f"Tool execution failed for '{name}': {str(e)}"
@@ -140,6 +238,50 @@ Examples:
         type=str,
         help="OpenAI API key for embeddings (deprecated, use --jina-api-key instead). Can also be set via OPENAI_API_KEY environment variable"
     )
+    parser.add_argument(
+        "--output-mode",
+        choices=["text", "structured"],
+        help="How tool result properties are returned: one 'key: value' block each (text) or a single JSON document (structured). Can also be set via MOATLESS_OUTPUT_MODE"
+    )
+    parser.add_argument(
+        "--max-response-chars",
+        type=int,
+        help="Response size budget in characters; larger responses are paginated via the fetch_page tool (0 disables)"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", *HTTP_TRANSPORTS],
+        default="stdio",
+        help="Transport to serve: stdio for a single client, or sse / streamable-http to share one workspace between many clients (default: stdio)"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Host to bind for HTTP transports (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port to bind for HTTP transports (default: 8000)"
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        help="Maximum established HTTP client sessions; new sessions beyond it get a 503 (0 disables). Can also be set via MOATLESS_MAX_CONNECTIONS"
+    )
+    parser.add_argument(
+        "--workspace-root",
+        action="append",
+        dest="workspace_roots",
+        help="Directory whose subdirectories clients may open as workspaces via the 'workspace' tool argument (repeatable). Can also be set via MOATLESS_WORKSPACE_ROOTS"
+    )
+    parser.add_argument(
+        "--max-workspaces",
+        type=int,
+        help="Maximum number of workspaces kept open; the least recently used are closed first (default: 8)"
+    )
     parser.add_argument(
         "--debug", 
         action="store_true", 
@@ -175,9 +317,21 @@ Examples:
     
     logger.info(f"🔧 Starting Moatless MCP Server with workspace: {workspace_path}")
     
+    config = Config.from_env()
+    if args.output_mode:
+        config.output_mode = args.output_mode
+    if args.max_response_chars is not None:
+        config.max_response_chars = args.max_response_chars
+    if args.max_connections is not None:
+        config.max_connections = args.max_connections
+    if args.workspace_roots:
+        config.workspace_roots = args.workspace_roots
+    if args.max_workspaces is not None:
+        config.max_workspaces = args.max_workspaces
+    
     # Initialize server
     try:
-        await init_server(str(workspace_path))
+        await init_server(str(workspace_path), config)
         logger.info("💡 Use 'build_vector_index' tool to create semantic search index when needed")
     except Exception as e:
         logger.error(f"❌ Failed to initialize server: {e}")
@@ -185,16 +339,19 @@ Examples:
     
     try:
         # Run the MCP server
-        async with stdio_server() as streams:
-            await server.run(
-                *streams,
-                InitializationOptions(
-                    server_name="moatless-tools",
-                    server_version="0.2.0",
-                    capabilities=ServerCapabilities(
-                        tools=ToolsCapability(listChanged=True)
-                    )
-                )
+        init_options = server.create_initialization_options()
+        if args.transport == "stdio":
+            async with stdio_server() as streams:
+                await server.run(*streams, init_options)
+        else:
+            await serve_http(
+                server,
+                init_options,
+                args.transport,
+                host=args.host,
+                port=args.port,
+                max_connections=config.max_connections,
+                log_level="debug" if args.debug else "info"
             )
     except KeyboardInterrupt:
         logger.info("🛑 Server stopped by user")
@@ -1,25 +1,48 @@
 """Advanced code search tools for MCP server."""
 
 import logging
-import os
 import re
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.file_types import file_classifier
+from moatless_mcp.utils.globbing import compile_glob
+from moatless_mcp.utils.line_index import LineIndex
 
 # Import our own tree-sitter backend
 try:
-    from moatless_mcp.treesitter import CodeParser, detect_language, is_tree_sitter_available
+    from moatless_mcp.treesitter import (
+        REFERENCE_KINDS, CodeParser, detect_language, extract_references, get_code_parser,
+        is_tree_sitter_available, reference_indexes, span_index_cache, symbol_search_indexes,
+        symbol_table_cache
+    )
     TREE_SITTER_AVAILABLE = is_tree_sitter_available()
 except ImportError as e:
     logging.debug(f"Tree-sitter parsing not available: {e}")
     CodeParser = None
     detect_language = None
+    get_code_parser = None
+    span_index_cache = None
+    symbol_table_cache = None
+    symbol_search_indexes = None
+    REFERENCE_KINDS = ()
+    extract_references = None
+    reference_indexes = None
     TREE_SITTER_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Kinds accepted by find_symbols; 'function' also matches methods, as in find_function
+SYMBOL_KINDS = ("class", "function", "method", "any")
+
+
+def _kind_matches(symbol_kind: str, requested: str) -> bool:
+    if requested == "any" or requested == symbol_kind:
+        return True
+    return requested == "function" and symbol_kind == "method"
+
 
 class AdvancedSearchTools:
     """Advanced code search functionality."""
@@ -47,62 +70,19 @@ class AdvancedSearchTools:
             clean_class_name = class_name.split(".")[-1] if "." in class_name else class_name
             
             results = []
-            search_paths = []
             
-            # Determine search paths
-            if file_pattern:
-                # Use glob pattern to find matching files
-                try:
-                    search_paths = list(self.workspace_root.glob(file_pattern))
-                except Exception as e:
-                    logger.warning(f"Invalid file pattern {file_pattern}: {e}")
-                    search_paths = []
+            # Use tree-sitter parser if available
+            parser = get_code_parser() if TREE_SITTER_AVAILABLE else None
             
-            if not search_paths:
-                # Search all allowed files
-                search_paths = []
-                for root, dirs, files in os.walk(self.workspace_root):
-                    for file in files:
-                        file_path = Path(root) / file
-                        if self.config.is_file_allowed(file_path):
-                            search_paths.append(file_path)
+            def search_file(file_path: Path) -> List[Dict]:
+                file_results = []
+                self._find_class_in_file(parser, file_path, clean_class_name, file_results)
+                return file_results
             
-            # Use tree-sitter parser if available
-            if TREE_SITTER_AVAILABLE:
-                parser = CodeParser()
-                
-                for file_path in search_paths:
-                    if not self.config.is_file_allowed(file_path):
-                        continue
-                    
-                    try:
-                        # Use tree-sitter to find classes
-                        classes = parser.find_classes(str(file_path), clean_class_name)
-                        
-                        for class_def in classes:
-                            # Extract the class definition line
-                            lines = class_def.text.split('\n')
-                            class_line = lines[0].strip() if lines else ""
-                            
-                            results.append({
-                                "file_path": str(file_path.relative_to(self.workspace_root)),
-                                "line_number": class_def.start_line,
-                                "class_definition": class_line,
-                                "match_text": class_line,
-                                "language": detect_language(str(file_path)) if detect_language else "unknown",
-                                "tree_sitter": True
-                            })
-                    
-                    except Exception as e:
-                        logger.debug(f"Tree-sitter parsing failed for {file_path}: {e}")
-                        # Fall back to regex for this file
-                        self._find_class_regex(file_path, clean_class_name, results)
-            else:
-                # Fallback to regex search
-                for file_path in search_paths:
-                    if not self.config.is_file_allowed(file_path):
-                        continue
-                    self._find_class_regex(file_path, clean_class_name, results)
+            # Files are read and parsed on the I/O pool, several at a time
+            search_paths = self._search_paths(file_pattern)
+            async for file_results in self.config.io_executor.imap(search_file, search_paths):
+                results.extend(file_results)
             
             return {
                 "class_name": clean_class_name,
@@ -116,19 +96,51 @@ class AdvancedSearchTools:
             logger.error(f"Error in find_class: {e}")
             return {"error": f"Search failed: {str(e)}"}
     
-    def _find_class_regex(self, file_path: Path, class_name: str, results: List[Dict]):
+    def _find_class_in_file(self, parser: Optional[CodeParser], file_path: Path,
+                            class_name: str, results: List[Dict]):
+        """Find class definitions in one file, with tree-sitter when a parser is given."""
+        if parser is None:
+            self._find_class_regex(file_path, class_name, results)
+            return
+        
+        try:
+            # Use tree-sitter to find classes
+            classes = parser.find_classes(str(file_path), class_name)
+            
+            for class_def in classes:
+                # Extract the class definition line
+                class_line = class_def.first_line.strip()
+                
+                results.append({
+                    "file_path": str(file_path.relative_to(self.workspace_root)),
+                    "line_number": class_def.start_line,
+                    "class_definition": class_line,
+                    "match_text": class_line,
+                    "language": detect_language(str(file_path)) if detect_language else "unknown",
+                    "tree_sitter": True
+                })
+        
+        except Exception as e:
+            logger.debug(f"Tree-sitter parsing failed for {file_path}: {e}")
+            # Fall back to regex for this file
+            self._find_class_regex(file_path, class_name, results)
+    
+    def _find_class_regex(self, file_path: Path, class_name: str, results: List[Dict],
+                          content: Optional[str] = None):
         """Fallback regex-based class finding."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if content is None:
+                content = file_classifier.read_text(file_path)
+            if content is None:
+                return
             
             class_pattern = re.compile(rf'^\s*class\s+{re.escape(class_name)}\s*[\(:]', re.MULTILINE)
             matches = list(class_pattern.finditer(content))
+            line_index = LineIndex(content)
             
             for match in matches:
-                line_num = content[:match.start()].count('\n') + 1
-                lines = content.split('\n')
-                class_line = lines[line_num - 1].strip() if line_num <= len(lines) else ""
+                line_num = line_index.line_of(match.start())
+                class_line = line_index.line_text(line_num).strip()
                 
                 results.append({
                     "file_path": str(file_path.relative_to(self.workspace_root)),
@@ -158,66 +170,19 @@ class AdvancedSearchTools:
             
             clean_function_name = function_name.strip()
             results = []
-            search_paths = []
             
-            # Determine search paths
-            if file_pattern:
-                try:
-                    search_paths = list(self.workspace_root.glob(file_pattern))
-                except Exception as e:
-                    logger.warning(f"Invalid file pattern {file_pattern}: {e}")
-                    search_paths = []
+            # Use tree-sitter parser if available
+            parser = get_code_parser() if TREE_SITTER_AVAILABLE else None
             
-            if not search_paths:
-                search_paths = []
-                for root, dirs, files in os.walk(self.workspace_root):
-                    for file in files:
-                        file_path = Path(root) / file
-                        if self.config.is_file_allowed(file_path):
-                            search_paths.append(file_path)
+            def search_file(file_path: Path) -> List[Dict]:
+                file_results = []
+                self._find_function_in_file(parser, file_path, clean_function_name, file_results)
+                return file_results
             
-            # Use tree-sitter parser if available
-            if TREE_SITTER_AVAILABLE:
-                parser = CodeParser()
-                
-                for file_path in search_paths:
-                    if not self.config.is_file_allowed(file_path):
-                        continue
-                    
-                    try:
-                        # Use tree-sitter to find functions
-                        functions = parser.find_functions(str(file_path), clean_function_name)
-                        
-                        for func_def in functions:
-                            # Extract the function definition line
-                            lines = func_def.text.split('\n')
-                            func_line = lines[0].strip() if lines else ""
-                            
-                            # Determine if it's a method (has parent class)
-                            func_type = "method" if func_def.parent else "function"
-                            
-                            results.append({
-                                "file_path": str(file_path.relative_to(self.workspace_root)),
-                                "line_number": func_def.start_line,
-                                "function_definition": func_line,
-                                "match_text": func_line,
-                                "language": detect_language(str(file_path)) if detect_language else "unknown",
-                                "function_type": func_type,
-                                "parent_class": func_def.parent.name if func_def.parent else None,
-                                "parameters": func_def.parameters if hasattr(func_def, 'parameters') else [],
-                                "tree_sitter": True
-                            })
-                    
-                    except Exception as e:
-                        logger.debug(f"Tree-sitter parsing failed for {file_path}: {e}")
-                        # Fall back to regex for this file
-                        self._find_function_regex(file_path, clean_function_name, results)
-            else:
-                # Fallback to regex search
-                for file_path in search_paths:
-                    if not self.config.is_file_allowed(file_path):
-                        continue
-                    self._find_function_regex(file_path, clean_function_name, results)
+            # Files are read and parsed on the I/O pool, several at a time
+            search_paths = self._search_paths(file_pattern)
+            async for file_results in self.config.io_executor.imap(search_file, search_paths):
+                results.extend(file_results)
             
             # Remove duplicates (same file and line)
             unique_results = []
@@ -240,11 +205,49 @@ class AdvancedSearchTools:
             logger.error(f"Error in find_function: {e}")
             return {"error": f"Search failed: {str(e)}"}
     
-    def _find_function_regex(self, file_path: Path, function_name: str, results: List[Dict]):
+    def _find_function_in_file(self, parser: Optional[CodeParser], file_path: Path,
+                               function_name: str, results: List[Dict]):
+        """Find function definitions in one file, with tree-sitter when a parser is given."""
+        if parser is None:
+            self._find_function_regex(file_path, function_name, results)
+            return
+        
+        try:
+            # Use tree-sitter to find functions
+            functions = parser.find_functions(str(file_path), function_name)
+            
+            for func_def in functions:
+                # Extract the function definition line
+                func_line = func_def.first_line.strip()
+                
+                # Determine if it's a method (has parent class)
+                func_type = "method" if func_def.parent else "function"
+                
+                results.append({
+                    "file_path": str(file_path.relative_to(self.workspace_root)),
+                    "line_number": func_def.start_line,
+                    "function_definition": func_line,
+                    "match_text": func_line,
+                    "language": detect_language(str(file_path)) if detect_language else "unknown",
+                    "function_type": func_type,
+                    "parent_class": func_def.parent.name if func_def.parent else None,
+                    "parameters": func_def.parameters if hasattr(func_def, 'parameters') else [],
+                    "tree_sitter": True
+                })
+        
+        except Exception as e:
+            logger.debug(f"Tree-sitter parsing failed for {file_path}: {e}")
+            # Fall back to regex for this file
+            self._find_function_regex(file_path, function_name, results)
+    
+    def _find_function_regex(self, file_path: Path, function_name: str, results: List[Dict],
+                             content: Optional[str] = None):
         """Fallback regex-based function finding."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if content is None:
+                content = file_classifier.read_text(file_path)
+            if content is None:
+                return
             
             # Search for function definitions (supports multiple languages)
             patterns = [
@@ -260,12 +263,12 @@ class AdvancedSearchTools:
                 (re.compile(rf'^\s*\w+\s+{re.escape(function_name)}\s*\(', re.MULTILINE), "c_cpp"),
             ]
             
+            line_index = LineIndex(content)
             for pattern, lang in patterns:
                 matches = list(pattern.finditer(content))
                 for match in matches:
-                    line_num = content[:match.start()].count('\n') + 1
-                    lines = content.split('\n')
-                    function_line = lines[line_num - 1].strip() if line_num <= len(lines) else ""
+                    line_num = line_index.line_of(match.start())
+                    function_line = line_index.line_text(line_num).strip()
                     
                     results.append({
                         "file_path": str(file_path.relative_to(self.workspace_root)),
@@ -282,6 +285,392 @@ class AdvancedSearchTools:
         except Exception as e:
             logger.debug(f"Error reading file {file_path}: {e}")
     
+    async def find_symbols(self, queries: List[Any], file_pattern: Optional[str] = None) -> Dict[str, Any]:
+        """Find the definitions of many symbols in one pass over the codebase.
+        
+        Each file is read and parsed once for all names, and its symbol
+        table is cached until the file changes, so a batch of names costs
+        about as much as a single find_class or find_function call.
+        
+        Args:
+            queries: Names to find, each a string or a dict with "name" and an
+                optional "kind" (class, function, method or any). Dotted names
+                such as "Outer.method" match by qualified name.
+            file_pattern: Optional file pattern to limit search
+        
+        Returns:
+            Dictionary with the matches grouped by queried name
+        """
+        try:
+            wanted: Dict[str, List[tuple]] = {}
+            names: List[str] = []
+            for query in queries or []:
+                if isinstance(query, str):
+                    name, kind = query, "any"
+                elif isinstance(query, dict):
+                    name, kind = query.get("name") or "", query.get("kind") or "any"
+                else:
+                    return {"error": f"Invalid symbol query: {query!r}"}
+                name = name.strip()
+                if not name:
+                    return {"error": "Symbol name cannot be empty"}
+                if kind not in SYMBOL_KINDS:
+                    return {"error": f"Invalid kind '{kind}' for {name}, expected one of {', '.join(SYMBOL_KINDS)}"}
+                if name not in names:
+                    names.append(name)
+                # Candidates are looked up by unqualified name, then checked in full
+                wanted.setdefault(name.rsplit(".", 1)[-1], []).append((name, kind))
+            if not names:
+                return {"error": "At least one symbol name is required"}
+            
+            search_paths = self._search_paths(file_pattern)
+            
+            def search_file(file_path: Path) -> List[tuple]:
+                if not TREE_SITTER_AVAILABLE:
+                    return self._find_symbols_regex(file_path, wanted)
+                try:
+                    table = symbol_table_cache.get(file_path)
+                except Exception as e:
+                    logger.debug(f"Tree-sitter parsing failed for {file_path}: {e}")
+                    return self._find_symbols_regex(file_path, wanted)
+                if table is None:
+                    return []
+                
+                rel_path = str(file_path.relative_to(self.workspace_root))
+                matches = []
+                for symbol in table.symbols:
+                    for name, kind in wanted.get(symbol.name, ()):
+                        if not _kind_matches(symbol.kind, kind):
+                            continue
+                        if "." in name and not ("." + symbol.qualified_name).endswith("." + name):
+                            continue
+                        matches.append((name, {
+                            "file_path": rel_path,
+                            "line_number": symbol.start_line,
+                            "end_line": symbol.end_line,
+                            "kind": symbol.kind,
+                            "qualified_name": symbol.qualified_name,
+                            "definition": symbol.signature,
+                            "language": table.language,
+                            "parent_class": symbol.parent,
+                            "parameters": list(symbol.parameters),
+                            "tree_sitter": True
+                        }))
+                return matches
+            
+            grouped: Dict[str, List[Dict]] = {name: [] for name in names}
+            seen = set()
+            # Files are read and parsed on the I/O pool, several at a time
+            async for matches in self.config.io_executor.imap(search_file, search_paths):
+                for name, match in matches:
+                    key = (name, match["file_path"], match["line_number"], match["kind"])
+                    if key not in seen:
+                        seen.add(key)
+                        grouped[name].append(match)
+            
+            return {
+                "results": grouped,
+                "not_found": [name for name in names if not grouped[name]],
+                "total_matches": sum(len(matches) for matches in grouped.values()),
+                "files_searched": len(search_paths),
+                "search_pattern": file_pattern,
+                "tree_sitter_used": TREE_SITTER_AVAILABLE
+            }
+            
+        except Exception as e:
+            logger.error(f"Error in find_symbols: {e}")
+            return {"error": f"Search failed: {str(e)}"}
+    
+    async def search_symbols(self, query: str, kind: str = "any", limit: int = 10,
+                             near: Optional[str] = None, file_pattern: Optional[str] = None) -> Dict[str, Any]:
+        """Rank definitions by how closely their names match a partial or misspelt query.
+        
+        Searches a trigram index over every definition in the workspace. The
+        index is kept per workspace and brought up to date before each query
+        by re-parsing only the files changed since the last one.
+        
+        Args:
+            query: Full, partial or misspelt name; "Class.method" prefers methods of that class
+            kind: class, function, method or any
+            limit: Maximum number of results
+            near: Optional workspace-relative path; definitions close to it rank higher
+            file_pattern: Optional file pattern to limit search
+        
+        Returns:
+            Dictionary with the best matches, best first
+        """
+        try:
+            if not query or not query.strip():
+                return {"error": "Query cannot be empty"}
+            if kind not in SYMBOL_KINDS:
+                return {"error": f"Invalid kind '{kind}', expected one of {', '.join(SYMBOL_KINDS)}"}
+            if not TREE_SITTER_AVAILABLE:
+                return {"error": "Symbol search requires tree-sitter"}
+            
+            started = time.perf_counter()
+            index = symbol_search_indexes.get(str(self.workspace_root.resolve()))
+            
+            def load_table(file_path: Path) -> tuple:
+                rel_path = file_path.relative_to(self.workspace_root).as_posix()
+                try:
+                    return rel_path, symbol_table_cache.get(file_path)
+                except Exception as e:
+                    logger.debug(f"Tree-sitter parsing failed for {file_path}: {e}")
+                    return rel_path, None
+            
+            # Unchanged files are answered from the table cache after a stat
+            indexed = []
+            async for rel_path, table in self.config.io_executor.imap(load_table, self._search_paths(None)):
+                index.update(rel_path, table)
+                indexed.append(rel_path)
+            index.retain(indexed)
+            refreshed = time.perf_counter()
+            
+            kinds = [k for k in ("class", "function", "method") if _kind_matches(k, kind)]
+            path_filter = compile_glob(file_pattern).match if file_pattern else None
+            matches = index.search(query, limit=max(1, limit), kinds=kinds, near=near, path_filter=path_filter)
+            
+            return {
+                "query": query,
+                "results": [{
+                    "score": match.score,
+                    "name": match.symbol.name,
+                    "qualified_name": match.symbol.qualified_name,
+                    "kind": match.symbol.kind,
+                    "file_path": match.file_path,
+                    "line_number": match.symbol.start_line,
+                    "end_line": match.symbol.end_line,
+                    "definition": match.symbol.signature
+                } for match in matches],
+                "total_matches": len(matches),
+                "symbols_indexed": len(index),
+                "refresh_ms": round((refreshed - started) * 1000, 1),
+                "search_ms": round((time.perf_counter() - refreshed) * 1000, 1)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error in search_symbols: {e}")
+            return {"error": f"Search failed: {str(e)}"}
+    
+    async def find_references(self, symbol: str, kinds: Optional[List[str]] = None,
+                              direction: str = "references", file_pattern: Optional[str] = None,
+                              limit: int = 100) -> Dict[str, Any]:
+        """Find where a symbol is used, or what a definition calls.
+        
+        Answers from a workspace reference index that is saved between
+        sessions and refreshed before each query by re-parsing only the
+        files changed since. References are matched by name, so the
+        method name in "Class.method" matches calls on any receiver.
+        
+        Args:
+            symbol: Name to look up; "Class.method" narrows callees to that definition
+            kinds: Reference kinds to include (call, import, inherit, attr); all by default,
+                calls only for callees
+            direction: "references" for uses of the symbol, "callees" for the calls
+                made inside its definitions
+            file_pattern: Optional file pattern limiting the files reported
+            limit: Maximum number of references returned
+        
+        Returns:
+            Dictionary with the references, each with its enclosing definition and source line
+        """
+        try:
+            if not symbol or not symbol.strip():
+                return {"error": "Symbol cannot be empty"}
+            if direction not in ("references", "callees"):
+                return {"error": f"Invalid direction '{direction}', expected references or callees"}
+            if not TREE_SITTER_AVAILABLE:
+                return {"error": "Reference search requires tree-sitter"}
+            invalid = [kind for kind in kinds or () if kind not in REFERENCE_KINDS]
+            if invalid:
+                return {"error": f"Invalid kinds {invalid}, expected any of {', '.join(REFERENCE_KINDS)}"}
+            
+            symbol = symbol.strip()
+            name = symbol.rsplit(".", 1)[-1]
+            kinds = set(kinds) if kinds else ({"call"} if direction == "callees" else None)
+            path_filter = compile_glob(file_pattern).match if file_pattern else None
+            
+            started = time.perf_counter()
+            index = reference_indexes.get(self.workspace_root.resolve(), self.config.index_cache_path)
+            indexed = await self._refresh_references(index)
+            refreshed = time.perf_counter()
+            
+            if direction == "references":
+                found = [
+                    (file_path, ref.name, ref.line, ref.kind)
+                    for file_path, ref in index.lookup(name, kinds)
+                    if path_filter is None or path_filter(file_path)
+                ]
+            else:
+                found = []
+                for file_path, definition in await self._find_definitions(symbol, indexed):
+                    found.extend(
+                        (file_path, ref.name, ref.line, ref.kind)
+                        for ref in index.in_range(file_path, definition.start_line, definition.end_line, kinds)
+                        if path_filter is None or path_filter(file_path)
+                    )
+            
+            results = await self._describe_references(found[:max(1, limit)])
+            return {
+                "symbol": symbol,
+                "direction": direction,
+                "results": results,
+                "total_matches": len(found),
+                "truncated": len(found) > len(results),
+                "files_indexed": index.file_count,
+                "refresh_ms": round((refreshed - started) * 1000, 1),
+                "search_ms": round((time.perf_counter() - refreshed) * 1000, 1)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error in find_references: {e}")
+            return {"error": f"Search failed: {str(e)}"}
+    
+    async def _refresh_references(self, index) -> List[Path]:
+        """Re-parse the files changed since the index was saved; returns the files indexed."""
+        await self.config.io_executor.run(index.ensure_loaded)
+        
+        def scan(file_path: Path) -> tuple:
+            rel_path = file_path.relative_to(self.workspace_root).as_posix()
+            try:
+                stat = file_path.stat()
+            except OSError:
+                return rel_path, None, None, True
+            fingerprint = f"{stat.st_mtime_ns}:{stat.st_size}"
+            if index.is_current(rel_path, fingerprint):
+                return rel_path, fingerprint, None, False
+            try:
+                content = file_classifier.read_text(file_path)
+                references = extract_references(str(file_path), content) if content is not None else None
+            except Exception as e:
+                logger.debug(f"Reference extraction failed for {file_path}: {e}")
+                references = None
+            return rel_path, fingerprint, references, True
+        
+        paths = self._search_paths(None)
+        indexed = []
+        async for rel_path, fingerprint, references, changed in self.config.io_executor.imap(scan, paths):
+            if changed:
+                index.update(rel_path, fingerprint, references)
+            if fingerprint is not None:
+                indexed.append(rel_path)
+        index.retain(indexed)
+        await self.config.io_executor.run(index.save)
+        return [self.workspace_root / rel_path for rel_path in indexed]
+    
+    async def _find_definitions(self, symbol: str, paths: List[Path]) -> List[tuple]:
+        """(path, symbol) of every definition named symbol, matching dotted names by qualified name."""
+        name = symbol.rsplit(".", 1)[-1]
+        
+        def definitions(file_path: Path) -> List[tuple]:
+            try:
+                table = symbol_table_cache.get(file_path)
+            except Exception as e:
+                logger.debug(f"Tree-sitter parsing failed for {file_path}: {e}")
+                return []
+            if table is None:
+                return []
+            rel_path = file_path.relative_to(self.workspace_root).as_posix()
+            return [
+                (rel_path, definition) for definition in table.symbols
+                if definition.name == name and ("." + definition.qualified_name).endswith("." + symbol)
+            ]
+        
+        found = []
+        async for matches in self.config.io_executor.imap(definitions, paths):
+            found.extend(matches)
+        return found
+    
+    async def _describe_references(self, found: List[tuple]) -> List[Dict[str, Any]]:
+        """Reference dicts with the enclosing definition and source line of each reference."""
+        by_file: Dict[str, List[tuple]] = {}
+        for entry in found:
+            by_file.setdefault(entry[0], []).append(entry)
+        
+        def describe(file_path: str) -> List[Dict[str, Any]]:
+            full_path = self.workspace_root / file_path
+            try:
+                table = symbol_table_cache.get(full_path)
+                content = file_classifier.read_text(full_path) or ""
+            except Exception as e:
+                logger.debug(f"Error reading file {full_path}: {e}")
+                table, content = None, ""
+            line_index = LineIndex(content)
+            described = []
+            for _, name, line, kind in by_file[file_path]:
+                # The innermost definition containing the line, if any
+                enclosing = None
+                for definition in table.symbols if table is not None else ():
+                    if definition.start_line <= line <= definition.end_line:
+                        if enclosing is None or definition.start_line >= enclosing.start_line:
+                            enclosing = definition
+                described.append({
+                    "name": name,
+                    "file_path": file_path,
+                    "line_number": line,
+                    "kind": kind,
+                    "enclosing": enclosing.qualified_name if enclosing is not None else None,
+                    "code": line_index.line_text(line).strip()
+                })
+            return described
+        
+        results = []
+        async for described in self.config.io_executor.imap(describe, list(by_file)):
+            results.extend(described)
+        return results
+    
+    def _search_paths(self, file_pattern: Optional[str]) -> List[Path]:
+        """Allowed files matching file_pattern, or all allowed files."""
+        search_paths = []
+        if file_pattern:
+            try:
+                search_paths = list(self.workspace_root.glob(file_pattern))
+            except Exception as e:
+                logger.warning(f"Invalid file pattern {file_pattern}: {e}")
+                search_paths = []
+        
+        if not search_paths:
+            policy = self.config.path_policy_for(self.workspace_root)
+            search_paths = list(policy.iter_files(self.workspace_root))
+        
+        return [p for p in search_paths if self.config.is_file_allowed(p)]
+    
+    def _find_symbols_regex(self, file_path: Path, wanted: Dict[str, List[tuple]]) -> List[tuple]:
+        """Fallback regex-based symbol finding, reading the file once for all names."""
+        try:
+            content = file_classifier.read_text(file_path)
+        except Exception as e:
+            logger.debug(f"Error reading file {file_path}: {e}")
+            return []
+        if content is None:
+            return []
+        
+        matches = []
+        for short_name, requested in wanted.items():
+            kinds = {kind for _, kind in requested}
+            found = []
+            if kinds & {"class", "any"}:
+                self._find_class_regex(file_path, short_name, found, content)
+            if kinds - {"class"}:
+                self._find_function_regex(file_path, short_name, found, content)
+            for result in found:
+                kind = "class" if "class_definition" in result else "function"
+                for name, requested_kind in requested:
+                    if _kind_matches(kind, requested_kind) and "." not in name:
+                        matches.append((name, {
+                            "file_path": result["file_path"],
+                            "line_number": result["line_number"],
+                            "end_line": result["line_number"],
+                            "kind": kind,
+                            "qualified_name": short_name,
+                            "definition": result.get("class_definition") or result.get("function_definition"),
+                            "language": result["language"],
+                            "parent_class": None,
+                            "parameters": [],
+                            "tree_sitter": False
+                        }))
+        return matches
+    
     async def view_code(self, file_path: str, start_line: Optional[int] = None, 
                        end_line: Optional[int] = None, span_ids: Optional[List[str]] = None) -> Dict[str, Any]:
         """View specific code sections with intelligent context.
@@ -306,12 +695,15 @@ class AdvancedSearchTools:
             if not full_path.is_file():
                 return {"error": f"Path is not a file: {file_path}"}
             
-            # Read file content
+            # Read file content; the mtime is taken first so the span index
+            # cached for it never describes newer content
             try:
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                mtime_ns = full_path.stat().st_mtime_ns
+                content = await self.config.io_executor.run(file_classifier.read_text, full_path)
             except Exception as e:
                 return {"error": f"Cannot read file: {str(e)}"}
+            if content is None:
+                return {"error": f"Binary file not supported: {file_path}"}
             
             lines = content.split('\n')
             total_lines = len(lines)
@@ -324,19 +716,33 @@ class AdvancedSearchTools:
             
             # Handle span_ids (enhanced implementation)
             if span_ids:
+                # One parse in the file's own language resolves every span_id
+                span_index = None
+                if TREE_SITTER_AVAILABLE:
+                    span_index = await self.config.io_executor.run(
+                        span_index_cache.get, full_path, content, mtime_ns
+                    )
+                
                 for span_id in span_ids:
                     found_matches = []
+                    if span_index is not None:
+                        found_matches = [
+                            (span.start_line, span.type, span.end_line)
+                            for span in span_index.lookup(span_id)
+                        ]
                     
-                    # Handle different span_id formats
-                    if '.' in span_id:
-                        # Handle ClassName.method_name format
-                        parts = span_id.split('.')
-                        if len(parts) == 2:
-                            class_name, method_name = parts
-                            found_matches.extend(self._find_class_method(content, lines, class_name, method_name))
-                    else:
-                        # Handle simple class or function names
-                        found_matches.extend(self._find_simple_span(content, lines, span_id))
+                    # Fall back to regex for languages without definition queries
+                    # and definitions the queries do not capture
+                    if not found_matches:
+                        if '.' in span_id:
+                            # Handle ClassName.method_name format
+                            parts = span_id.split('.')
+                            if len(parts) == 2:
+                                class_name, method_name = parts
+                                found_matches.extend(self._find_class_method(content, lines, class_name, method_name))
+                        else:
+                            # Handle simple class or function names
+                            found_matches.extend(self._find_simple_span(content, lines, span_id))
                     
                     # Process matches
                     for match_line, span_type, end_line in found_matches:
@@ -407,19 +813,9 @@ class AdvancedSearchTools:
             return {"error": f"Failed to view code: {str(e)}"}
     
     def _find_simple_span(self, content: str, lines: List[str], span_id: str) -> List[tuple]:
-        """Find simple class or function definitions using tree-sitter when available."""
+        """Find simple class or function definitions with regex patterns."""
         found_matches = []
         
-        # Try tree-sitter first if available
-        if TREE_SITTER_AVAILABLE:
-            try:
-                ts_matches = self._find_with_tree_sitter(content, span_id, lines)
-                if ts_matches:
-                    return ts_matches
-            except Exception as e:
-                logger.debug(f"Tree-sitter parsing failed, falling back to regex: {e}")
-        
-        # Fallback to regex patterns
         patterns = [
             (re.compile(rf'^\s*class\s+{re.escape(span_id)}\s*[\(:]', re.MULTILINE), "class"),
             (re.compile(rf'^\s*def\s+{re.escape(span_id)}\s*\(', re.MULTILINE), "function"),
@@ -433,35 +829,27 @@ class AdvancedSearchTools:
             (re.compile(rf'^\s*(?:public|private|protected|static|\s)*\s+\w+\s+{re.escape(span_id)}\s*\(', re.MULTILINE), "method"),
         ]
         
+        line_index = LineIndex(content)
         for pattern, span_type in patterns:
             matches = list(pattern.finditer(content))
             for match in matches:
-                match_line = content[:match.start()].count('\n') + 1
+                match_line = line_index.line_of(match.start())
                 end_line = self._find_block_end(lines, match_line, span_type)
                 found_matches.append((match_line, span_type, end_line))
         
         return found_matches
     
     def _find_class_method(self, content: str, lines: List[str], class_name: str, method_name: str) -> List[tuple]:
-        """Find method within a specific class."""
+        """Find method within a specific class with regex patterns."""
         found_matches = []
         
-        # Try tree-sitter first if available
-        if TREE_SITTER_AVAILABLE:
-            try:
-                ts_matches = self._find_class_method_with_tree_sitter(content, class_name, method_name)
-                if ts_matches:
-                    return ts_matches
-            except Exception as e:
-                logger.debug(f"Tree-sitter class method parsing failed, falling back to regex: {e}")
-        
-        # Fallback to regex approach
         # First, find the class
         class_pattern = re.compile(rf'^\s*class\s+{re.escape(class_name)}\s*[\(:]', re.MULTILINE)
         class_matches = list(class_pattern.finditer(content))
+        line_index = LineIndex(content)
         
         for class_match in class_matches:
-            class_start_line = content[:class_match.start()].count('\n') + 1
+            class_start_line = line_index.line_of(class_match.start())
             class_end_line = self._find_block_end(lines, class_start_line, "class")
             
             # Now find methods within this class range
@@ -471,15 +859,15 @@ class AdvancedSearchTools:
                 re.compile(rf'^\s+(?:public|private|protected|static|\s)*\s+\w+\s+{re.escape(method_name)}\s*\(', re.MULTILINE),  # Java
             ]
             
+            # Only the lines inside the class are scanned
+            class_body_start = line_index.line_start(class_start_line + 1)
             for method_pattern in method_patterns:
-                method_matches = list(method_pattern.finditer(content))
-                for method_match in method_matches:
-                    method_line = content[:method_match.start()].count('\n') + 1
-                    
-                    # Check if this method is within the class bounds
-                    if class_start_line < method_line < class_end_line:
-                        method_end_line = self._find_block_end(lines, method_line, "method")
-                        found_matches.append((method_line, "method", method_end_line))
+                for method_match in method_pattern.finditer(content, class_body_start):
+                    method_line = line_index.line_of(method_match.start())
+                    if method_line >= class_end_line:
+                        break
+                    method_end_line = self._find_block_end(lines, method_line, "method")
+                    found_matches.append((method_line, "method", method_end_line))
         
         return found_matches
     
@@ -612,143 +1000,3 @@ class AdvancedSearchTools:
             '"""', "'''", 'else:', 'elif', 'except:', 'finally:', 'catch'
         ]
         return any(stripped_line.startswith(cont) for cont in continuations)
-    
-    def _find_with_tree_sitter(self, content: str, span_id: str, lines: List[str]) -> List[tuple]:
-        """Use tree-sitter to find code blocks accurately."""
-        if not TREE_SITTER_AVAILABLE:
-            return []
-        
-        found_matches = []
-        
-        try:
-            parser = CodeParser()
-            
-            # Parse the content directly (no file path needed)
-            # Create a temporary file path for language detection
-            temp_path = "temp.py"  # Default to Python
-            
-            result = parser.parse_file(temp_path, content)
-            if not result.success:
-                return []
-            
-            # Search for matching blocks
-            for block in result.all_blocks:
-                if block.name == span_id:
-                    found_matches.append((block.start_line, block.type, block.end_line))
-            
-            return found_matches
-            
-        except Exception as e:
-            logger.debug(f"Tree-sitter parsing error: {e}")
-            return []
-    
-    def _search_blocks_recursive(self, block, span_id: str, found_matches: List[tuple]):
-        """Recursively search through code blocks."""
-        if not block:
-            return
-        
-        # Check if this block matches our span_id
-        if hasattr(block, 'identifier') and block.identifier == span_id:
-            span_type = self._convert_tree_sitter_type(block.type)
-            
-            # Get line numbers - check different possible attributes
-            start_line = getattr(block, 'start_line', 0) + 1  # Convert to 1-based
-            end_line = getattr(block, 'end_line', start_line) + 1
-            
-            # Alternative: use span if available
-            if hasattr(block, 'span') and block.span:
-                start_line = block.span.start_line + 1
-                end_line = block.span.end_line + 1
-            
-            found_matches.append((start_line, span_type, end_line))
-        
-        # Recursively search children
-        if hasattr(block, 'children'):
-            for child in block.children:
-                self._search_blocks_recursive(child, span_id, found_matches)
-        
-        # Also check if block has find_blocks method for additional search
-        if hasattr(block, 'find_blocks') and callable(block.find_blocks):
-            try:
-                for sub_block in block.find_blocks():
-                    if sub_block != block:  # Avoid infinite recursion
-                        self._search_blocks_recursive(sub_block, span_id, found_matches)
-            except:
-                pass  # Ignore errors in recursive search
-    
-    def _find_class_method_with_tree_sitter(self, content: str, class_name: str, method_name: str) -> List[tuple]:
-        """Use tree-sitter to find method within a specific class."""
-        if not TREE_SITTER_AVAILABLE:
-            return []
-        
-        found_matches = []
-        
-        try:
-            parser = CodeParser()
-            
-            # Parse the content
-            temp_path = "temp.py"  # Default to Python
-            result = parser.parse_file(temp_path, content)
-            if not result.success:
-                return []
-            
-            # Find methods using our tree-sitter backend
-            methods = parser.find_class_method(temp_path, class_name, method_name, content)
-            
-            for method in methods:
-                found_matches.append((method.start_line, "method", method.end_line))
-            
-            return found_matches
-            
-        except Exception as e:
-            logger.debug(f"Tree-sitter class method parsing error: {e}")
-            return []
-    
-    def _find_class_blocks_recursive(self, block, class_name: str, class_blocks: List):
-        """Recursively find class blocks with matching name."""
-        if not block:
-            return
-        
-        # Check if this is a matching class
-        if (hasattr(block, 'type') and hasattr(block, 'identifier') and 
-            block.identifier == class_name):
-            # Check if it's a class type (handle both enum and string representations)
-            block_type_str = str(block.type).lower() if hasattr(block, 'type') else ""
-            if 'class' in block_type_str:
-                class_blocks.append(block)
-        
-        # Recursively search children
-        if hasattr(block, 'children'):
-            for child in block.children:
-                self._find_class_blocks_recursive(child, class_name, class_blocks)
-    
-    def _find_method_in_class_recursive(self, class_block, method_name: str, method_blocks: List):
-        """Recursively find method blocks within a class."""
-        if not class_block:
-            return
-        
-        # Check if this is a matching method
-        if hasattr(class_block, 'identifier') and class_block.identifier == method_name:
-            # Check if it's a function/method type
-            block_type_str = str(class_block.type).lower() if hasattr(class_block, 'type') else ""
-            if any(t in block_type_str for t in ['function', 'method', 'constructor']):
-                method_blocks.append(class_block)
-        
-        # Recursively search children
-        if hasattr(class_block, 'children'):
-            for child in class_block.children:
-                self._find_method_in_class_recursive(child, method_name, method_blocks)
-    
-    def _convert_tree_sitter_type(self, block_type) -> str:
-        """Convert tree-sitter CodeBlockType to our span type string."""
-        if not TREE_SITTER_AVAILABLE or not block_type:
-            return "unknown"
-        
-        type_mapping = {
-            CodeBlockType.CLASS: "class",
-            CodeBlockType.FUNCTION: "function",
-            CodeBlockType.CONSTRUCTOR: "function",
-            CodeBlockType.METHOD: "method",
-        }
-        
-        return type_mapping.get(block_type, "unknown")
\ No newline at end of file
@@ -149,6 +149,269 @@ class FindFunctionTool(MCPTool):
             return self.format_error(str(e))
 
 
+class FindSymbolsTool(MCPTool):
+    """Tool for finding the definitions of many symbols at once."""
+    
+    @property
+    def name(self) -> str:
+        return "find_symbols"
+    
+    @property
+    def description(self) -> str:
+        return ("Find class, function and method definitions for several names in one search. "
+                "Prefer this over repeated find_class/find_function calls")
+    
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "symbols": {
+                    "type": "array",
+                    "description": "Symbols to find",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Symbol name, or a dotted path such as Class.method"
+                            },
+                            "kind": {
+                                "type": "string",
+                                "enum": ["class", "function", "method", "any"],
+                                "description": "Kind of definition to match (default: any; function also matches methods)"
+                            }
+                        },
+                        "required": ["name"]
+                    }
+                },
+                "file_pattern": {
+                    "type": "string",
+                    "description": "Optional file pattern to limit search"
+                }
+            },
+            "required": ["symbols"]
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute the find_symbols tool."""
+        try:
+            symbols = arguments.get("symbols")
+            file_pattern = arguments.get("file_pattern")
+            
+            if not symbols:
+                return self.format_error("symbols is required")
+            if not isinstance(symbols, list):
+                return self.format_error("symbols must be a list")
+            
+            search_tools = AdvancedSearchTools(self.workspace.config, self.workspace.workspace_path)
+            result = await search_tools.find_symbols(symbols, file_pattern)
+            
+            if "error" in result:
+                return self.format_error(result["error"])
+            
+            # Format the response, one section per queried name
+            message = f"Found {result['total_matches']} definition(s) for {len(result['results'])} symbol(s):\n"
+            for name, matches in result['results'].items():
+                message += f"\n## {name}\n"
+                if not matches:
+                    message += "   No definitions found\n"
+                for match in matches:
+                    message += f"📁 {match['file_path']}:{match['line_number']} ({match['kind']})\n"
+                    message += f"   {match['definition']}\n"
+            
+            return ToolResult(
+                success=True,
+                message=message,
+                properties=result
+            )
+        
+        except Exception as e:
+            logger.error(f"Error in find_symbols: {e}")
+            return self.format_error(str(e))
+
+
+class SearchSymbolsTool(MCPTool):
+    """Tool for fuzzy, ranked search over symbol names."""
+    
+    @property
+    def name(self) -> str:
+        return "search_symbols"
+    
+    @property
+    def description(self) -> str:
+        return ("Find definitions whose names approximately match a query, ranked best first. "
+                "Use for partial or misspelt names instead of repeated find_class/find_function calls")
+    
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Full, partial or misspelt symbol name, optionally qualified as Class.method"
+                },
+                "kind": {
+                    "type": "string",
+                    "enum": ["class", "function", "method", "any"],
+                    "description": "Kind of definition to match (default: any; function also matches methods)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results (default: 10)",
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "near": {
+                    "type": "string",
+                    "description": "Optional file path; definitions in or near it rank higher"
+                },
+                "file_pattern": {
+                    "type": "string",
+                    "description": "Optional file pattern to limit search"
+                }
+            },
+            "required": ["query"]
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute the search_symbols tool."""
+        try:
+            query = arguments.get("query")
+            if not query:
+                return self.format_error("query is required")
+            
+            limit = max(1, min(int(arguments.get("limit", 10)), 100))
+            search_tools = AdvancedSearchTools(self.workspace.config, self.workspace.workspace_path)
+            result = await search_tools.search_symbols(
+                query,
+                kind=arguments.get("kind", "any"),
+                limit=limit,
+                near=arguments.get("near"),
+                file_pattern=arguments.get("file_pattern")
+            )
+            
+            if "error" in result:
+                return self.format_error(result["error"])
+            
+            # Format the response
+            if result['results']:
+                message = f"Top {len(result['results'])} symbol(s) matching '{query}':\n\n"
+                for match in result['results']:
+                    message += f"📁 {match['file_path']}:{match['line_number']} {match['qualified_name']} ({match['kind']}, score {match['score']:.2f})\n"
+                    message += f"   {match['definition']}\n\n"
+            else:
+                message = f"No symbols matching '{query}'"
+            
+            return ToolResult(
+                success=True,
+                message=message,
+                properties=result
+            )
+            
+        except Exception as e:
+            logger.error(f"Error in search_symbols: {e}")
+            return self.format_error(str(e))
+
+
+class FindReferencesTool(MCPTool):
+    """Tool for finding the callers and usages of a symbol, or the calls it makes."""
+    
+    @property
+    def name(self) -> str:
+        return "find_references"
+    
+    @property
+    def description(self) -> str:
+        return ("Find where a symbol is called, imported, inherited from or accessed, with the enclosing "
+                "definition of each use; or, with direction 'callees', the calls made inside its definitions. "
+                "Uses a persisted reference index instead of a text search")
+    
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "Symbol name; Class.method selects that definition for callees"
+                },
+                "kinds": {
+                    "type": "array",
+                    "items": {
+                        "type": "string",
+                        "enum": ["call", "import", "inherit", "attr"]
+                    },
+                    "description": "Reference kinds to include (default: all; call for callees)"
+                },
+                "direction": {
+                    "type": "string",
+                    "enum": ["references", "callees"],
+                    "description": "references: uses of the symbol (default); callees: calls made by it"
+                },
+                "file_pattern": {
+                    "type": "string",
+                    "description": "Optional file pattern to limit the files reported"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of references (default: 100)",
+                    "minimum": 1,
+                    "maximum": 1000
+                }
+            },
+            "required": ["symbol"]
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute the find_references tool."""
+        try:
+            symbol = arguments.get("symbol")
+            if not symbol:
+                return self.format_error("symbol is required")
+            
+            limit = max(1, min(int(arguments.get("limit", 100)), 1000))
+            search_tools = AdvancedSearchTools(self.workspace.config, self.workspace.workspace_path)
+            result = await search_tools.find_references(
+                symbol,
+                kinds=arguments.get("kinds"),
+                direction=arguments.get("direction", "references"),
+                file_pattern=arguments.get("file_pattern"),
+                limit=limit
+            )
+            
+            if "error" in result:
+                return self.format_error(result["error"])
+            
+            # Format the response, grouped by file
+            if result['results']:
+                label = "call(s) made by" if result['direction'] == "callees" else "reference(s) to"
+                message = f"Found {result['total_matches']} {label} '{symbol}'"
+                if result['truncated']:
+                    message += f" (showing {len(result['results'])})"
+                message += ":\n"
+                current_file = None
+                for match in result['results']:
+                    if match['file_path'] != current_file:
+                        current_file = match['file_path']
+                        message += f"\n📁 {current_file}\n"
+                    context = f" in {match['enclosing']}" if match['enclosing'] else ""
+                    message += f"   {match['line_number']}: [{match['kind']}]{context} {match['code']}\n"
+            else:
+                message = f"No references found for '{symbol}'"
+            
+            return ToolResult(
+                success=True,
+                message=message,
+                properties=result
+            )
+            
+        except Exception as e:
+            logger.error(f"Error in find_references: {e}")
+            return self.format_error(str(e))
+
+
 class ViewCodeTool(MCPTool):
     """Tool for viewing specific code sections with intelligent context."""
     
@@ -180,7 +443,7 @@ class ViewCodeTool(MCPTool):
                 "span_ids": {
                     "type": "array",
                     "items": {"type": "string"},
-                    "description": "List of span IDs to view (class names, function names, etc.)"
+                    "description": "List of span IDs to view: class or function names, or dotted paths such as Class.method or Outer.Inner.method"
                 }
             },
             "required": ["file_path"]
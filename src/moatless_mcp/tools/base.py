@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 
 from mcp.types import Tool
 
+from moatless_mcp.utils.cursors import PagedIterator
+
 
 @dataclass
 class ToolResult:
@@ -20,6 +22,14 @@ class ToolResult:
 class MCPTool(ABC):
     """Base class for MCP tools"""
     
+    # Tools that modify the workspace run under its exclusive lock; all
+    # others share it, so concurrent clients never read a half-applied edit
+    mutates_workspace = False
+    
+    # Long-running tools that take the exclusive lock themselves, only around
+    # their final write, run without the registry holding the lock
+    manages_workspace_lock = False
+    
     def __init__(self, workspace):
         self.workspace = workspace
     
@@ -64,6 +74,24 @@ class MCPTool(ABC):
             if field not in arguments:
                 raise ValueError(f"Missing required argument: {field}")
     
+    def resume_pager(self, cursor: str, context: Dict[str, Any]) -> Optional[PagedIterator]:
+        """Return the pager parked under cursor if it was created for this query"""
+        pager = self.workspace.cursors.get(cursor, self.name)
+        if pager is None or pager.context != context:
+            return None
+        return pager
+    
+    def park_pager(self, pager: PagedIterator, cursor: Optional[str] = None) -> Optional[str]:
+        """Keep a partially consumed pager for the next call
+        
+        Returns the cursor to resume from, or None once the pager is exhausted.
+        """
+        if pager.exhausted:
+            if cursor:
+                self.workspace.cursors.discard(cursor)
+            return None
+        return cursor or self.workspace.cursors.put(self.name, pager)
+    
     def format_error(self, error: Exception) -> ToolResult:
         """Format error as tool result"""
         return ToolResult(
@@ -6,7 +6,10 @@ import logging
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from moatless_mcp.adapters.edits import EditError, Replacement, apply_replacements, edits_diff
+from moatless_mcp.adapters.file_tree import DirectorySummary, format_bytes
 from moatless_mcp.tools.base import MCPTool, ToolResult
+from moatless_mcp.utils.cursors import PagedIterator
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +57,7 @@ class ReadFileTool(MCPTool):
             end_line = arguments.get("end_line")
             
             # Get file content
-            content = self.workspace.get_file_context().get_file_content(file_path)
+            content = await self.workspace.get_file_context().get_file_content_async(file_path)
             lines = content.splitlines()
             
             # Apply line range if specified
@@ -113,13 +116,16 @@ class ReadFileTool(MCPTool):
 class WriteFileTool(MCPTool):
     """Tool to write content to files"""
     
+    mutates_workspace = True
+    
     @property
     def name(self) -> str:
         return "write_file"
     
     @property
     def description(self) -> str:
-        return "Write content to a file. Creates parent directories if needed."
+        return ("Write content to a file. Creates parent directories if needed. "
+                "Unchanged content is not rewritten; returns the changed line ranges.")
     
     @property
     def input_schema(self) -> Dict[str, Any]:
@@ -146,19 +152,37 @@ class WriteFileTool(MCPTool):
             content = arguments["content"]
             
             # Write file content
-            self.workspace.get_file_context().write_file_content(file_path, content)
+            change = await self.workspace.get_file_context().write_file_content_async(file_path, content)
             
             lines = content.splitlines()
             size_bytes = len(content.encode('utf-8'))
+            properties = {
+                "file_path": file_path,
+                "lines_written": len(lines),
+                "size_bytes": size_bytes,
+                "changed": change is not None
+            }
             
-            return ToolResult(
-                message=f"Successfully wrote {len(lines)} lines ({size_bytes} bytes) to {file_path}",
-                properties={
-                    "file_path": file_path,
-                    "lines_written": len(lines),
-                    "size_bytes": size_bytes
-                }
-            )
+            if change is None:
+                return ToolResult(
+                    message=f"{file_path} already has this content ({len(lines)} lines); file left unchanged",
+                    properties=properties
+                )
+            
+            hunks = [r.header() for r in change.ranges]
+            properties.update({
+                "created": change.created,
+                "lines_added": change.lines_added,
+                "lines_removed": change.lines_removed,
+                "hunks": hunks
+            })
+            
+            message = f"Successfully wrote {len(lines)} lines ({size_bytes} bytes) to {file_path}"
+            if not change.created:
+                message += (f": +{change.lines_added} -{change.lines_removed} lines "
+                            f"in {len(hunks)} hunk(s)\n" + "\n".join(hunks))
+            
+            return ToolResult(message=message, properties=properties)
             
         except Exception as e:
             logger.error(f"Error writing file {arguments.get('file_path', 'unknown')}: {e}")
@@ -174,7 +198,8 @@ class ListFilesTool(MCPTool):
     
     @property
     def description(self) -> str:
-        return "List files and directories in the workspace with filtering options."
+        return ("List files and directories in the workspace with filtering options. "
+                "Tree mode summarizes directories (file counts, size, main language) for a quick overview.")
     
     @property
     def input_schema(self) -> Dict[str, Any]:
@@ -193,10 +218,25 @@ class ListFilesTool(MCPTool):
                 },
                 "max_results": {
                     "type": "integer",
-                    "description": "Maximum number of files to return",
+                    "description": "Maximum number of files to return (directories in tree mode)",
                     "default": 100,
                     "minimum": 1,
                     "maximum": 1000
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Cursor from a previous list_files call with the same directory, to continue where it stopped"
+                },
+                "tree": {
+                    "type": "boolean",
+                    "description": "Show a directory tree with per-directory file counts, sizes and main language instead of file names",
+                    "default": False
+                },
+                "max_depth": {
+                    "type": "integer",
+                    "description": "Directory levels shown in tree mode; deeper directories are counted in their parents",
+                    "default": 2,
+                    "minimum": 1
                 }
             }
         }
@@ -206,13 +246,30 @@ class ListFilesTool(MCPTool):
             directory = arguments.get("directory", "")
             recursive = arguments.get("recursive", False)
             max_results = arguments.get("max_results", 100)
+            cursor = arguments.get("cursor")
             
-            # List files
-            files = self.workspace.get_file_context().list_files(
-                directory=directory,
-                recursive=recursive,
-                max_results=max_results
-            )
+            if arguments.get("tree", False):
+                return await self._list_tree(directory, arguments.get("max_depth", 2), max_results)
+            
+            context = {"directory": directory, "recursive": recursive}
+            
+            # List files, resuming a previous walk if a cursor is given
+            if cursor:
+                pager = self.resume_pager(cursor, context)
+                if pager is None:
+                    return ToolResult(
+                        message=f"Unknown or expired cursor for this directory: {cursor}",
+                        success=False
+                    )
+            else:
+                pager = PagedIterator(
+                    self.workspace.get_file_context().iter_files(directory, recursive),
+                    context
+                )
+            
+            offset = pager.consumed
+            files = sorted(pager.take(max_results))
+            next_cursor = self.park_pager(pager, cursor)
             
             if not files:
                 return ToolResult(
@@ -231,8 +288,9 @@ class ListFilesTool(MCPTool):
                 result_msg += " (recursive)"
             result_msg += f":\n\n{file_list}"
             
-            if len(files) >= max_results:
-                result_msg += f"\n\n... (showing first {max_results} files)"
+            if next_cursor:
+                result_msg += (f"\n\n... (showing files {offset + 1}-{offset + len(files)}; "
+                               f"call list_files again with cursor=\"{next_cursor}\" for more)")
             
             return ToolResult(
                 message=result_msg,
@@ -240,25 +298,92 @@ class ListFilesTool(MCPTool):
                     "directory": directory,
                     "file_count": len(files),
                     "recursive": recursive,
-                    "truncated": len(files) >= max_results
+                    "offset": offset,
+                    "truncated": next_cursor is not None,
+                    "next_cursor": next_cursor
                 }
             )
             
         except Exception as e:
             logger.error(f"Error listing files in {arguments.get('directory', 'unknown')}: {e}")
             return self.format_error(e)
+    
+    async def _list_tree(self, directory: str, max_depth: int, max_directories: int) -> ToolResult:
+        """Render directory summaries, keeping shallow directories when truncating"""
+        tree = await self.workspace.config.io_executor.run(
+            self.workspace.get_file_context().file_tree, directory
+        )
+        
+        shown = set()
+        truncated = False
+        for _, node in tree.walk(max_depth):
+            if len(shown) >= max_directories:
+                truncated = True
+                break
+            shown.add(node.path)
+        
+        lines = [f"{directory or '.'}/ ({_describe(tree)})"]
+        directories = []
+        
+        def render(node: DirectorySummary, depth: int) -> None:
+            indent = "  " * depth
+            hidden = 0
+            for name, child in sorted(node.children.items()):
+                if child.path not in shown:
+                    hidden += 1
+                    continue
+                lines.append(f"{indent}{name}/ ({_describe(child)})")
+                directories.append({
+                    "path": child.path,
+                    "file_count": child.file_count,
+                    "total_bytes": child.total_bytes,
+                    "language": child.language
+                })
+                render(child, depth + 1)
+            if hidden and depth <= max_depth:
+                lines.append(f"{indent}... {hidden} more director{'y' if hidden == 1 else 'ies'}")
+        
+        render(tree, 1)
+        
+        message = "\n".join(lines)
+        if truncated:
+            message += (f"\n\n... (showing {len(shown)} directories; narrow the directory "
+                        f"or lower max_depth for the rest)")
+        
+        return ToolResult(
+            message=message,
+            properties={
+                "directory": directory,
+                "file_count": tree.file_count,
+                "total_bytes": tree.total_bytes,
+                "language": tree.language,
+                "max_depth": max_depth,
+                "directories": directories,
+                "truncated": truncated
+            }
+        )
+
+
+def _describe(node: DirectorySummary) -> str:
+    parts = [f"{node.file_count} file{'' if node.file_count == 1 else 's'}", format_bytes(node.total_bytes)]
+    if node.language:
+        parts.append(node.language)
+    return ", ".join(parts)
 
 
 class StringReplaceTool(MCPTool):
     """Tool to perform string replacement in files"""
     
+    mutates_workspace = True
+    
     @property
     def name(self) -> str:
         return "string_replace"
     
     @property
     def description(self) -> str:
-        return "Replace occurrences of a string in a file with validation."
+        return ("Replace occurrences of a string or regular expression in a file with validation. "
+                "Several independent replacements can be applied in one pass; returns a unified diff.")
     
     @property
     def input_schema(self) -> Dict[str, Any]:
@@ -282,9 +407,34 @@ class StringReplaceTool(MCPTool):
                     "description": "Which occurrence to replace (1-based, 0 for all occurrences)",
                     "default": 1,
                     "minimum": 0
+                },
+                "regex": {
+                    "type": "boolean",
+                    "description": "Treat old_str as a regular expression; new_str may use \\1 or \\g<name>",
+                    "default": False
+                },
+                "replacements": {
+                    "type": "array",
+                    "description": ("Independent replacements applied in one pass instead of old_str/new_str; "
+                                    "all are matched against the original content and must not overlap"),
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "old_str": {"type": "string"},
+                            "new_str": {"type": "string"},
+                            "occurrence": {"type": "integer", "default": 1, "minimum": 0},
+                            "regex": {"type": "boolean", "default": False}
+                        },
+                        "required": ["old_str", "new_str"]
+                    }
+                },
+                "show_diff": {
+                    "type": "boolean",
+                    "description": "Include a unified diff of the change in the response",
+                    "default": True
                 }
             },
-            "required": ["file_path", "old_str", "new_str"]
+            "required": ["file_path"]
         }
     
     async def execute(self, arguments: Dict[str, Any]) -> ToolResult:
@@ -292,60 +442,173 @@ class StringReplaceTool(MCPTool):
             self.validate_arguments(arguments)
             
             file_path = arguments["file_path"]
-            old_str = arguments["old_str"]
-            new_str = arguments["new_str"]
-            occurrence = arguments.get("occurrence", 1)
+            show_diff = arguments.get("show_diff", True)
+            
+            if "replacements" in arguments:
+                specs = arguments["replacements"]
+            elif "old_str" in arguments and "new_str" in arguments:
+                specs = [arguments]
+            else:
+                raise ValueError("Missing required argument: old_str and new_str, or replacements")
+            
+            replacements = [
+                Replacement(
+                    file_path=file_path,
+                    old_str=spec["old_str"],
+                    new_str=spec["new_str"],
+                    occurrence=spec.get("occurrence", 1),
+                    regex=spec.get("regex", False)
+                )
+                for spec in specs
+            ]
+            if not replacements:
+                return ToolResult(message="No replacements given", success=False)
             
             # Read current content
-            content = self.workspace.get_file_context().get_file_content(file_path)
+            file_context = self.workspace.get_file_context()
+            content = await file_context.get_file_content_async(file_path)
             
-            # Check if old_str exists
-            if old_str not in content:
-                return ToolResult(
-                    message=f"String not found in {file_path}: '{old_str}'",
-                    success=False
+            try:
+                new_content, counts, edits = apply_replacements(
+                    file_path, content, replacements, with_edits=show_diff
                 )
+            except EditError as e:
+                return ToolResult(message=str(e), success=False)
             
-            # Count occurrences
-            count = content.count(old_str)
+            # Write the modified content
+            await file_context.write_file_content_async(file_path, new_content)
             
-            if occurrence == 0:
-                # Replace all occurrences
-                new_content = content.replace(old_str, new_str)
-                replacements = count
+            replacements_made = sum(made for made, _ in counts)
+            message = f"Successfully replaced {replacements_made} occurrence(s) in {file_path}"
+            properties = {
+                "file_path": file_path,
+                "replacements_made": replacements_made,
+                "total_occurrences": sum(total for _, total in counts)
+            }
+            if "replacements" in arguments:
+                properties["replacements"] = [
+                    {"replacements_made": made, "total_occurrences": total} for made, total in counts
+                ]
             else:
-                # Replace specific occurrence
-                if occurrence > count:
-                    return ToolResult(
-                        message=f"Occurrence {occurrence} not found (only {count} occurrences exist)",
-                        success=False
-                    )
-                
-                # Find and replace the nth occurrence
-                parts = content.split(old_str, occurrence)
-                if len(parts) > occurrence:
-                    new_content = old_str.join(parts[:occurrence]) + new_str + old_str.join(parts[occurrence:])
-                    replacements = 1
-                else:
-                    return ToolResult(
-                        message=f"Could not find occurrence {occurrence}",
-                        success=False
-                    )
+                properties["old_str"] = arguments["old_str"]
+                properties["new_str"] = arguments["new_str"]
             
-            # Write the modified content
-            self.workspace.get_file_context().write_file_content(file_path, new_content)
+            if show_diff:
+                properties["diff"] = edits_diff(file_path, content, edits)
+            
+            return ToolResult(message=message, properties=properties)
+            
+        except Exception as e:
+            logger.error(f"Error replacing string in {arguments.get('file_path', 'unknown')}: {e}")
+            return self.format_error(e)
+
+
+class ApplyEditsTool(MCPTool):
+    """Tool to apply a batch of string replacements across files atomically"""
+    
+    mutates_workspace = True
+    
+    @property
+    def name(self) -> str:
+        return "apply_edits"
+    
+    @property
+    def description(self) -> str:
+        return ("Apply many string replacements across one or more files in a single call. "
+                "All edits are validated first; if any fails, no file is changed.")
+    
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "edits": {
+                    "type": "array",
+                    "description": ("Replacements to apply in order; later edits see earlier ones. "
+                                    "A failure reports the 1-based number of the failing edit as failed_edit"),
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "file_path": {
+                                "type": "string",
+                                "description": "Path to the file to modify"
+                            },
+                            "old_str": {
+                                "type": "string",
+                                "description": "String to find and replace"
+                            },
+                            "new_str": {
+                                "type": "string",
+                                "description": "String to replace with"
+                            },
+                            "occurrence": {
+                                "type": "integer",
+                                "description": "Which occurrence to replace (1-based, 0 for all occurrences)",
+                                "default": 1,
+                                "minimum": 0
+                            },
+                            "regex": {
+                                "type": "boolean",
+                                "description": "Treat old_str as a regular expression",
+                                "default": False
+                            }
+                        },
+                        "required": ["file_path", "old_str", "new_str"]
+                    }
+                }
+            },
+            "required": ["edits"]
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> ToolResult:
+        try:
+            self.validate_arguments(arguments)
             
+            edits = [
+                Replacement(
+                    file_path=edit["file_path"],
+                    old_str=edit["old_str"],
+                    new_str=edit["new_str"],
+                    occurrence=edit.get("occurrence", 1),
+                    regex=edit.get("regex", False)
+                )
+                for edit in arguments["edits"]
+            ]
+            if not edits:
+                return ToolResult(message="No edits given", success=False)
+            
+            try:
+                outcomes = await self.workspace.get_file_context().apply_edits_async(edits)
+            except EditError as e:
+                return ToolResult(
+                    message=f"No files were changed. {e}",
+                    success=False,
+                    properties={"failed_edit": e.index + 1}
+                )
+            
+            per_file: Dict[str, int] = {}
+            for outcome in outcomes:
+                per_file[outcome.file_path] = per_file.get(outcome.file_path, 0) + outcome.replacements_made
+            
+            file_lines = "\n".join(f"  {path}: {count} replacement(s)" for path, count in per_file.items())
             return ToolResult(
-                message=f"Successfully replaced {replacements} occurrence(s) in {file_path}",
+                message=f"Applied {len(outcomes)} edit(s) to {len(per_file)} file(s):\n{file_lines}",
                 properties={
-                    "file_path": file_path,
-                    "replacements_made": replacements,
-                    "total_occurrences": count,
-                    "old_str": old_str,
-                    "new_str": new_str
+                    "edits_applied": len(outcomes),
+                    "files_modified": list(per_file),
+                    "replacements_made": sum(per_file.values()),
+                    "edits": [
+                        {
+                            "file_path": outcome.file_path,
+                            "replacements_made": outcome.replacements_made,
+                            "total_occurrences": outcome.total_occurrences
+                        }
+                        for outcome in outcomes
+                    ]
                 }
             )
             
         except Exception as e:
-            logger.error(f"Error replacing string in {arguments.get('file_path', 'unknown')}: {e}")
-            return self.format_error(e)
\ No newline at end of file
+            logger.error(f"Error applying edits: {e}")
+            return self.format_error(e)
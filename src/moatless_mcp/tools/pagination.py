@@ -0,0 +1,55 @@
+"""
+Pagination tools for MCP
+"""
+
+import logging
+from typing import Any, Dict
+
+from moatless_mcp.tools.base import MCPTool, ToolResult
+from moatless_mcp.utils.output import join_page, next_page
+
+logger = logging.getLogger(__name__)
+
+
+class FetchPageTool(MCPTool):
+    """Tool to fetch the next page of a truncated response"""
+
+    @property
+    def name(self) -> str:
+        return "fetch_page"
+
+    @property
+    def description(self) -> str:
+        return "Fetch the next page of a response that exceeded the response size budget."
+
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "cursor": {
+                    "type": "string",
+                    "description": "Cursor returned at the end of a truncated response"
+                }
+            },
+            "required": ["cursor"]
+        }
+
+    async def execute(self, arguments: Dict[str, Any]) -> ToolResult:
+        try:
+            self.validate_arguments(arguments)
+
+            cursor = arguments["cursor"]
+            page = next_page(cursor, self.workspace.cursors)
+
+            if page is None:
+                return ToolResult(
+                    message=f"Unknown or expired cursor: {cursor}",
+                    success=False
+                )
+
+            return ToolResult(message=join_page(page))
+
+        except Exception as e:
+            logger.error(f"Error fetching page: {e}")
+            return self.format_error(e)
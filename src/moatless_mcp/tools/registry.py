@@ -2,8 +2,10 @@
 Tool registry for managing MCP tools
 """
 
+import contextlib
 import logging
-from typing import Dict, List
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from mcp.types import Tool
 
@@ -12,7 +14,8 @@ from moatless_mcp.tools.file_operations import (
     ReadFileTool, 
     WriteFileTool, 
     ListFilesTool, 
-    StringReplaceTool
+    StringReplaceTool,
+    ApplyEditsTool
 )
 from moatless_mcp.tools.search_tools import (
     GrepTool, 
@@ -22,10 +25,14 @@ from moatless_mcp.tools.search_tools import (
 from moatless_mcp.tools.advanced_tools import (
     FindClassTool,
     FindFunctionTool, 
+    FindSymbolsTool,
+    SearchSymbolsTool,
+    FindReferencesTool,
     ViewCodeTool,
     SemanticSearchTool,
     RunTestsTool
 )
+from moatless_mcp.tools.pagination import FetchPageTool
 from moatless_mcp.tools.vector_tools import (
     BuildVectorIndexTool,
     VectorIndexStatusTool,
@@ -37,13 +44,23 @@ from moatless_mcp.tools.verilog_tools import VerilogGenerateTool, VerilogV2SvgTo
 
 logger = logging.getLogger(__name__)
 
+# Entry point group scanned by ToolRegistry.load_plugins(). Each entry point
+# must resolve to a callable taking the workspace and returning one MCPTool
+# or an iterable of them.
+PLUGIN_ENTRY_POINT_GROUP = "moatless_mcp.tools"
+
 
 class ToolRegistry:
     """Registry for managing MCP tools"""
     
-    def __init__(self, workspace):
+    def __init__(self, workspace, extra_arguments: Optional[Dict[str, Dict[str, Any]]] = None):
         self.workspace = workspace
         self.tools: Dict[str, MCPTool] = {}
+        # Schema properties added to every tool, consumed by the server before dispatch
+        self.extra_arguments = extra_arguments or {}
+        # Frozen MCP tool list, rebuilt lazily after the tool set changes
+        self._mcp_tools: Optional[Tuple[Tool, ...]] = None
+        self._change_listeners: List[Callable[[], None]] = []
         self._register_default_tools()
     
     def _register_default_tools(self):
@@ -55,15 +72,20 @@ class ToolRegistry:
             WriteFileTool(self.workspace),
             ListFilesTool(self.workspace),
             StringReplaceTool(self.workspace),
+            ApplyEditsTool(self.workspace),
             
             # Search tools
             GrepTool(self.workspace),
             FindFilesTool(self.workspace),
             WorkspaceInfoTool(self.workspace),
+            FetchPageTool(self.workspace),
             
             # Advanced tools
             FindClassTool(self.workspace),
             FindFunctionTool(self.workspace),
+            FindSymbolsTool(self.workspace),
+            SearchSymbolsTool(self.workspace),
+            FindReferencesTool(self.workspace),
             ViewCodeTool(self.workspace),
             SemanticSearchTool(self.workspace),
             RunTestsTool(self.workspace),
@@ -81,19 +103,87 @@ class ToolRegistry:
             VerilogV2SvgTool(self.workspace),
         ]
         
-        for tool in tools:
-            self.register_tool(tool)
+        self.register_tools(tools)
         
         logger.info(f"Registered {len(self.tools)} tools")
     
     def register_tool(self, tool: MCPTool):
         """Register a new tool"""
-        self.tools[tool.name] = tool
-        logger.debug(f"Registered tool: {tool.name}")
+        self.register_tools([tool])
+    
+    def register_tools(self, tools: Iterable[MCPTool]) -> int:
+        """Register several tools, notifying listeners once for the batch"""
+        count = 0
+        for tool in tools:
+            self.tools[tool.name] = tool
+            count += 1
+            logger.debug(f"Registered tool: {tool.name}")
+        
+        if count:
+            self._mcp_tools = None
+            self._notify_change_listeners()
+        return count
+    
+    def load_plugins(self, group: str = PLUGIN_ENTRY_POINT_GROUP) -> List[str]:
+        """Load tools exposed by installed plugins through entry points
+        
+        Returns the names of the tools that were registered.
+        """
+        loaded: List[MCPTool] = []
+        
+        for entry_point in entry_points(group=group):
+            try:
+                factory = entry_point.load()
+                provided = factory(self.workspace)
+                tools = [provided] if isinstance(provided, MCPTool) else list(provided)
+                for tool in tools:
+                    if not isinstance(tool, MCPTool):
+                        raise TypeError(f"expected MCPTool instances, got {type(tool).__name__}")
+            except Exception as e:
+                logger.warning(f"Failed to load tool plugin '{entry_point.name}': {e}")
+                continue
+            
+            loaded.extend(tools)
+        
+        if loaded:
+            self.register_tools(loaded)
+            logger.info(f"Loaded {len(loaded)} plugin tool(s) from '{group}'")
+        
+        return [tool.name for tool in loaded]
+    
+    def add_change_listener(self, callback: Callable[[], None]) -> None:
+        """Register a callback invoked whenever the tool list changes"""
+        self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback: Callable[[], None]) -> None:
+        """Remove a previously registered change callback"""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_change_listeners(self) -> None:
+        for callback in list(self._change_listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Tool list change listener failed: {e}")
     
     def get_tools(self) -> List[Tool]:
-        """Get all tools in MCP format"""
-        return [tool.to_mcp_tool() for tool in self.tools.values()]
+        """Get all tools in MCP format
+        
+        The Tool objects are built once and reused until the tool set
+        changes, so frequent list_tools polling does not rebuild schemas.
+        """
+        if self._mcp_tools is None:
+            self._mcp_tools = tuple(self._build_mcp_tool(tool) for tool in self.tools.values())
+        return list(self._mcp_tools)
+    
+    def _build_mcp_tool(self, tool: MCPTool) -> Tool:
+        mcp_tool = tool.to_mcp_tool()
+        if self.extra_arguments:
+            schema = dict(mcp_tool.inputSchema)
+            schema["properties"] = {**schema.get("properties", {}), **self.extra_arguments}
+            mcp_tool = mcp_tool.model_copy(update={"inputSchema": schema})
+        return mcp_tool
     
     def get_tool_names(self) -> List[str]:
         """Get list of tool names"""
@@ -108,8 +198,16 @@ class ToolRegistry:
         tool = self.tools[name]
         logger.info(f"Executing tool: {name}")
         
+        if tool.manages_workspace_lock:
+            lock = contextlib.nullcontext()
+        elif tool.mutates_workspace:
+            lock = self.workspace.lock.write()
+        else:
+            lock = self.workspace.lock.read()
+        
         try:
-            result = await tool.execute(arguments)
+            async with lock:
+                result = await tool.execute(arguments)
             logger.debug(f"Tool {name} completed successfully")
             return result
         except Exception as e:
@@ -6,6 +6,7 @@ import logging
 from typing import Any, Dict, List
 
 from moatless_mcp.tools.base import MCPTool, ToolResult
+from moatless_mcp.utils.cursors import PagedIterator
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,10 @@ class GrepTool(MCPTool):
                     "default": 100,
                     "minimum": 1,
                     "maximum": 1000
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Cursor from a previous grep call with the same pattern, to continue where it stopped"
                 }
             },
             "required": ["pattern"]
@@ -53,13 +58,26 @@ class GrepTool(MCPTool):
             pattern = arguments["pattern"]
             file_pattern = arguments.get("file_pattern", "*")
             max_results = arguments.get("max_results", 100)
+            cursor = arguments.get("cursor")
+            context = {"pattern": pattern, "file_pattern": file_pattern}
             
-            # Search for pattern
-            results = self.workspace.grep_files(
-                pattern=pattern,
-                file_pattern=file_pattern,
-                max_results=max_results
-            )
+            # Search for pattern, resuming a previous scan if a cursor is given
+            if cursor:
+                pager = self.resume_pager(cursor, context)
+                if pager is None:
+                    return ToolResult(
+                        message=f"Unknown or expired cursor for this pattern: {cursor}",
+                        success=False
+                    )
+            else:
+                pager = PagedIterator(
+                    self.workspace.iter_grep(pattern, file_pattern),
+                    context
+                )
+            
+            offset = pager.consumed
+            results = pager.take(max_results)
+            next_cursor = self.park_pager(pager, cursor)
             
             if not results:
                 return ToolResult(
@@ -82,8 +100,9 @@ class GrepTool(MCPTool):
             
             message = f"Found {len(results)} matches for pattern '{pattern}':\n\n{result_text}"
             
-            if len(results) >= max_results:
-                message += f"\n\n... (showing first {max_results} matches)"
+            if next_cursor:
+                message += (f"\n\n... (showing matches {offset + 1}-{offset + len(results)}; "
+                            f"call grep again with cursor=\"{next_cursor}\" for more)")
             
             return ToolResult(
                 message=message,
@@ -91,7 +110,9 @@ class GrepTool(MCPTool):
                     "pattern": pattern,
                     "file_pattern": file_pattern,
                     "match_count": len(results),
-                    "truncated": len(results) >= max_results
+                    "offset": offset,
+                    "truncated": next_cursor is not None,
+                    "next_cursor": next_cursor
                 }
             )
             
@@ -126,6 +147,10 @@ class FindFilesTool(MCPTool):
                     "default": 100,
                     "minimum": 1,
                     "maximum": 1000
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Cursor from a previous find_files call with the same pattern, to continue where it stopped"
                 }
             },
             "required": ["pattern"]
@@ -137,12 +162,23 @@ class FindFilesTool(MCPTool):
             
             pattern = arguments["pattern"]
             max_results = arguments.get("max_results", 100)
+            cursor = arguments.get("cursor")
+            context = {"pattern": pattern}
             
-            # Search for files
-            files = self.workspace.search_files(
-                pattern=pattern,
-                max_results=max_results
-            )
+            # Search for files, resuming a previous walk if a cursor is given
+            if cursor:
+                pager = self.resume_pager(cursor, context)
+                if pager is None:
+                    return ToolResult(
+                        message=f"Unknown or expired cursor for this pattern: {cursor}",
+                        success=False
+                    )
+            else:
+                pager = PagedIterator(self.workspace.iter_search_files(pattern), context)
+            
+            offset = pager.consumed
+            files = sorted(pager.take(max_results))
+            next_cursor = self.park_pager(pager, cursor)
             
             if not files:
                 return ToolResult(
@@ -157,15 +193,18 @@ class FindFilesTool(MCPTool):
             
             message = f"Found {len(files)} files matching pattern '{pattern}':\n\n{file_list}"
             
-            if len(files) >= max_results:
-                message += f"\n\n... (showing first {max_results} files)"
+            if next_cursor:
+                message += (f"\n\n... (showing files {offset + 1}-{offset + len(files)}; "
+                            f"call find_files again with cursor=\"{next_cursor}\" for more)")
             
             return ToolResult(
                 message=message,
                 properties={
                     "pattern": pattern,
                     "file_count": len(files),
-                    "truncated": len(files) >= max_results
+                    "offset": offset,
+                    "truncated": next_cursor is not None,
+                    "next_cursor": next_cursor
                 }
             )
             
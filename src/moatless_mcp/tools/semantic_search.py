@@ -2,13 +2,14 @@
 
 import asyncio
 import logging
-import os
 import re
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.file_types import file_classifier
+from moatless_mcp.utils.line_index import LineIndex
 
 # Add moatless path to sys.path
 current_file = Path(__file__).resolve()
@@ -145,10 +146,12 @@ class EnhancedSemanticSearch:
         results = []
         search_paths = await self._get_search_paths(file_pattern, category)
         
-        # Search files for relevant content
-        for file_path in search_paths:
+        def read(file_path: Path) -> Tuple[Path, Optional[str]]:
+            return file_path, self._read_file_content(str(file_path.relative_to(self.workspace_root)))
+        
+        # Search files for relevant content, reading ahead on the I/O pool
+        async for file_path, content in self.config.io_executor.imap(read, search_paths):
             try:
-                content = await self._get_file_content(str(file_path.relative_to(self.workspace_root)))
                 if not content:
                     continue
                 
@@ -249,7 +252,7 @@ class EnhancedSemanticSearch:
                                    semantic_patterns: List[str], file_path: str) -> Tuple[float, List[Dict[str, Any]]]:
         """Enhanced scoring with semantic understanding."""
         content_lower = content.lower()
-        lines = content.split('\n')
+        line_index = LineIndex(content)
         
         score = 0.0
         matches = []
@@ -282,9 +285,10 @@ class EnhancedSemanticSearch:
             keyword_pattern = re.compile(rf'\b{re.escape(keyword)}\b', re.IGNORECASE)
             keyword_matches = list(keyword_pattern.finditer(content))
             
-            for match in keyword_matches:
-                line_num = content[:match.start()].count('\n') + 1
-                line_content = lines[line_num - 1] if line_num <= len(lines) else ""
+            line_numbers = line_index.lines_of(match.start() for match in keyword_matches)
+            
+            for line_num in line_numbers:
+                line_content = line_index.line_text(line_num)
                 
                 # Enhanced context-based scoring
                 keyword_score = self._calculate_context_score(line_content, keyword, intent)
@@ -493,32 +497,33 @@ class EnhancedSemanticSearch:
         
         if not search_paths:
             # Search all allowed files
-            for root, dirs, files in os.walk(self.workspace_root):
-                for file in files:
-                    file_path = Path(root) / file
-                    if self.config.is_file_allowed(file_path):
-                        # Apply category filter
-                        if category:
-                            is_test_file = any(test_indicator in str(file_path).lower() 
-                                             for test_indicator in ["test", "spec", "__test__"])
-                            if category == "test" and not is_test_file:
-                                continue
-                            elif category == "implementation" and is_test_file:
-                                continue
-                        
-                        search_paths.append(file_path)
+            policy = self.config.path_policy_for(self.workspace_root)
+            for file_path in policy.iter_files(self.workspace_root):
+                # Apply category filter
+                if category:
+                    is_test_file = any(test_indicator in str(file_path).lower() 
+                                     for test_indicator in ["test", "spec", "__test__"])
+                    if category == "test" and not is_test_file:
+                        continue
+                    elif category == "implementation" and is_test_file:
+                        continue
+                
+                search_paths.append(file_path)
         
         return search_paths
     
     async def _get_file_content(self, file_path: str) -> Optional[str]:
         """Get file content safely."""
+        return await self.config.io_executor.run(self._read_file_content, file_path)
+    
+    def _read_file_content(self, file_path: str) -> Optional[str]:
+        """Read file content on the I/O pool; None if missing, not allowed or binary."""
         try:
             full_path = self.workspace_root / file_path
             if not full_path.exists() or not self.config.is_file_allowed(full_path):
                 return None
             
-            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            return file_classifier.read_text(full_path)
         except Exception as e:
             logger.debug(f"Error reading file {file_path}: {e}")
             return None
@@ -579,4 +584,4 @@ class EnhancedSemanticSearch:
 
 
 # Alias for backward compatibility
-SemanticSearch = EnhancedSemanticSearch
\ No newline at end of file
+SemanticSearch = EnhancedSemanticSearch
@@ -2,9 +2,10 @@
 Vector database management tools for MCP server.
 """
 
+import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from mcp.types import Tool
 
@@ -17,6 +18,10 @@ logger = logging.getLogger(__name__)
 class BuildVectorIndexTool(MCPTool):
     """Tool for building the vector index for semantic search."""
     
+    mutates_workspace = True
+    # Embedding can take minutes; only the final swap excludes other calls
+    manages_workspace_lock = True
+    
     @property
     def name(self) -> str:
         return "build_vector_index"
@@ -85,13 +90,24 @@ class BuildVectorIndexTool(MCPTool):
             
             message += f"🤖 Using embedding model: {model}\n\n"
             
-            result = vector_manager.build_index(file_patterns, force_rebuild)
+            # Splitting reads every file, so keep it off the event loop
+            result = await self.workspace.config.io_executor.run(
+                vector_manager.build_index,
+                file_patterns, force_rebuild, git_index=self.workspace.git_index,
+                exclusive=self._exclusive_runner()
+            )
             
             if result["success"]:
                 stats = result["stats"]
                 usage = result.get("embedding_usage", {})
                 
-                message += "✅ Vector index built successfully!\n\n"
+                if result.get("incremental"):
+                    message += f"✅ Vector index updated with changes since commit {result['base_commit'][:12]}\n"
+                    message += f"  • Changed files: {len(result['updated_files'])}\n"
+                    message += f"  • Chunks removed: {result['removed_chunks']}\n"
+                    message += f"  • Chunks added: {result['added_chunks']}\n\n"
+                else:
+                    message += "✅ Vector index built successfully!\n\n"
                 message += "📊 Index Statistics:\n"
                 message += f"  • Total chunks: {stats['total_chunks']}\n"
                 message += f"  • Total files: {stats['total_files']}\n"
@@ -124,7 +140,8 @@ class BuildVectorIndexTool(MCPTool):
                         "index_built": True,
                         "stats": stats,
                         "usage": usage,
-                        "model": model
+                        "model": model,
+                        "incremental": result.get("incremental", False)
                     }
                 )
             else:
@@ -134,6 +151,23 @@ class BuildVectorIndexTool(MCPTool):
         except Exception as e:
             logger.error(f"Error in build_vector_index: {e}")
             return self.format_error(str(e))
+    
+    def _exclusive_runner(self) -> Callable[[Callable[[], Any]], Any]:
+        """Runner for VectorManager.build_index that holds the workspace's write lock
+    
+        It is called from a worker thread and runs the function on another
+        thread once the lock, which lives on the event loop, is held.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self.workspace.lock
+    
+        def run_exclusively(func: Callable[[], Any]) -> Any:
+            async def locked() -> Any:
+                async with lock.write():
+                    return await asyncio.to_thread(func)
+            return asyncio.run_coroutine_threadsafe(locked(), loop).result()
+    
+        return run_exclusively
 
 
 class VectorIndexStatusTool(MCPTool):
@@ -234,6 +268,8 @@ class VectorIndexStatusTool(MCPTool):
 class ClearVectorIndexTool(MCPTool):
     """Tool for clearing the vector index."""
     
+    mutates_workspace = True
+    
     @property
     def name(self) -> str:
         return "clear_vector_index"
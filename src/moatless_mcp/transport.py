@@ -0,0 +1,240 @@
+"""
+HTTP transports for serving many MCP clients from one process
+"""
+
+import contextlib
+import logging
+import re
+import time
+from typing import AsyncIterator, Callable, Dict, Optional
+from urllib.parse import parse_qs
+
+from mcp.server import Server
+from mcp.server.models import InitializationOptions
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+logger = logging.getLogger(__name__)
+
+HTTP_TRANSPORTS = ("sse", "streamable-http")
+
+MCP_SESSION_HEADER = b"mcp-session-id"
+
+# Streamable-HTTP sessions with neither requests nor an open stream for this
+# many seconds stop counting, since clients may vanish without deleting them
+SESSION_IDLE_TIMEOUT = 600.0
+
+# The SSE transport announces the session in the messages URL of its first event
+_SSE_SESSION_ID = re.compile(rb"session_id=([0-9a-f]+)")
+
+
+class ConnectionLimitMiddleware:
+    """ASGI middleware bounding the number of established client sessions
+
+    A streamable-HTTP session counts from the response that assigns its
+    mcp-session-id until it is deleted or idle for ``session_idle_timeout``
+    seconds; an SSE session counts while its event stream is open. Only
+    requests naming a counted session are exempt, so connected clients
+    keep working at the limit while made-up session ids gain nothing. Any
+    other request may start a session and holds a slot while in flight;
+    such requests are rejected with a 503 and a Retry-After header while
+    all slots are taken.
+    """
+
+    def __init__(self, app: Callable, max_connections: int,
+                 session_idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.app = app
+        self.max_connections = max_connections
+        self.session_idle_timeout = session_idle_timeout
+        # session id -> time of its last request
+        self.sessions: Dict[str, float] = {}
+        # session id -> number of its streams currently open
+        self._open_streams: Dict[str, int] = {}
+        # Requests in flight that may still establish a session
+        self._pending = 0
+
+    @property
+    def active(self) -> int:
+        """Slots in use: established sessions and requests that may start one"""
+        return len(self.sessions) + self._pending
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or self.max_connections <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        self._expire_idle_sessions()
+        session_id = _session_id(scope)
+        if session_id in self.sessions:
+            await self._serve_session(session_id, scope, receive, send)
+            return
+
+        if self.active >= self.max_connections:
+            logger.warning(f"Rejecting connection: {self.active} of {self.max_connections} in use")
+            response = JSONResponse(
+                {"error": "Too many connections"},
+                status_code=503,
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self._serve_new(scope, receive, send)
+
+    async def _serve_new(self, scope, receive, send) -> None:
+        """Serve a request outside any session, counting the session it establishes"""
+        established = None
+        sse_stream = False
+
+        def establish(session_id: str) -> None:
+            nonlocal established
+            established = session_id
+            self.sessions[session_id] = time.monotonic()
+            self._pending -= 1
+
+        async def watch(message) -> None:
+            nonlocal sse_stream
+            if established is None:
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    for name, value in message.get("headers", ()):
+                        if name.lower() == MCP_SESSION_HEADER:
+                            establish(value.decode("latin-1"))
+                elif message["type"] == "http.response.body" and scope["method"] == "GET":
+                    match = _SSE_SESSION_ID.search(message.get("body", b""))
+                    if match:
+                        establish(match.group(1).decode("ascii"))
+                        sse_stream = True
+                        self._open_streams[established] = 1
+            await send(message)
+
+        self._pending += 1
+        try:
+            await self.app(scope, receive, watch)
+        finally:
+            if established is None:
+                self._pending -= 1
+            elif sse_stream:
+                # An SSE session ends with its stream
+                self._end_session(established)
+
+    async def _serve_session(self, session_id: str, scope, receive, send) -> None:
+        """Serve a request within a counted session"""
+        status = None
+
+        async def watch(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stream = scope["method"] == "GET"
+        if stream:
+            self._open_streams[session_id] = self._open_streams.get(session_id, 0) + 1
+        try:
+            await self.app(scope, receive, watch)
+        finally:
+            if session_id in self.sessions:
+                self.sessions[session_id] = time.monotonic()
+            if stream and session_id in self._open_streams:
+                self._open_streams[session_id] -= 1
+            if scope["method"] == "DELETE" and status is not None and status < 400:
+                self._end_session(session_id)
+
+    def _end_session(self, session_id: str) -> None:
+        self.sessions.pop(session_id, None)
+        self._open_streams.pop(session_id, None)
+
+    def _expire_idle_sessions(self) -> None:
+        deadline = time.monotonic() - self.session_idle_timeout
+        idle = [
+            session_id for session_id, last_seen in self.sessions.items()
+            if last_seen <= deadline and not self._open_streams.get(session_id)
+        ]
+        for session_id in idle:
+            logger.info(f"Session {session_id} idle for {self.session_idle_timeout:.0f}s, no longer counted")
+            self._end_session(session_id)
+
+
+def _session_id(scope) -> Optional[str]:
+    """Session a request names: streamable HTTP in a header, SSE in the messages URL"""
+    for name, value in scope.get("headers", ()):
+        if name == MCP_SESSION_HEADER:
+            return value.decode("latin-1")
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("session_id")
+    return values[0] if values else None
+
+
+def create_sse_app(server: Server, init_options: InitializationOptions) -> Starlette:
+    """Build an app serving the legacy SSE transport on /sse and /messages/"""
+    sse = SseServerTransport("/messages/")
+
+    async def handle_sse(request):
+        async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+            await server.run(*streams, init_options)
+        return Response()
+
+    return Starlette(
+        routes=[
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ]
+    )
+
+
+def create_streamable_http_app(server: Server, json_response: bool = False) -> Starlette:
+    """Build an app serving the streamable HTTP transport on /mcp"""
+    session_manager = StreamableHTTPSessionManager(app=server, json_response=json_response)
+
+    async def handle_mcp(scope, receive, send) -> None:
+        await session_manager.handle_request(scope, receive, send)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app) -> AsyncIterator[None]:
+        async with session_manager.run():
+            yield
+
+    return Starlette(routes=[Mount("/mcp", app=handle_mcp)], lifespan=lifespan)
+
+
+def create_http_app(
+    server: Server,
+    init_options: InitializationOptions,
+    transport: str = "streamable-http",
+    max_connections: int = 0,
+) -> Callable:
+    """Build the ASGI app for an HTTP transport
+
+    All clients share the server's tool registry and workspace, so caches
+    and indexes stay warm across sessions. ``max_connections`` of 0 means
+    no limit.
+    """
+    if transport == "sse":
+        app = create_sse_app(server, init_options)
+    elif transport == "streamable-http":
+        app = create_streamable_http_app(server)
+    else:
+        raise ValueError(f"Unsupported HTTP transport: {transport}")
+
+    return ConnectionLimitMiddleware(app, max_connections)
+
+
+async def serve_http(
+    server: Server,
+    init_options: InitializationOptions,
+    transport: str,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    max_connections: int = 0,
+    log_level: Optional[str] = None,
+) -> None:
+    """Serve the MCP server over HTTP until cancelled"""
+    import uvicorn
+
+    app = create_http_app(server, init_options, transport, max_connections)
+    uvicorn_config = uvicorn.Config(app, host=host, port=port, log_level=log_level or "info")
+
+    logger.info(f"🌐 Serving {transport} transport on http://{host}:{port}")
+    await uvicorn.Server(uvicorn_config).serve()
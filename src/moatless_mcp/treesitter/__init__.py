@@ -2,17 +2,35 @@
 Tree-sitter backend for accurate code parsing and analysis.
 """
 
-from .parser import CodeParser, ParseResult
+from .parser import CodeParser, ParseResult, get_code_parser
 from .languages import get_parser_for_language, detect_language, is_tree_sitter_available
 from .queries import CodeBlock, FunctionDef, ClassDef
+from .spans import SpanIndex, span_index_cache
+from .symbols import Symbol, SymbolTable, symbol_table_cache
+from .symbol_search import SymbolMatch, SymbolSearchIndex, symbol_search_indexes
+from .references import REFERENCE_KINDS, Reference, ReferenceIndex, extract_references, reference_indexes
 
 __all__ = [
     'CodeParser',
     'ParseResult', 
+    'get_code_parser',
     'get_parser_for_language',
     'detect_language',
     'is_tree_sitter_available',
     'CodeBlock',
     'FunctionDef',
-    'ClassDef'
+    'ClassDef',
+    'SpanIndex',
+    'span_index_cache',
+    'Symbol',
+    'SymbolTable',
+    'symbol_table_cache',
+    'SymbolMatch',
+    'SymbolSearchIndex',
+    'symbol_search_indexes',
+    'REFERENCE_KINDS',
+    'Reference',
+    'ReferenceIndex',
+    'extract_references',
+    'reference_indexes'
 ]
\ No newline at end of file
@@ -0,0 +1,487 @@
+"""
+Definition extraction driven by precompiled tree-sitter queries.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .languages import load_language
+from .queries import ClassDef, CodeBlock, FunctionDef, ParseResult, SourceBuffer
+
+logger = logging.getLogger(__name__)
+
+# Captures: @class / @function mark a definition, with @name, @params,
+# @bases / @interfaces and @body; @decorator pairs with the @definition it
+# decorates. Functions defined outside their type name it with @owner (Go
+# receivers) or a qualified @name (C++), or sit in a @scope whose @name is
+# the type (Rust impl blocks); they become methods of a class of that name
+# in the same file.
+DEFINITION_QUERIES: Dict[str, str] = {
+    'python': """
+        (class_definition
+            name: (identifier) @name
+            superclasses: (argument_list)? @bases
+            body: (block) @body) @class
+        (function_definition
+            name: (identifier) @name
+            parameters: (parameters) @params
+            body: (block) @body) @function
+        (decorated_definition
+            (decorator) @decorator
+            definition: (_) @definition)
+    """,
+    'javascript': """
+        (class_declaration
+            name: (identifier) @name
+            body: (class_body) @body) @class
+        (function_declaration
+            name: (identifier) @name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body) @function
+        (generator_function_declaration
+            name: (identifier) @name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body) @function
+        (method_definition
+            name: (_) @name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body) @function
+        (variable_declarator
+            name: (identifier) @name
+            value: [(arrow_function) (function)] @function)
+    """,
+    'typescript': """
+        (class_declaration
+            name: (type_identifier) @name
+            body: (class_body) @body) @class
+        (abstract_class_declaration
+            name: (type_identifier) @name
+            body: (class_body) @body) @class
+        (function_declaration
+            name: (identifier) @name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body) @function
+        (method_definition
+            name: (_) @name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body) @function
+        (variable_declarator
+            name: (identifier) @name
+            value: [(arrow_function) (function)] @function)
+    """,
+    'java': """
+        (class_declaration
+            name: (identifier) @name
+            superclass: (superclass)? @bases
+            interfaces: (super_interfaces)? @interfaces
+            body: (class_body) @body) @class
+        (interface_declaration
+            name: (identifier) @name
+            (extends_interfaces)? @bases
+            body: (interface_body) @body) @class
+        (enum_declaration
+            name: (identifier) @name
+            interfaces: (super_interfaces)? @interfaces
+            body: (enum_body) @body) @class
+        (record_declaration
+            name: (identifier) @name
+            interfaces: (super_interfaces)? @interfaces
+            body: (class_body) @body) @class
+        (method_declaration
+            name: (identifier) @name
+            parameters: (formal_parameters) @params) @function
+        (constructor_declaration
+            name: (identifier) @name
+            parameters: (formal_parameters) @params
+            body: (constructor_body) @body) @function
+        (_
+            (modifiers [(annotation) (marker_annotation)] @decorator)) @definition
+    """,
+    'c': """
+        (struct_specifier
+            name: (type_identifier) @name
+            body: (field_declaration_list) @body) @class
+        (union_specifier
+            name: (type_identifier) @name
+            body: (field_declaration_list) @body) @class
+        (function_definition
+            declarator: [
+                (function_declarator
+                    declarator: (identifier) @name
+                    parameters: (parameter_list) @params)
+                (pointer_declarator
+                    declarator: (function_declarator
+                        declarator: (identifier) @name
+                        parameters: (parameter_list) @params))
+            ]
+            body: (compound_statement) @body) @function
+    """,
+    'cpp': """
+        (class_specifier
+            name: (_) @name
+            (base_class_clause)? @bases
+            body: (field_declaration_list) @body) @class
+        (struct_specifier
+            name: (_) @name
+            (base_class_clause)? @bases
+            body: (field_declaration_list) @body) @class
+        (union_specifier
+            name: (_) @name
+            body: (field_declaration_list) @body) @class
+        (function_definition
+            declarator: [
+                (function_declarator
+                    declarator: (_) @name
+                    parameters: (parameter_list) @params)
+                (pointer_declarator
+                    declarator: (function_declarator
+                        declarator: (_) @name
+                        parameters: (parameter_list) @params))
+                (reference_declarator
+                    (function_declarator
+                        declarator: (_) @name
+                        parameters: (parameter_list) @params))
+            ]
+            body: (_) @body) @function
+        (field_declaration
+            declarator: [
+                (function_declarator
+                    declarator: [(field_identifier) (destructor_name) (operator_name)] @name
+                    parameters: (parameter_list) @params)
+                (pointer_declarator
+                    declarator: (function_declarator
+                        declarator: [(field_identifier) (operator_name)] @name
+                        parameters: (parameter_list) @params))
+                (reference_declarator
+                    (function_declarator
+                        declarator: [(field_identifier) (operator_name)] @name
+                        parameters: (parameter_list) @params))
+            ]) @function
+        (field_declaration_list
+            (declaration
+                declarator: (function_declarator
+                    declarator: [(identifier) (destructor_name) (operator_name)] @name
+                    parameters: (parameter_list) @params)) @function)
+    """,
+    'go': """
+        (type_spec
+            name: (type_identifier) @name
+            type: [(struct_type) (interface_type)] @body) @class
+        (function_declaration
+            name: (identifier) @name
+            parameters: (parameter_list) @params) @function
+        (method_declaration
+            receiver: (parameter_list
+                (parameter_declaration
+                    type: (_) @owner))
+            name: (field_identifier) @name
+            parameters: (parameter_list) @params) @function
+        (method_spec
+            name: (field_identifier) @name
+            parameters: (parameter_list) @params) @function
+    """,
+    'rust': """
+        (struct_item
+            name: (type_identifier) @name) @class
+        (enum_item
+            name: (type_identifier) @name
+            body: (enum_variant_list) @body) @class
+        (union_item
+            name: (type_identifier) @name
+            body: (field_declaration_list) @body) @class
+        (trait_item
+            name: (type_identifier) @name
+            body: (declaration_list) @body) @class
+        (impl_item
+            type: (_) @name
+            body: (declaration_list) @body) @scope
+        (function_item
+            name: (identifier) @name
+            parameters: (parameters) @params
+            body: (block) @body) @function
+        (function_signature_item
+            name: (identifier) @name
+            parameters: (parameters) @params) @function
+    """,
+    'c_sharp': """
+        (class_declaration
+            name: (identifier) @name
+            bases: (base_list)? @bases
+            body: (declaration_list) @body) @class
+        (interface_declaration
+            name: (identifier) @name
+            bases: (base_list)? @bases
+            body: (declaration_list) @body) @class
+        (struct_declaration
+            name: (identifier) @name
+            bases: (base_list)? @bases
+            body: (declaration_list) @body) @class
+        (record_declaration
+            name: (identifier) @name
+            bases: (base_list)? @bases) @class
+        (method_declaration
+            name: (identifier) @name
+            parameters: (parameter_list) @params) @function
+        (constructor_declaration
+            name: (identifier) @name
+            parameters: (parameter_list) @params) @function
+        (_
+            (attribute_list) @decorator) @definition
+    """,
+    'ruby': """
+        (class
+            name: (_) @name
+            superclass: (superclass)? @bases) @class
+        (module
+            name: (_) @name) @class
+        (method
+            name: (_) @name
+            parameters: (method_parameters)? @params) @function
+        (singleton_method
+            name: (_) @name
+            parameters: (method_parameters)? @params) @function
+    """,
+    'php': """
+        (class_declaration
+            name: (name) @name
+            (base_clause)? @bases
+            (class_interface_clause)? @interfaces
+            body: (declaration_list) @body) @class
+        (interface_declaration
+            name: (name) @name
+            (base_clause)? @bases
+            body: (declaration_list) @body) @class
+        (trait_declaration
+            name: (name) @name
+            body: (declaration_list) @body) @class
+        (method_declaration
+            name: (name) @name
+            parameters: (formal_parameters) @params) @function
+        (function_definition
+            name: (name) @name
+            parameters: (formal_parameters) @params
+            body: (compound_statement) @body) @function
+    """,
+}
+
+# Node types that are a parameter's name
+_NAME_TYPES = {'identifier', 'variable_name', 'self'}
+
+# Parts of a parameter list that do not hold parameter names: annotations,
+# Python and JavaScript variadic parameters, and types and default values
+_SKIPPED_PARAMETER_TYPES = {
+    'list_splat_pattern', 'dictionary_splat_pattern', 'rest_pattern',
+    'modifiers', 'attribute_list', 'decorator',
+}
+_SKIPPED_PARAMETER_FIELDS = {'type', 'value', 'default_value', 'right', 'parameters'}
+
+# Nodes that group base classes without being one
+_BASE_GROUPS = {
+    'argument_list', 'superclass', 'super_interfaces', 'extends_interfaces', 'type_list',
+    'base_class_clause', 'base_list', 'base_clause', 'class_interface_clause',
+}
+_SKIPPED_BASE_TYPES = {
+    'keyword_argument', 'list_splat', 'dictionary_splat', 'access_specifier', 'comment',
+}
+
+# Qualified names and the types wrapping the name of a type
+_QUALIFIED_TYPES = {'qualified_identifier', 'scoped_identifier', 'scoped_type_identifier', 'scope_resolution'}
+_WRAPPED_TYPES = {'generic_type', 'template_type', 'pointer_type', 'reference_type'}
+
+_MODIFIER_TYPES = {'modifiers', 'modifier', 'storage_class_specifier', 'static_modifier'}
+
+
+@lru_cache(maxsize=None)
+def get_definition_query(language: str):
+    """Compiled definition query for a language, or None if it has none"""
+    source = DEFINITION_QUERIES.get(language)
+    tree_sitter_language = load_language(language) if source is not None else None
+    if tree_sitter_language is None:
+        return None
+    try:
+        return tree_sitter_language.query(source)
+    except Exception as e:
+        logger.warning(f"Failed to compile definition query for {language}: {e}")
+        return None
+
+
+def extract_definitions(source: SourceBuffer, root_node, language: str, query) -> ParseResult:
+    """Collect classes and functions from the matches of a definition query
+
+    Methods are attached to their innermost enclosing class, or to the class
+    their owner names. Definitions nested inside a function body are local
+    and left out. Blocks share the source buffer and decode their text
+    only when it is read.
+    """
+    decorators: Dict[int, List[str]] = {}
+    matches: List[Tuple[str, object, Dict[str, object]]] = []
+
+    for _, captures in query.matches(root_node):
+        if 'decorator' in captures:
+            decorated = captures['definition'].id
+            decorators.setdefault(decorated, []).append(_text(captures['decorator']).strip())
+        else:
+            for kind in ('class', 'function', 'scope'):
+                if kind in captures:
+                    matches.append((kind, captures[kind], captures))
+                    break
+
+    # Outer definitions first, so the enclosing definitions form a stack
+    matches.sort(key=lambda match: (match[1].start_byte, -match[1].end_byte))
+
+    classes: List[ClassDef] = []
+    functions: List[FunctionDef] = []
+    all_blocks: List[CodeBlock] = []
+    owned: List[Tuple[FunctionDef, str]] = []
+    # (end byte, kind, class for a class, type name for a scope)
+    enclosing: List[Tuple[int, str, object]] = []
+
+    for kind, node, captures in matches:
+        while enclosing and enclosing[-1][0] <= node.start_byte:
+            enclosing.pop()
+        if enclosing and enclosing[-1][1] == 'function':
+            continue
+
+        name, owner = _split_name(captures['name'])
+        if kind == 'scope':
+            enclosing.append((node.end_byte, kind, name))
+            continue
+
+        parent = None
+        if enclosing and enclosing[-1][1] == 'class':
+            parent = enclosing[-1][2]
+        elif enclosing:
+            owner = enclosing[-1][2]
+        if 'owner' in captures:
+            owner = _type_name(captures['owner'])
+
+        block_decorators = decorators.get(node.id, ())
+        common = dict(
+            name=name,
+            start_line=node.start_point[0] + 1,
+            end_line=node.end_point[0] + 1,
+            start_byte=node.start_byte,
+            end_byte=node.end_byte,
+            source=source,
+            parent=parent,
+            decorators=block_decorators,
+        )
+
+        if kind == 'class':
+            block = ClassDef(
+                base_classes=_base_classes(captures.get('bases'), captures.get('interfaces')),
+                **common
+            )
+            classes.append(block)
+        else:
+            block = FunctionDef(
+                parameters=_parameters(captures.get('params') or _parameter_node(node)),
+                is_async=bool(node.children) and node.children[0].type == 'async',
+                is_static=(any(d.startswith('@staticmethod') for d in block_decorators) or
+                           _has_static_modifier(node)),
+                is_class_method=any(d.startswith('@classmethod') for d in block_decorators),
+                **common
+            )
+            if parent is not None:
+                parent.add_method(block)
+            elif owner is not None:
+                owned.append((block, owner))
+            else:
+                functions.append(block)
+
+        all_blocks.append(block)
+        enclosing.append((node.end_byte, kind, block))
+
+    # Methods defined apart from their type belong to it when it is in this file
+    classes_by_name: Dict[str, ClassDef] = {}
+    for cls in classes:
+        classes_by_name.setdefault(cls.name, cls)
+    for block, owner in owned:
+        cls = classes_by_name.get(owner)
+        if cls is None:
+            functions.append(block)
+            continue
+        block.parent = cls
+        cls.add_method(block)
+
+    return ParseResult(
+        language=language,
+        classes=classes,
+        functions=functions,
+        all_blocks=all_blocks,
+        success=True
+    )
+
+
+def _text(node) -> str:
+    return node.text.decode('utf8')
+
+
+def _split_name(node) -> Tuple[str, Optional[str]]:
+    """Name of a definition and the type qualifying it, e.g. ('run', 'Task') for Task::run"""
+    scope = None
+    while node.type in _QUALIFIED_TYPES:
+        name = node.child_by_field_name('name')
+        if name is None:
+            break
+        scope = node.child_by_field_name('scope') or node.child_by_field_name('path')
+        node = name
+    return _type_name(node), (_type_name(scope) if scope is not None else None)
+
+
+def _type_name(node) -> str:
+    """Bare name of a type, without qualification, type arguments or pointers"""
+    while node.type in _QUALIFIED_TYPES or node.type in _WRAPPED_TYPES:
+        inner = (node.child_by_field_name('name') or node.child_by_field_name('type') or
+                 (node.named_children[-1] if node.named_children else None))
+        if inner is None:
+            break
+        node = inner
+    return _text(node)
+
+
+def _parameter_node(function_node):
+    return (function_node.child_by_field_name('parameters') or
+            function_node.child_by_field_name('parameter'))
+
+
+def _parameters(params_node) -> List[str]:
+    """Parameter names, found below the parameter list apart from types and defaults"""
+    if params_node is None:
+        return []
+
+    names = []
+    stack = [params_node]
+    while stack:
+        node = stack.pop()
+        if node.type in _NAME_TYPES:
+            names.append(_text(node))
+            continue
+        if node.type in _SKIPPED_PARAMETER_TYPES:
+            continue
+        children = [
+            child for index, child in enumerate(node.children)
+            if child.is_named and node.field_name_for_child(index) not in _SKIPPED_PARAMETER_FIELDS
+        ]
+        stack.extend(reversed(children))
+    return names
+
+
+def _base_classes(*bases_nodes) -> List[str]:
+    stack = [node for node in reversed(bases_nodes) if node is not None]
+    names = []
+    while stack:
+        node = stack.pop()
+        if node.type in _BASE_GROUPS:
+            stack.extend(reversed(node.named_children))
+        elif node.type not in _SKIPPED_BASE_TYPES:
+            names.append(_text(node))
+    return names
+
+
+def _has_static_modifier(node) -> bool:
+    return any(
+        child.type in _MODIFIER_TYPES and b'static' in child.text.split()
+        for child in node.children
+    )
@@ -3,19 +3,26 @@ Language detection and parser management for tree-sitter.
 """
 
 import logging
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 try:
-    from tree_sitter_languages import get_language, get_parser
+    from tree_sitter import Parser
+    from tree_sitter_languages import get_language
     TREE_SITTER_AVAILABLE = True
 except ImportError:
     TREE_SITTER_AVAILABLE = False
+    Parser = None
     get_language = None
-    get_parser = None
 
 logger = logging.getLogger(__name__)
 
+# Parsers keep per-parse state and must not be shared between threads,
+# so each thread keeps its own parser per language
+_thread_parsers = threading.local()
+
 # Language mappings
 LANGUAGE_EXTENSIONS = {
     'python': ['.py', '.pyw'],
@@ -70,10 +77,37 @@ def detect_language(file_path: str, content: Optional[str] = None) -> str:
     return 'unknown'
 
 
+@lru_cache(maxsize=None)
+def load_language(language: str):
+    """
+    Get the tree-sitter Language for the specified language.
+    
+    Languages are loaded once per process and shared by all parsers and
+    queries; a language that fails to load is not retried.
+    
+    Args:
+        language: Programming language name
+        
+    Returns:
+        Tree-sitter Language instance or None if not available
+    """
+    if not TREE_SITTER_AVAILABLE:
+        return None
+    try:
+        return get_language(language)
+    except Exception as e:
+        logger.debug(f"Failed to load tree-sitter language {language}: {e}")
+        return None
+
+
 def get_parser_for_language(language: str):
     """
     Get a tree-sitter parser for the specified language.
     
+    Parsers are pooled per language and thread: repeated calls from one
+    thread return the same parser, and calls from different threads never
+    share one, so the result can be used freely from a thread pool.
+    
     Args:
         language: Programming language name
         
@@ -84,30 +118,19 @@ def get_parser_for_language(language: str):
         logger.debug("Tree-sitter not available")
         return None
     
-    try:
-        # Handle language aliases
-        lang_map = {
-            'javascript': 'javascript',
-            'typescript': 'typescript', 
-            'python': 'python',
-            'java': 'java',
-            'c': 'c',
-            'cpp': 'cpp',
-            'c_sharp': 'c_sharp',
-            'rust': 'rust',
-            'go': 'go',
-            'ruby': 'ruby',
-            'php': 'php'
-        }
-        
-        mapped_lang = lang_map.get(language, language)
-        if get_parser is None:
+    parsers = getattr(_thread_parsers, 'parsers', None)
+    if parsers is None:
+        parsers = _thread_parsers.parsers = {}
+    
+    parser = parsers.get(language)
+    if parser is None:
+        tree_sitter_language = load_language(language)
+        if tree_sitter_language is None:
             return None
-        return get_parser(mapped_lang)
-        
-    except Exception as e:
-        logger.debug(f"Failed to get parser for {language}: {e}")
-        return None
+        parser = Parser()
+        parser.set_language(tree_sitter_language)
+        parsers[language] = parser
+    return parser
 
 
 def is_tree_sitter_available() -> bool:
@@ -3,11 +3,15 @@ Core tree-sitter parser implementation.
 """
 
 import logging
+from functools import lru_cache
 from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
+from moatless_mcp.utils.file_types import file_classifier
+
+from .extraction import extract_definitions, get_definition_query
 from .languages import get_parser_for_language, detect_language, is_tree_sitter_available
-from .queries import CodeBlock, FunctionDef, ClassDef, ParseResult
+from .queries import CodeBlock, FunctionDef, ClassDef, ParseResult, SourceBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +48,7 @@ class CodeParser:
         # Read content if not provided
         if content is None:
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                content = file_classifier.read_text(file_path)
             except Exception as e:
                 return ParseResult(
                     language='unknown',
@@ -55,6 +58,15 @@ class CodeParser:
                     success=False,
                     error=f"Failed to read file: {e}"
                 )
+            if content is None:
+                return ParseResult(
+                    language='unknown',
+                    classes=[],
+                    functions=[],
+                    all_blocks=[],
+                    success=False,
+                    error="Binary file"
+                )
         
         # Detect language
         language = detect_language(file_path, content)
@@ -82,16 +94,14 @@ class CodeParser:
         
         try:
             # Parse the code
-            tree = parser.parse(bytes(content, 'utf8'))
+            source = SourceBuffer(bytes(content, 'utf8'))
+            tree = parser.parse(source.data)
             root_node = tree.root_node
             
-            # Extract code blocks based on language
-            if language == 'python':
-                return self._parse_python(content, root_node, language)
-            elif language in ['javascript', 'typescript']:
-                return self._parse_javascript(content, root_node, language)
-            elif language == 'java':
-                return self._parse_java(content, root_node, language)
+            # Extract code blocks with the language's definition query
+            query = get_definition_query(language)
+            if query is not None:
+                return extract_definitions(source, root_node, language, query)
             else:
                 return self._parse_generic(content, root_node, language)
                 
@@ -150,303 +160,6 @@ class CodeParser:
         
         return matches
     
-    def _parse_python(self, content: str, root_node, language: str) -> ParseResult:
-        """Parse Python-specific constructs."""
-        lines = content.split('\n')
-        classes = []
-        functions = []
-        all_blocks = []
-        
-        def extract_python_blocks(node, parent_class=None, depth=0):
-            indent = "  " * depth
-            logger.debug(f"{indent}Processing node: {node.type}")
-            
-            if node.type == 'class_definition':
-                logger.debug(f"{indent}Found class definition")
-                class_def = self._extract_python_class(node, lines, parent_class)
-                if class_def:
-                    classes.append(class_def)
-                    all_blocks.append(class_def)
-                    logger.debug(f"{indent}Added class: {class_def.name}")
-                    
-                    # Parse methods within the class
-                    for child in node.children:
-                        if child.type == 'block':
-                            for grandchild in child.children:
-                                extract_python_blocks(grandchild, class_def, depth + 1)
-            
-            elif node.type == 'function_definition':
-                logger.debug(f"{indent}Found function definition")
-                func_def = self._extract_python_function(node, lines, parent_class)
-                if func_def:
-                    if parent_class:
-                        parent_class.methods.append(func_def)
-                        parent_class.children.append(func_def)
-                    else:
-                        functions.append(func_def)
-                    all_blocks.append(func_def)
-                    logger.debug(f"{indent}Added function: {func_def.name}")
-            
-            else:
-                # Recursively process children
-                for child in node.children:
-                    extract_python_blocks(child, parent_class, depth + 1)
-        
-        extract_python_blocks(root_node)
-        
-        return ParseResult(
-            language=language,
-            classes=classes,
-            functions=functions,
-            all_blocks=all_blocks,
-            success=True
-        )
-    
-    def _extract_python_class(self, node, lines: List[str], parent=None) -> Optional[ClassDef]:
-        """Extract Python class definition."""
-        try:
-            start_line = node.start_point[0] + 1  # Convert to 1-based
-            end_line = node.end_point[0] + 1
-            
-            # Find class name
-            name = None
-            for child in node.children:
-                if child.type == 'identifier':
-                    name = child.text.decode('utf8')
-                    break
-            
-            if not name:
-                return None
-            
-            # Extract text
-            text = '\n'.join(lines[start_line-1:end_line])
-            
-            # Extract base classes
-            base_classes = []
-            for child in node.children:
-                if child.type == 'argument_list':
-                    for arg in child.children:
-                        if arg.type == 'identifier':
-                            base_classes.append(arg.text.decode('utf8'))
-            
-            return ClassDef(
-                name=name,
-                start_line=start_line,
-                end_line=end_line,
-                start_byte=node.start_byte,
-                end_byte=node.end_byte,
-                text=text,
-                parent=parent,
-                base_classes=base_classes
-            )
-            
-        except Exception as e:
-            logger.debug(f"Failed to extract Python class: {e}")
-            return None
-    
-    def _extract_python_function(self, node, lines: List[str], parent_class=None) -> Optional[FunctionDef]:
-        """Extract Python function definition."""
-        try:
-            start_line = node.start_point[0] + 1  # Convert to 1-based
-            end_line = node.end_point[0] + 1
-            
-            # Find function name
-            name = None
-            for child in node.children:
-                if child.type == 'identifier':
-                    name = child.text.decode('utf8')
-                    break
-            
-            if not name:
-                return None
-            
-            # Extract text
-            text = '\n'.join(lines[start_line-1:end_line])
-            
-            # Extract parameters
-            parameters = []
-            for child in node.children:
-                if child.type == 'parameters':
-                    for param in child.children:
-                        if param.type == 'identifier':
-                            parameters.append(param.text.decode('utf8'))
-                        elif param.type == 'default_parameter':
-                            for p_child in param.children:
-                                if p_child.type == 'identifier':
-                                    parameters.append(p_child.text.decode('utf8'))
-                                    break
-            
-            # Check for decorators and async
-            is_async = False
-            decorators = []
-            
-            # Look at siblings for decorators (they come before the function)
-            if node.parent:
-                for sibling in node.parent.children:
-                    if sibling.start_byte < node.start_byte:
-                        if sibling.type == 'decorator':
-                            dec_text = sibling.text.decode('utf8').strip()
-                            decorators.append(dec_text)
-                        elif sibling.type == 'async' or (hasattr(sibling, 'text') and 'async' in sibling.text.decode('utf8')):
-                            is_async = True
-            
-            # Check if it's a static method or class method
-            is_static = any('@staticmethod' in dec for dec in decorators)
-            is_class_method = any('@classmethod' in dec for dec in decorators)
-            
-            return FunctionDef(
-                name=name,
-                start_line=start_line,
-                end_line=end_line,
-                start_byte=node.start_byte,
-                end_byte=node.end_byte,
-                text=text,
-                parent=parent_class,
-                parameters=parameters,
-                decorators=decorators,
-                is_async=is_async,
-                is_static=is_static,
-                is_class_method=is_class_method
-            )
-            
-        except Exception as e:
-            logger.debug(f"Failed to extract Python function: {e}")
-            return None
-    
-    def _parse_javascript(self, content: str, root_node, language: str) -> ParseResult:
-        """Parse JavaScript/TypeScript-specific constructs."""
-        lines = content.split('\n')
-        classes = []
-        functions = []
-        all_blocks = []
-        
-        def extract_js_blocks(node, parent_class=None):
-            if node.type == 'class_declaration':
-                class_def = self._extract_js_class(node, lines, parent_class)
-                if class_def:
-                    classes.append(class_def)
-                    all_blocks.append(class_def)
-                    
-                    # Parse methods within the class
-                    for child in node.children:
-                        if child.type == 'class_body':
-                            for method_node in child.children:
-                                if method_node.type == 'method_definition':
-                                    extract_js_blocks(method_node, class_def)
-            
-            elif node.type in ['function_declaration', 'method_definition', 'arrow_function']:
-                func_def = self._extract_js_function(node, lines, parent_class)
-                if func_def:
-                    if parent_class:
-                        parent_class.methods.append(func_def)
-                        parent_class.children.append(func_def)
-                    else:
-                        functions.append(func_def)
-                    all_blocks.append(func_def)
-            
-            else:
-                # Recursively process children
-                for child in node.children:
-                    extract_js_blocks(child, parent_class)
-        
-        extract_js_blocks(root_node)
-        
-        return ParseResult(
-            language=language,
-            classes=classes,
-            functions=functions,
-            all_blocks=all_blocks,
-            success=True
-        )
-    
-    def _extract_js_class(self, node, lines: List[str], parent=None) -> Optional[ClassDef]:
-        """Extract JavaScript class definition."""
-        try:
-            start_line = node.start_point[0] + 1
-            end_line = node.end_point[0] + 1
-            
-            # Find class name
-            name = None
-            for child in node.children:
-                if child.type == 'identifier':
-                    name = child.text.decode('utf8')
-                    break
-            
-            if not name:
-                return None
-            
-            text = '\n'.join(lines[start_line-1:end_line])
-            
-            return ClassDef(
-                name=name,
-                start_line=start_line,
-                end_line=end_line,
-                start_byte=node.start_byte,
-                end_byte=node.end_byte,
-                text=text,
-                parent=parent
-            )
-            
-        except Exception as e:
-            logger.debug(f"Failed to extract JavaScript class: {e}")
-            return None
-    
-    def _extract_js_function(self, node, lines: List[str], parent_class=None) -> Optional[FunctionDef]:
-        """Extract JavaScript function definition."""
-        try:
-            start_line = node.start_point[0] + 1
-            end_line = node.end_point[0] + 1
-            
-            # Find function name
-            name = None
-            for child in node.children:
-                if child.type == 'identifier':
-                    name = child.text.decode('utf8')
-                    break
-                elif child.type == 'property_identifier':
-                    name = child.text.decode('utf8')
-                    break
-            
-            if not name:
-                return None
-            
-            text = '\n'.join(lines[start_line-1:end_line])
-            
-            # Extract parameters
-            parameters = []
-            for child in node.children:
-                if child.type == 'formal_parameters':
-                    for param in child.children:
-                        if param.type == 'identifier':
-                            parameters.append(param.text.decode('utf8'))
-            
-            return FunctionDef(
-                name=name,
-                start_line=start_line,
-                end_line=end_line,
-                start_byte=node.start_byte,
-                end_byte=node.end_byte,
-                text=text,
-                parent=parent_class,
-                parameters=parameters
-            )
-            
-        except Exception as e:
-            logger.debug(f"Failed to extract JavaScript function: {e}")
-            return None
-    
-    def _parse_java(self, content: str, root_node, language: str) -> ParseResult:
-        """Parse Java-specific constructs."""
-        # Similar implementation for Java
-        # For now, return basic structure
-        return ParseResult(
-            language=language,
-            classes=[],
-            functions=[],
-            all_blocks=[],
-            success=True
-        )
-    
     def _parse_generic(self, content: str, root_node, language: str) -> ParseResult:
         """Generic parser for unsupported languages."""
         return ParseResult(
@@ -455,4 +168,10 @@ class CodeParser:
             functions=[],
             all_blocks=[],
             success=True
-        )
\ No newline at end of file
+        )
+
+
+@lru_cache(maxsize=None)
+def get_code_parser() -> CodeParser:
+    """Shared CodeParser; its tree-sitter parsers are pooled per thread, so any thread may use it"""
+    return CodeParser()
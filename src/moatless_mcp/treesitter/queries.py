@@ -2,63 +2,91 @@
 Data structures for representing parsed code elements.
 """
 
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 
 
-@dataclass
+class SourceBuffer:
+    """UTF-8 source of a parsed file, shared by all blocks extracted from it."""
+    
+    __slots__ = ('data', 'view')
+    
+    def __init__(self, data: bytes):
+        self.data = data
+        self.view = memoryview(data)
+    
+    def line_span(self, start_byte: int, end_byte: int) -> Tuple[int, int]:
+        """Byte range of the whole lines containing start_byte..end_byte."""
+        line_start = self.data.rfind(b'\n', 0, start_byte) + 1
+        line_end = self.data.find(b'\n', end_byte)
+        return line_start, len(self.data) if line_end == -1 else line_end
+    
+    def decode(self, start_byte: int, end_byte: int) -> str:
+        return str(self.view[start_byte:end_byte], 'utf-8')
+
+
+@dataclass(slots=True)
 class CodeBlock:
-    """Represents a code block with location information."""
+    """Represents a code block with location information.
+    
+    The block's text is not stored: blocks point into the SourceBuffer of
+    their file, and ``text`` decodes their lines from it on access.
+    Blocks are slotted and their sequences default to a shared empty
+    tuple, so a parsed file costs little more than its definitions.
+    """
     name: str
     start_line: int  # 1-based
     end_line: int    # 1-based
     start_byte: int
     end_byte: int
-    text: str
+    source: Optional[SourceBuffer] = field(default=None, repr=False, compare=False)
     type: str = 'block'  # 'class', 'function', 'method', etc.
     parent: Optional['CodeBlock'] = None
-    children: List['CodeBlock'] = None
+    children: Sequence['CodeBlock'] = ()
     
-    def __post_init__(self):
-        if self.children is None:
-            self.children = []
+    @property
+    def text(self) -> str:
+        """Source lines of the block, from the start of its first line to the end of its last."""
+        if self.source is None:
+            return ''
+        return self.source.decode(*self.source.line_span(self.start_byte, self.end_byte))
+    
+    @property
+    def first_line(self) -> str:
+        """First source line of the block, without decoding the rest."""
+        if self.source is None:
+            return ''
+        line_start, line_end = self.source.line_span(self.start_byte, self.start_byte)
+        return self.source.decode(line_start, line_end)
 
 
-@dataclass 
+@dataclass(slots=True)
 class FunctionDef(CodeBlock):
     """Represents a function definition."""
-    parameters: List[str] = None
+    type: str = 'function'
+    parameters: Sequence[str] = ()
     return_type: Optional[str] = None
-    decorators: List[str] = None
+    decorators: Sequence[str] = ()
     is_async: bool = False
     is_static: bool = False
     is_class_method: bool = False
-    
-    def __post_init__(self):
-        super().__post_init__()
-        if self.parameters is None:
-            self.parameters = []
-        if self.decorators is None:
-            self.decorators = []
-        self.type = 'function'
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassDef(CodeBlock):
     """Represents a class definition."""
-    base_classes: List[str] = None
-    decorators: List[str] = None
-    methods: List[FunctionDef] = None
+    type: str = 'class'
+    base_classes: Sequence[str] = ()
+    decorators: Sequence[str] = ()
+    methods: Sequence[FunctionDef] = ()
     
-    def __post_init__(self):
-        super().__post_init__()
-        if self.base_classes is None:
-            self.base_classes = []
-        if self.decorators is None:
-            self.decorators = []
-        if self.methods is None:
+    def add_method(self, method: FunctionDef) -> None:
+        """Attach a method, allocating the method lists on first use."""
+        if not self.methods:
             self.methods = []
-        self.type = 'class'
+            self.children = []
+        self.methods.append(method)
+        self.children.append(method)
 
 
 @dataclass
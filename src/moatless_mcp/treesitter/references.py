@@ -0,0 +1,365 @@
+"""
+Cross-reference index: where names are called, imported, inherited from and accessed.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+from moatless_mcp.adapters.edits import write_text_atomic
+
+from .languages import detect_language, get_parser_for_language, load_language
+
+logger = logging.getLogger(__name__)
+
+# Each capture is the name node of one reference, named after its kind:
+# @call (calls and constructions), @import, @inherit (base classes,
+# implemented interfaces and traits, embedded types) and @attr (other
+# member accesses). Qualified names are reduced to their last part.
+REFERENCE_QUERIES: Dict[str, str] = {
+    'python': """
+        (call function: (identifier) @call)
+        (call function: (attribute attribute: (identifier) @call))
+        (import_from_statement name: (dotted_name (identifier) @import .))
+        (import_from_statement name: (aliased_import name: (dotted_name (identifier) @import .)))
+        (import_statement name: (dotted_name (identifier) @import .))
+        (import_statement name: (aliased_import name: (dotted_name (identifier) @import .)))
+        (class_definition superclasses: (argument_list (identifier) @inherit))
+        (class_definition superclasses: (argument_list (attribute attribute: (identifier) @inherit)))
+        (attribute attribute: (identifier) @attr)
+    """,
+    'javascript': """
+        (call_expression function: (identifier) @call)
+        (call_expression function: (member_expression property: (property_identifier) @call))
+        (new_expression constructor: (identifier) @call)
+        (new_expression constructor: (member_expression property: (property_identifier) @call))
+        (import_specifier name: (identifier) @import)
+        (import_clause (identifier) @import)
+        (namespace_import (identifier) @import)
+        (class_heritage (identifier) @inherit)
+        (class_heritage (member_expression property: (property_identifier) @inherit))
+        (member_expression property: (property_identifier) @attr)
+    """,
+    'typescript': """
+        (call_expression function: (identifier) @call)
+        (call_expression function: (member_expression property: (property_identifier) @call))
+        (new_expression constructor: (identifier) @call)
+        (new_expression constructor: (member_expression property: (property_identifier) @call))
+        (import_specifier name: (identifier) @import)
+        (import_clause (identifier) @import)
+        (namespace_import (identifier) @import)
+        (extends_clause value: (identifier) @inherit)
+        (extends_clause value: (member_expression property: (property_identifier) @inherit))
+        (implements_clause (type_identifier) @inherit)
+        (implements_clause (generic_type name: (type_identifier) @inherit))
+        (extends_type_clause type: (type_identifier) @inherit)
+        (member_expression property: (property_identifier) @attr)
+    """,
+    'java': """
+        (method_invocation name: (identifier) @call)
+        (object_creation_expression type: (type_identifier) @call)
+        (object_creation_expression type: (generic_type (type_identifier) @call))
+        (import_declaration (scoped_identifier name: (identifier) @import))
+        (superclass (type_identifier) @inherit)
+        (superclass (generic_type (type_identifier) @inherit))
+        (super_interfaces (type_list (type_identifier) @inherit))
+        (super_interfaces (type_list (generic_type (type_identifier) @inherit)))
+        (extends_interfaces (type_list (type_identifier) @inherit))
+        (field_access field: (identifier) @attr)
+    """,
+    'c': """
+        (call_expression function: (identifier) @call)
+        (call_expression function: (field_expression field: (field_identifier) @call))
+        (field_expression field: (field_identifier) @attr)
+    """,
+    'cpp': """
+        (call_expression function: (identifier) @call)
+        (call_expression function: (field_expression field: (field_identifier) @call))
+        (call_expression function: (qualified_identifier name: (identifier) @call))
+        (call_expression function: (template_function name: (identifier) @call))
+        (new_expression type: (type_identifier) @call)
+        (base_class_clause (type_identifier) @inherit)
+        (base_class_clause (qualified_identifier name: (type_identifier) @inherit))
+        (base_class_clause (template_type name: (type_identifier) @inherit))
+        (using_declaration (qualified_identifier name: (identifier) @import))
+        (field_expression field: (field_identifier) @attr)
+    """,
+    'go': """
+        (call_expression function: (identifier) @call)
+        (call_expression function: (selector_expression field: (field_identifier) @call))
+        (import_spec path: (interpreted_string_literal) @import)
+        (field_declaration !name type: (type_identifier) @inherit)
+        (field_declaration !name type: (qualified_type name: (type_identifier) @inherit))
+        (interface_type (constraint_elem (type_identifier) @inherit))
+        (interface_type (constraint_elem (qualified_type name: (type_identifier) @inherit)))
+        (selector_expression field: (field_identifier) @attr)
+    """,
+    'rust': """
+        (call_expression function: (identifier) @call)
+        (call_expression function: (field_expression field: (field_identifier) @call))
+        (call_expression function: (scoped_identifier name: (identifier) @call))
+        (macro_invocation macro: (identifier) @call)
+        (use_declaration argument: (scoped_identifier name: (identifier) @import))
+        (use_declaration argument: (identifier) @import)
+        (use_list (identifier) @import)
+        (use_list (scoped_identifier name: (identifier) @import))
+        (use_as_clause path: (identifier) @import)
+        (use_as_clause path: (scoped_identifier name: (identifier) @import))
+        (impl_item trait: (type_identifier) @inherit)
+        (impl_item trait: (scoped_type_identifier name: (type_identifier) @inherit))
+        (field_expression field: (field_identifier) @attr)
+    """,
+    'c_sharp': """
+        (invocation_expression function: (identifier) @call)
+        (invocation_expression function: (member_access_expression name: (identifier) @call))
+        (object_creation_expression type: (identifier) @call)
+        (object_creation_expression type: (generic_name (identifier) @call))
+        (using_directive (qualified_name name: (identifier) @import))
+        (using_directive (identifier) @import)
+        (base_list (identifier) @inherit)
+        (base_list (generic_name (identifier) @inherit))
+        (member_access_expression name: (identifier) @attr)
+    """,
+    'ruby': """
+        (call method: (identifier) @call)
+        (superclass (constant) @inherit)
+        (superclass (scope_resolution name: (constant) @inherit))
+    """,
+    'php': """
+        (function_call_expression function: (name) @call)
+        (function_call_expression function: (qualified_name (name) @call .))
+        (member_call_expression name: (name) @call)
+        (scoped_call_expression name: (name) @call)
+        (object_creation_expression (name) @call)
+        (object_creation_expression (qualified_name (name) @call .))
+        (namespace_use_clause (qualified_name (name) @import .))
+        (namespace_use_clause (name) @import)
+        (base_clause (name) @inherit)
+        (base_clause (qualified_name (name) @inherit .))
+        (class_interface_clause (name) @inherit)
+        (class_interface_clause (qualified_name (name) @inherit .))
+        (member_access_expression name: (name) @attr)
+    """,
+}
+
+REFERENCE_KINDS = ('call', 'import', 'inherit', 'attr')
+
+# A node captured by several patterns keeps the most specific kind, e.g.
+# the method name of ``obj.method()`` is a call rather than an attribute
+_KIND_PRIORITY = {kind: rank for rank, kind in enumerate(REFERENCE_KINDS)}
+
+# Version of the persisted index layout; older files are rebuilt
+REFERENCE_INDEX_VERSION = 1
+
+
+@dataclass(slots=True, frozen=True)
+class Reference:
+    """One use of a name in a file."""
+    name: str
+    line: int  # 1-based
+    kind: str  # one of REFERENCE_KINDS
+
+
+@lru_cache(maxsize=None)
+def get_reference_query(language: str):
+    """Compiled reference query for a language, or None if it has none"""
+    source = REFERENCE_QUERIES.get(language)
+    tree_sitter_language = load_language(language) if source is not None else None
+    if tree_sitter_language is None:
+        return None
+    try:
+        return tree_sitter_language.query(source)
+    except Exception as e:
+        logger.warning(f"Failed to compile reference query for {language}: {e}")
+        return None
+
+
+def extract_references(file_path: str, content: str) -> Optional[Tuple[Reference, ...]]:
+    """References in content, in source order; None if its language has no reference query."""
+    language = detect_language(file_path, content)
+    query = get_reference_query(language)
+    parser = get_parser_for_language(language) if query is not None else None
+    if parser is None:
+        return None
+
+    tree = parser.parse(bytes(content, 'utf8'))
+    found: Dict[Tuple[int, int], Tuple[str, object]] = {}
+    for node, kind in query.captures(tree.root_node):
+        key = (node.start_byte, node.end_byte)
+        previous = found.get(key)
+        if previous is None or _KIND_PRIORITY[kind] < _KIND_PRIORITY[previous[0]]:
+            found[key] = (kind, node)
+
+    references = []
+    for key in sorted(found):
+        kind, node = found[key]
+        name = node.text.decode('utf8', errors='replace')
+        if node.type == 'interpreted_string_literal':
+            # Go imports are package paths; the package is referred to by its last part
+            name = name.strip('"').rsplit('/', 1)[-1]
+        if name:
+            references.append(Reference(name, node.start_point[0] + 1, kind))
+    return tuple(references)
+
+
+class ReferenceIndex:
+    """References of every file in a workspace, by name, persisted between sessions.
+
+    Files are keyed by their workspace-relative path and recorded with an
+    mtime/size fingerprint, so a refresh re-parses only the files that
+    changed since the index was last saved.
+    """
+
+    def __init__(self, index_file: Optional[Path] = None):
+        self.index_file = index_file
+        # path -> (fingerprint, references in source order)
+        self._files: Dict[str, Tuple[str, Tuple[Reference, ...]]] = {}
+        # name -> path -> references to that name in the file
+        self._by_name: Dict[str, Dict[str, List[Reference]]] = {}
+        self._lock = threading.Lock()
+        self._loaded = index_file is None
+        self.dirty = False
+
+    def ensure_loaded(self) -> None:
+        """Read the persisted index once; a missing or outdated file leaves it empty."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable reference index {self.index_file}: {e}")
+            return
+        if data.get('version') != REFERENCE_INDEX_VERSION:
+            return
+        for file_path, (fingerprint, references) in data.get('files', {}).items():
+            self.update(file_path, fingerprint, tuple(Reference(*ref) for ref in references))
+        self.dirty = False
+
+    def save(self) -> None:
+        """Write the index to its file if it changed since it was loaded or saved."""
+        if self.index_file is None or not self.dirty:
+            return
+        with self._lock:
+            data = {
+                'version': REFERENCE_INDEX_VERSION,
+                'files': {
+                    file_path: [fingerprint, [[ref.name, ref.line, ref.kind] for ref in references]]
+                    for file_path, (fingerprint, references) in self._files.items()
+                }
+            }
+            self.dirty = False
+        try:
+            write_text_atomic(self.index_file, json.dumps(data, separators=(',', ':')))
+        except OSError as e:
+            logger.warning(f"Could not save reference index to {self.index_file}: {e}")
+
+    def is_current(self, file_path: str, fingerprint: str) -> bool:
+        entry = self._files.get(file_path)
+        return entry is not None and entry[0] == fingerprint
+
+    def update(self, file_path: str, fingerprint: Optional[str],
+               references: Optional[Tuple[Reference, ...]]) -> None:
+        """Replace the references of file_path; a None fingerprint removes the file."""
+        with self._lock:
+            previous = self._files.pop(file_path, None)
+            if previous is not None:
+                for name in {ref.name for ref in previous[1]}:
+                    files = self._by_name[name]
+                    del files[file_path]
+                    if not files:
+                        del self._by_name[name]
+            self.dirty = True
+            if fingerprint is None:
+                return
+            references = references or ()
+            self._files[file_path] = (fingerprint, references)
+            for ref in references:
+                self._by_name.setdefault(ref.name, {}).setdefault(file_path, []).append(ref)
+
+    def retain(self, file_paths: Iterable[str]) -> None:
+        """Drop every file not in file_paths."""
+        keep = set(file_paths)
+        for file_path in [path for path in self._files if path not in keep]:
+            self.update(file_path, None, None)
+
+    def lookup(self, name: str, kinds: Optional[Collection[str]] = None) -> List[Tuple[str, Reference]]:
+        """(path, reference) of every reference to name, by path and line."""
+        with self._lock:
+            files = self._by_name.get(name, {})
+            return [
+                (file_path, ref)
+                for file_path in sorted(files)
+                for ref in files[file_path]
+                if kinds is None or ref.kind in kinds
+            ]
+
+    def in_range(self, file_path: str, start_line: int, end_line: int,
+                 kinds: Optional[Collection[str]] = None) -> List[Reference]:
+        """References of file_path between two lines, inclusive."""
+        entry = self._files.get(file_path)
+        if entry is None:
+            return []
+        return [
+            ref for ref in entry[1]
+            if start_line <= ref.line <= end_line and (kinds is None or ref.kind in kinds)
+        ]
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
+
+    def __len__(self) -> int:
+        return sum(len(entry[1]) for entry in self._files.values())
+
+
+class ReferenceIndexes:
+    """One reference index per workspace root, for the most recently used workspaces."""
+
+    def __init__(self, max_workspaces: int = 8):
+        self.max_workspaces = max_workspaces
+        self._indexes: 'OrderedDict[str, ReferenceIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, workspace_root: Path, cache_dir: Optional[Path] = None) -> ReferenceIndex:
+        """Index of workspace_root, persisted under cache_dir (in memory only without one).
+
+        The index file is named after the workspace path, so it lives
+        outside the workspace and never appears in its listings or searches.
+        """
+        key = str(workspace_root)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index_file = None
+                if cache_dir is not None:
+                    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+                    index_file = cache_dir / 'references' / f'{workspace_root.name}-{digest}.json'
+                index = self._indexes[key] = ReferenceIndex(index_file)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_workspaces:
+                self._indexes.popitem(last=False)
+            return index
+
+    def discard(self, workspace_root: Path, file_path: str) -> None:
+        """Drop file_path from the loaded index of workspace_root, so the next refresh re-parses it."""
+        with self._lock:
+            index = self._indexes.get(str(workspace_root))
+        if index is not None and index._loaded:
+            index.update(file_path, None, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+reference_indexes = ReferenceIndexes()
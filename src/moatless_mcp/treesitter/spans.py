@@ -0,0 +1,111 @@
+"""
+Span index: qualified definition names mapped to their location in a file.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .parser import get_code_parser
+from .queries import CodeBlock, ParseResult
+
+
+@dataclass(slots=True, frozen=True)
+class Span:
+    """Location of one definition."""
+    start_line: int  # 1-based
+    end_line: int    # 1-based
+    start_byte: int
+    end_byte: int
+    type: str        # 'class', 'function' or 'method'
+
+
+class SpanIndex:
+    """Definitions of a file by name, built from a single parse.
+
+    Every definition is registered under each suffix of its qualified
+    name, so ``Outer.Inner.method`` is also found as ``Inner.method`` and
+    ``method``.
+    """
+
+    def __init__(self):
+        self._spans: Dict[str, List[Span]] = {}
+
+    @classmethod
+    def from_parse_result(cls, result: ParseResult) -> 'SpanIndex':
+        index = cls()
+        for block in result.all_blocks:
+            index.add(block)
+        return index
+
+    def add(self, block: CodeBlock) -> None:
+        path = []
+        node = block
+        while node is not None:
+            path.append(node.name)
+            node = node.parent
+        path.reverse()
+
+        span_type = 'method' if block.type == 'function' and block.parent is not None else block.type
+        span = Span(block.start_line, block.end_line, block.start_byte, block.end_byte, span_type)
+        for start in range(len(path)):
+            self._spans.setdefault('.'.join(path[start:]), []).append(span)
+
+    def lookup(self, span_id: str) -> List[Span]:
+        """Spans of the definitions named span_id, in source order."""
+        return self._spans.get(span_id, [])
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+
+def build_span_index(file_path: str, content: str) -> Optional[SpanIndex]:
+    """Parse content in the language of file_path; None if it cannot be parsed."""
+    result = get_code_parser().parse_file(file_path, content)
+    if not result.success:
+        return None
+    return SpanIndex.from_parse_result(result)
+
+
+class SpanIndexCache:
+    """Span indexes of recently viewed files, reused while a file's mtime is unchanged."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[int, int, Optional[SpanIndex]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, content: str, mtime_ns: int) -> Optional[SpanIndex]:
+        """Span index for content read from path after it had mtime_ns.
+
+        The mtime must be taken before the content is read, so a change in
+        between is seen as a new version on the next call.
+        """
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime_ns and entry[1] == len(content):
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        index = build_span_index(key, content)
+        with self._lock:
+            self._entries[key] = (mtime_ns, len(content), index)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def discard(self, path: Path) -> None:
+        """Forget the span index of the file at path."""
+        with self._lock:
+            self._entries.pop(str(path), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+span_index_cache = SpanIndexCache()
@@ -0,0 +1,216 @@
+"""
+Fuzzy, ranked search over the definitions of a workspace.
+"""
+
+import heapq
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import PurePosixPath
+from typing import Callable, Collection, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from moatless_mcp.utils.fuzzy import similarity, split_identifier, trigrams
+
+from .symbols import Symbol, SymbolTable
+
+# Weights of the name score: edit distance, shared words, substring match
+EDIT_WEIGHT = 0.5
+TOKEN_WEIGHT = 0.3
+SUBSTRING_WEIGHT = 0.2
+# Added on top of the name score for definitions close to the given path
+PROXIMITY_WEIGHT = 0.15
+# Added when the parent part of a dotted query matches
+PARENT_WEIGHT = 0.2
+# Names scoring below this are not reported at all
+MIN_NAME_SCORE = 0.4
+# Names sharing the most trigrams with the query that are scored exactly
+MAX_CANDIDATES = 512
+
+
+@dataclass(slots=True, frozen=True)
+class SymbolMatch:
+    """One ranked search result."""
+    score: float
+    file_path: str
+    symbol: Symbol
+
+
+class SymbolSearchIndex:
+    """Trigram index over the definition names of a set of files.
+
+    Files are added and replaced one at a time as their symbol tables
+    change, so keeping the index current costs a stat per file rather than
+    a re-parse. A query first collects the names sharing the most trigrams
+    with it, then scores only those by edit distance, camelCase/snake_case
+    word overlap and distance from a given path.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, SymbolTable] = {}
+        # lower-cased name -> (file, symbol) of every definition with that name
+        self._by_name: Dict[str, List[Tuple[str, Symbol]]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, file_path: str, table: Optional[SymbolTable]) -> None:
+        """Replace the definitions of file_path; None removes the file."""
+        with self._lock:
+            previous = self._tables.get(file_path)
+            if previous is table:
+                return
+            if previous is not None:
+                self._remove(file_path, previous)
+            if table is None:
+                return
+            self._tables[file_path] = table
+            for symbol in table.symbols:
+                key = symbol.name.lower()
+                entries = self._by_name.get(key)
+                if entries is None:
+                    entries = self._by_name[key] = []
+                    for gram in trigrams(key):
+                        self._grams.setdefault(gram, set()).add(key)
+                entries.append((file_path, symbol))
+
+    def retain(self, file_paths: Iterable[str]) -> None:
+        """Drop every file not in file_paths."""
+        keep = set(file_paths)
+        for file_path in [path for path in self._tables if path not in keep]:
+            self.update(file_path, None)
+
+    def _remove(self, file_path: str, table: SymbolTable) -> None:
+        del self._tables[file_path]
+        for key in {symbol.name.lower() for symbol in table.symbols}:
+            entries = [entry for entry in self._by_name[key] if entry[0] != file_path]
+            if entries:
+                self._by_name[key] = entries
+                continue
+            del self._by_name[key]
+            for gram in trigrams(key):
+                names = self._grams[gram]
+                names.discard(key)
+                if not names:
+                    del self._grams[gram]
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[Collection[str]] = None,
+               near: Optional[str] = None,
+               path_filter: Optional[Callable[[str], object]] = None) -> List[SymbolMatch]:
+        """The limit best matches for query, best first.
+
+        A dotted query such as ``Parser.parse`` is matched on its last part
+        and ranks definitions inside a matching parent first. kinds limits
+        the symbol kinds considered, near is a workspace-relative path whose
+        neighbourhood is preferred and path_filter selects the files searched.
+        """
+        parent_query, _, name_query = query.strip().rpartition('.')
+        lowered = name_query.lower()
+        if not lowered:
+            return []
+        query_words = _words(name_query)
+        near_dirs = PurePosixPath(near).parent.parts if near else None
+
+        matches = []
+        with self._lock:
+            for key in self._candidates(lowered):
+                substring = 1.0 if lowered in key else 0.0
+                # The length difference alone bounds the edit similarity
+                best_edit = 1.0 - abs(len(key) - len(lowered)) / max(len(key), len(lowered))
+                if (EDIT_WEIGHT * best_edit + TOKEN_WEIGHT + SUBSTRING_WEIGHT * substring < MIN_NAME_SCORE
+                        and key != lowered):
+                    continue
+                edit = similarity(lowered, key)
+                for file_path, symbol in self._by_name[key]:
+                    if kinds is not None and symbol.kind not in kinds:
+                        continue
+                    if path_filter is not None and not path_filter(file_path):
+                        continue
+                    if symbol.name == name_query:
+                        score = 1.0
+                    else:
+                        words = _words(symbol.name)
+                        overlap = len(query_words & words) / len(query_words | words) if words else 0.0
+                        score = EDIT_WEIGHT * edit + TOKEN_WEIGHT * overlap + SUBSTRING_WEIGHT * substring
+                        if score < MIN_NAME_SCORE:
+                            continue
+                    if parent_query and symbol.parent:
+                        if ('.' + symbol.parent).lower().endswith('.' + parent_query.lower()):
+                            score += PARENT_WEIGHT
+                        elif parent_query.lower() in symbol.parent.lower():
+                            score += PARENT_WEIGHT / 2
+                    if near is not None:
+                        score += PROXIMITY_WEIGHT * _proximity(near, near_dirs, file_path)
+                    matches.append(SymbolMatch(round(score, 4), file_path, symbol))
+
+        return heapq.nsmallest(limit, matches,
+                               key=lambda m: (-m.score, m.file_path, m.symbol.start_line))
+
+    def _candidates(self, lowered: str) -> Iterable[str]:
+        if len(lowered) < 3:
+            # Too short to share a trigram with a typo of it; score every name
+            return list(self._by_name)
+        grams = trigrams(lowered)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        # One typo changes at most three trigrams; names sharing few are not close
+        required = max(1, len(grams) // 3)
+        return [key for key, count in counts.most_common(MAX_CANDIDATES) if count >= required]
+
+    @property
+    def file_count(self) -> int:
+        return len(self._tables)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._by_name.values())
+
+
+@lru_cache(maxsize=65536)
+def _words(name: str) -> FrozenSet[str]:
+    return frozenset(split_identifier(name))
+
+
+def _proximity(near: str, near_dirs: Tuple[str, ...], file_path: str) -> float:
+    """1 for the file itself, otherwise the share of near's directories the file lies under."""
+    if file_path == near:
+        return 1.0
+    file_dirs = PurePosixPath(file_path).parent.parts
+    shared = 0
+    for near_dir, file_dir in zip(near_dirs, file_dirs):
+        if near_dir != file_dir:
+            break
+        shared += 1
+    return 0.5 * shared / max(len(near_dirs), len(file_dirs), 1)
+
+
+class SymbolSearchIndexes:
+    """One search index per workspace root, for the most recently used workspaces."""
+
+    def __init__(self, max_workspaces: int = 8):
+        self.max_workspaces = max_workspaces
+        self._indexes: 'OrderedDict[str, SymbolSearchIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, workspace_root: str) -> SymbolSearchIndex:
+        with self._lock:
+            index = self._indexes.get(workspace_root)
+            if index is None:
+                index = self._indexes[workspace_root] = SymbolSearchIndex()
+            self._indexes.move_to_end(workspace_root)
+            while len(self._indexes) > self.max_workspaces:
+                self._indexes.popitem(last=False)
+            return index
+
+    def discard(self, workspace_root: str, file_path: str) -> None:
+        """Drop file_path from the index of workspace_root, if there is one."""
+        with self._lock:
+            index = self._indexes.get(workspace_root)
+        if index is not None:
+            index.update(file_path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+symbol_search_indexes = SymbolSearchIndexes()
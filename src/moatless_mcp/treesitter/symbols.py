@@ -0,0 +1,117 @@
+"""
+Symbol tables: the definitions of a file as flat, compact records.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+from moatless_mcp.utils.file_types import file_classifier
+
+from .parser import get_code_parser
+from .queries import ParseResult
+
+
+@dataclass(slots=True, frozen=True)
+class Symbol:
+    """One definition of a file."""
+    name: str
+    kind: str                  # 'class', 'function' or 'method'
+    start_line: int            # 1-based
+    end_line: int              # 1-based
+    signature: str             # first line of the definition, stripped
+    parent: Optional[str] = None  # qualified name of the enclosing definition
+    parameters: Sequence[str] = ()
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.parent}.{self.name}" if self.parent else self.name
+
+
+@dataclass(slots=True, frozen=True)
+class SymbolTable:
+    """Symbols of one file, in source order."""
+    language: str
+    symbols: Tuple[Symbol, ...]
+
+    @classmethod
+    def from_parse_result(cls, result: ParseResult) -> 'SymbolTable':
+        symbols = []
+        for block in result.all_blocks:
+            path = []
+            node = block.parent
+            while node is not None:
+                path.append(node.name)
+                node = node.parent
+            kind = 'method' if block.type == 'function' and block.parent is not None else block.type
+            symbols.append(Symbol(
+                name=block.name,
+                kind=kind,
+                start_line=block.start_line,
+                end_line=block.end_line,
+                signature=block.first_line.strip(),
+                parent='.'.join(reversed(path)) or None,
+                parameters=tuple(getattr(block, 'parameters', ())),
+            ))
+        return cls(result.language, tuple(symbols))
+
+
+def build_symbol_table(file_path: str, content: str) -> Optional[SymbolTable]:
+    """Parse content in the language of file_path; None if it cannot be parsed."""
+    result = get_code_parser().parse_file(file_path, content)
+    if not result.success:
+        return None
+    return SymbolTable.from_parse_result(result)
+
+
+class SymbolTableCache:
+    """Symbol tables of workspace files, reused while a file's mtime and size are unchanged.
+
+    Unchanged files are answered from a stat alone, so repeated
+    workspace-wide symbol lookups only read and parse what was edited
+    since the previous one.
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[int, int, Optional[SymbolTable]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> Optional[SymbolTable]:
+        """Symbol table of the file at path; None if it cannot be read or parsed."""
+        key = str(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        content = file_classifier.read_text(path)
+        table = build_symbol_table(key, content) if content is not None else None
+        with self._lock:
+            self._entries[key] = (stat.st_mtime_ns, stat.st_size, table)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return table
+
+    def discard(self, path: Path) -> None:
+        """Forget the symbol table of the file at path."""
+        with self._lock:
+            self._entries.pop(str(path), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+symbol_table_cache = SymbolTableCache()
@@ -0,0 +1,68 @@
+"""
+Dedicated thread pool for blocking file I/O in async tool handlers
+"""
+
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class IOExecutor:
+    """Runs blocking file operations off the event loop
+
+    At most ``max_workers`` operations run at once. ``imap`` keeps a
+    window of operations in flight, so multi-file scans overlap disk
+    latency (which dominates on network file systems) without queueing
+    the whole workspace at once.
+    """
+
+    def __init__(self, max_workers: int = 16):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, func: Callable[..., R], *args, **kwargs) -> R:
+        """Run func(*args, **kwargs) on the I/O pool and await its result"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    async def imap(self, func: Callable[[T], R], items: Iterable[T],
+                   window: Optional[int] = None) -> AsyncIterator[R]:
+        """Yield func(item) for every item, in order, with bounded read-ahead
+
+        Exceptions raised by func propagate from the iteration; callers that
+        want to skip failing items should catch them inside func.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        window = window or self.max_workers * 2
+
+        pending = deque()
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                pending.append(loop.run_in_executor(executor, func, item))
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="moatless-io"
+            )
+        return self._executor
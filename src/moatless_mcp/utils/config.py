@@ -5,7 +5,16 @@ Configuration management for Moatless MCP Server
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from moatless_mcp.utils.aio import IOExecutor
+from moatless_mcp.utils.path_policy import TEXT_FILE_NAMES, PathPolicy
+
+# Fields compiled into PathPolicy; assigning any of them drops the cached policies
+_PATH_POLICY_FIELDS = frozenset({
+    "allowed_file_extensions", "forbidden_paths", "allow_hidden_files",
+    "allow_version_control", "ignore_patterns", "respect_gitignore",
+})
 
 
 @dataclass
@@ -15,11 +24,29 @@ class Config:
     # File operations
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     max_lines_per_file: int = 10000
+    file_cache_bytes: int = 32 * 1024 * 1024  # per-workspace file content cache
+    io_workers: int = 16  # concurrent blocking file operations
+    listing_cache_ttl: int = 30  # seconds a workspace tree summary is reused
     
     # Search configuration
     max_search_results: int = 100
     search_timeout: int = 30  # seconds
     
+    # Response formatting
+    output_mode: str = "text"  # "text" or "structured" (JSON properties)
+    drop_duplicate_content: bool = True  # structured mode only
+    max_response_chars: int = 100_000  # 0 disables response pagination
+    cursor_ttl: int = 300  # seconds an idle pagination cursor is kept
+    max_cursors: int = 256
+    
+    # HTTP transports
+    max_connections: int = 64  # established HTTP client sessions, 0 for no limit
+    
+    # Multi-workspace hosting
+    workspace_roots: List[str] = field(default_factory=list)  # empty: only the default workspace
+    max_workspaces: int = 8  # open workspaces kept before LRU eviction
+    workspace_idle_ttl: int = 1800  # seconds before an idle workspace is closed
+    
     # Tree-sitter configuration
     enable_parsing: bool = True
     supported_languages: Dict[str, str] = field(default_factory=lambda: {
@@ -68,6 +95,20 @@ class Config:
     # Allow access to version control and hidden files
     allow_hidden_files: bool = True
     allow_version_control: bool = True
+    
+    # Extra gitignore-style patterns excluded from every workspace
+    ignore_patterns: List[str] = field(default_factory=list)
+    
+    # Skip files excluded by .gitignore and .git/info/exclude in workspace scans
+    # (.moatlessignore files are always honoured)
+    respect_gitignore: bool = True
+    
+    # List files of git work trees from the git index instead of walking them
+    use_git_index: bool = True
+    
+    # Directory for persisted search indexes, kept outside the workspaces so
+    # they never show up in their listings (empty: the user cache directory)
+    index_cache_dir: str = ""
 
     # Project Understand Type Weight
     TypeWeight: set= field(default_factory=lambda: {
@@ -87,6 +128,15 @@ class Config:
 
     
     
+    def __post_init__(self):
+        self._path_policies: Dict[Optional[str], PathPolicy] = {}
+        self._io_executor: Optional[IOExecutor] = None
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in _PATH_POLICY_FIELDS and "_path_policies" in self.__dict__:
+            self._path_policies.clear()
+    
     @classmethod
     def from_env(cls) -> "Config":
         """Create config from environment variables"""
@@ -102,6 +152,51 @@ class Config:
         if timeout := os.getenv("MOATLESS_SEARCH_TIMEOUT"):
             config.search_timeout = int(timeout)
             
+        if output_mode := os.getenv("MOATLESS_OUTPUT_MODE"):
+            config.output_mode = output_mode.lower()
+            
+        if max_chars := os.getenv("MOATLESS_MAX_RESPONSE_CHARS"):
+            config.max_response_chars = int(max_chars)
+            
+        if drop_duplicates := os.getenv("MOATLESS_DROP_DUPLICATE_CONTENT"):
+            config.drop_duplicate_content = drop_duplicates.lower() == "true"
+            
+        if cursor_ttl := os.getenv("MOATLESS_CURSOR_TTL"):
+            config.cursor_ttl = int(cursor_ttl)
+            
+        if max_connections := os.getenv("MOATLESS_MAX_CONNECTIONS"):
+            config.max_connections = int(max_connections)
+            
+        if workspace_roots := os.getenv("MOATLESS_WORKSPACE_ROOTS"):
+            config.workspace_roots = [root for root in workspace_roots.split(os.pathsep) if root]
+            
+        if max_workspaces := os.getenv("MOATLESS_MAX_WORKSPACES"):
+            config.max_workspaces = int(max_workspaces)
+            
+        if idle_ttl := os.getenv("MOATLESS_WORKSPACE_IDLE_TTL"):
+            config.workspace_idle_ttl = int(idle_ttl)
+            
+        if cache_bytes := os.getenv("MOATLESS_FILE_CACHE_BYTES"):
+            config.file_cache_bytes = int(cache_bytes)
+            
+        if io_workers := os.getenv("MOATLESS_IO_WORKERS"):
+            config.io_workers = int(io_workers)
+            
+        if listing_ttl := os.getenv("MOATLESS_LISTING_CACHE_TTL"):
+            config.listing_cache_ttl = int(listing_ttl)
+            
+        if ignore_patterns := os.getenv("MOATLESS_IGNORE_PATTERNS"):
+            config.ignore_patterns = [p.strip() for p in ignore_patterns.split(",") if p.strip()]
+            
+        if respect_gitignore := os.getenv("MOATLESS_RESPECT_GITIGNORE"):
+            config.respect_gitignore = respect_gitignore.lower() == "true"
+            
+        if use_git_index := os.getenv("MOATLESS_USE_GIT_INDEX"):
+            config.use_git_index = use_git_index.lower() == "true"
+            
+        if index_cache_dir := os.getenv("MOATLESS_INDEX_CACHE_DIR"):
+            config.index_cache_dir = index_cache_dir
+            
         # Security settings from environment
         if os.getenv("MOATLESS_ALLOW_HIDDEN_FILES", "true").lower() == "true":
             config.allow_hidden_files = True
@@ -111,49 +206,55 @@ class Config:
             
         return config
     
+    @property
+    def io_executor(self) -> IOExecutor:
+        """Thread pool for file I/O, shared by all workspaces using this config"""
+        if self._io_executor is None:
+            self._io_executor = IOExecutor(max(1, self.io_workers))
+        return self._io_executor
+    
+    @property
+    def index_cache_path(self) -> Path:
+        """Directory holding persisted indexes, defaulting to $XDG_CACHE_HOME/moatless_mcp"""
+        if self.index_cache_dir:
+            return Path(self.index_cache_dir).expanduser()
+        cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(cache_home) / "moatless_mcp"
+    
+    @property
+    def path_policy(self) -> PathPolicy:
+        """Compiled access policy for paths not tied to a workspace"""
+        return self.path_policy_for(None)
+    
+    def path_policy_for(self, root: Optional[Path]) -> PathPolicy:
+        """Compiled access policy for paths under a workspace root
+        
+        Policies are cached per root and rebuilt after a policy field is
+        reassigned. Call invalidate_path_policies() after mutating one of
+        those fields in place.
+        """
+        key = str(root) if root is not None else None
+        policy = self._path_policies.get(key)
+        if policy is None:
+            policy = PathPolicy.from_config(self, root)
+            self._path_policies[key] = policy
+        return policy
+    
+    def release_path_policy(self, root: Path) -> None:
+        """Drop the cached policy for a workspace that is no longer open"""
+        self._path_policies.pop(str(root), None)
+    
+    def invalidate_path_policies(self) -> None:
+        """Drop all cached policies so they are rebuilt on next use"""
+        self._path_policies.clear()
+    
     def is_file_allowed(self, file_path: Path) -> bool:
         """Check if a file is allowed to be accessed"""
-        
-        # Check forbidden paths first (most restrictive)
-        for part in file_path.parts:
-            if part in self.forbidden_paths:
-                return False
-        
-        # Check version control access
-        if not self.allow_version_control:
-            version_control_dirs = {".git", ".svn", ".hg"}
-            for part in file_path.parts:
-                if part in version_control_dirs:
-                    return False
-        
-        # Check hidden files access
-        if not self.allow_hidden_files:
-            for part in file_path.parts:
-                if part.startswith('.') and part not in {'.', '..'}:
-                    return False
-        
-        # Check file extension (more permissive now)
-        file_ext = file_path.suffix.lower()
-        if file_ext not in self.allowed_file_extensions:
-            # Allow files without extension or check if it's a text file
-            if file_ext == "" or self._is_likely_text_file(file_path):
-                return True
-            return False
-        
-        return True
+        return self.path_policy.is_file_allowed(file_path)
     
     def _is_likely_text_file(self, file_path: Path) -> bool:
         """Check if a file is likely a text file by common patterns"""
-        name_lower = file_path.name.lower()
-        
-        # Common text files without extensions
-        text_files = {
-            'readme', 'license', 'changelog', 'makefile', 'dockerfile',
-            'pipfile', 'gemfile', 'rakefile', 'gulpfile', 'gruntfile',
-            'procfile', 'buildfile', 'justfile'
-        }
-        
-        return name_lower in text_files
+        return file_path.name.lower() in TEXT_FILE_NAMES
     
     def get_language_for_file(self, file_path: Path) -> Optional[str]:
         """Get language identifier for a file"""
@@ -0,0 +1,134 @@
+"""
+Opaque continuation cursors with TTL-based eviction
+"""
+
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CursorEntry:
+    kind: str
+    value: Any
+    expires_at: float
+
+
+class CursorStore:
+    """In-memory store mapping opaque tokens to resumable state
+
+    Entries expire ``ttl`` seconds after their last use and the store keeps
+    at most ``max_entries`` of them, evicting the least recently used first.
+    Values exposing a ``close()`` method (e.g. suspended generators) are
+    closed when they are evicted.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CursorEntry]" = OrderedDict()
+
+    def put(self, kind: str, value: Any) -> str:
+        """Store a value and return a new cursor token for it"""
+        self._evict_expired()
+
+        token = secrets.token_urlsafe(12)
+        self._entries[token] = _CursorEntry(kind, value, time.monotonic() + self.ttl)
+
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            self._close(entry)
+
+        return token
+
+    def get(self, token: str, kind: Optional[str] = None) -> Optional[Any]:
+        """Look up a cursor, refreshing its expiry
+
+        Returns None if the token is unknown, expired or of another kind.
+        """
+        self._evict_expired()
+
+        entry = self._entries.get(token)
+        if entry is None or (kind is not None and entry.kind != kind):
+            return None
+
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries.move_to_end(token)
+        return entry.value
+
+    def discard(self, token: str) -> None:
+        """Forget a cursor, closing its value"""
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            self._close(entry)
+
+    def clear(self) -> None:
+        """Drop all cursors"""
+        for entry in self._entries.values():
+            self._close(entry)
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        self._evict_expired()
+        return len(self._entries)
+
+    def _evict_expired(self) -> None:
+        # Entries are kept in last-use order, so expired ones are at the front
+        now = time.monotonic()
+        while self._entries:
+            token, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[token]
+            self._close(entry)
+
+    @staticmethod
+    def _close(entry: _CursorEntry) -> None:
+        close = getattr(entry.value, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"Error closing cursor value: {e}")
+
+
+_END = object()
+
+
+class PagedIterator:
+    """Iterator that is consumed page by page and can be parked in a CursorStore
+
+    One item is read ahead so that the caller knows whether another page
+    exists without pulling it. ``context`` holds the query the iterator was
+    created for, letting callers check that a cursor matches the request.
+    """
+
+    def __init__(self, iterable: Iterable[Any], context: Optional[Dict[str, Any]] = None):
+        self._iterator = iter(iterable)
+        self._lookahead = next(self._iterator, _END)
+        self.context = context or {}
+        self.consumed = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self._lookahead is _END
+
+    def take(self, size: int) -> List[Any]:
+        """Return up to size further items"""
+        items = []
+        while len(items) < size and self._lookahead is not _END:
+            items.append(self._lookahead)
+            self._lookahead = next(self._iterator, _END)
+        self.consumed += len(items)
+        return items
+
+    def close(self) -> None:
+        close = getattr(self._iterator, "close", None)
+        if callable(close):
+            close()
+        self._lookahead = _END
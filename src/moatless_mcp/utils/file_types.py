@@ -0,0 +1,177 @@
+"""
+Binary and text encoding detection from a file's first bytes
+"""
+
+import codecs
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+PathLike = Union[str, os.PathLike]
+
+# Number of leading bytes inspected to classify a file
+SNIFF_BYTES = 8192
+
+# Verdicts are cheap to recompute, so the memo is simply reset when it
+# grows past this many entries
+MAX_MEMOIZED_FILES = 65536
+
+# Checked longest first so that UTF-32 LE is not mistaken for UTF-16 LE.
+# A UTF-8 BOM is kept in the text as U+FEFF so that writes preserve it.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Control bytes that do not occur in text (everything below 0x20 except
+# backspace, tab, newlines, form feed and escape)
+_CONTROL_BYTES = bytes(set(range(0x20)) - {0x08, 0x09, 0x0A, 0x0C, 0x0D, 0x1B})
+
+# Share of control bytes above which a sample is considered binary
+MAX_CONTROL_RATIO = 0.1
+
+
+@dataclass(frozen=True)
+class FileKind:
+    """Classification of a file: binary, or text in the given encoding and line ending"""
+    is_binary: bool
+    encoding: Optional[str] = None
+    newline: str = "\n"
+
+
+BINARY = FileKind(is_binary=True)
+
+# Format of files written from scratch
+UTF8_TEXT = FileKind(is_binary=False, encoding="utf-8")
+
+
+def sniff_bytes(sample: bytes) -> FileKind:
+    """Classify a file from its first bytes
+
+    A byte order mark decides the encoding. Otherwise NUL bytes or a high
+    share of control characters mean binary, valid UTF-8 means UTF-8 and
+    anything else is treated as latin-1 text. Text whose sample contains a
+    CRLF is taken to use CRLF line endings throughout.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            decoded = sample.decode(encoding, errors="ignore")
+            return FileKind(is_binary=False, encoding=encoding, newline=_newline("\r\n" in decoded))
+
+    if b"\0" in sample:
+        return BINARY
+
+    if sample and len(sample.translate(None, _CONTROL_BYTES)) < len(sample) * (1 - MAX_CONTROL_RATIO):
+        return BINARY
+
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character may be cut off at the end of the sample
+        if e.reason != "unexpected end of data":
+            return FileKind(is_binary=False, encoding="latin-1", newline=_newline(b"\r\n" in sample))
+    return FileKind(is_binary=False, encoding="utf-8", newline=_newline(b"\r\n" in sample))
+
+
+def _newline(crlf: bool) -> str:
+    return "\r\n" if crlf else "\n"
+
+
+def decode_text(data: bytes, kind: FileKind) -> str:
+    """Decode file contents classified as text, with line endings normalized to \\n
+
+    Falls back to latin-1 if bytes past the sniffed sample are not valid
+    in the detected encoding. Writes restore the file's line ending from
+    ``kind.newline``.
+    """
+    try:
+        text = data.decode(kind.encoding or "utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class FileClassifier:
+    """Memoizes file classifications per path, mtime and size
+
+    Only the first ``SNIFF_BYTES`` of a file are read, so binary files can
+    be skipped without reading or decoding them in full.
+    """
+
+    def __init__(self):
+        self._verdicts: Dict[str, Tuple[int, int, FileKind]] = {}
+        self._lock = threading.Lock()
+
+    def classify(self, file_path: PathLike, stat: Optional[os.stat_result] = None) -> FileKind:
+        """Classify a file, reusing the cached verdict while it is unchanged"""
+        path = os.fspath(file_path)
+        if stat is None:
+            stat = os.stat(path)
+
+        cached = self._verdicts.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        with open(path, "rb") as f:
+            kind = sniff_bytes(f.read(SNIFF_BYTES))
+        self._remember(path, stat, kind)
+        return kind
+
+    def is_binary(self, file_path: PathLike) -> bool:
+        """Check whether a file is binary; unreadable files count as binary"""
+        try:
+            return self.classify(file_path).is_binary
+        except OSError:
+            return True
+
+    def read_text(self, file_path: PathLike) -> Optional[str]:
+        """Read and decode a text file, or return None for a binary file"""
+        path = os.fspath(file_path)
+        stat = os.stat(path)
+
+        cached = self._verdicts.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            if cached[2].is_binary:
+                return None
+
+        # Binary files are recognised from their first bytes without reading the rest
+        with open(path, "rb") as f:
+            data = f.read(SNIFF_BYTES)
+            kind = sniff_bytes(data)
+            self._remember(path, stat, kind)
+            if kind.is_binary:
+                return None
+            data += f.read()
+        return decode_text(data, kind)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verdicts = {}
+
+    def text_format(self, file_path: PathLike) -> FileKind:
+        """Encoding and line ending to write a file back in
+
+        Files that are missing, unreadable or binary are written as UTF-8
+        with \\n line endings.
+        """
+        try:
+            kind = self.classify(file_path)
+        except OSError:
+            return UTF8_TEXT
+        return UTF8_TEXT if kind.is_binary else kind
+
+    def _remember(self, path: str, stat: os.stat_result, kind: FileKind) -> None:
+        with self._lock:
+            if len(self._verdicts) >= MAX_MEMOIZED_FILES:
+                self._verdicts = {}
+            self._verdicts[path] = (stat.st_mtime_ns, stat.st_size, kind)
+
+
+# Shared by all readers so each file is sniffed once per modification
+file_classifier = FileClassifier()
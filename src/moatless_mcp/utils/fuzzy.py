@@ -0,0 +1,49 @@
+"""
+Fuzzy matching helpers for identifiers
+"""
+
+import re
+from typing import List, Set
+
+# Word boundaries inside an identifier: lower->Upper, acronym->Word, letter<->digit
+_WORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def split_identifier(name: str) -> List[str]:
+    """Lower-cased words of a camelCase, PascalCase or snake_case identifier
+
+    ``HTTPServerConfig`` and ``http_server_config`` both give
+    ``['http', 'server', 'config']``.
+    """
+    return [word.lower() for word in _WORD.findall(name)]
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of text, padded so that its first and last letters count"""
+    padded = f"${text}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between a and b"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    """Edit distance scaled to 0..1, where 1 means equal"""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    return 1.0 - edit_distance(a, b) / longest
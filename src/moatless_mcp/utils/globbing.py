@@ -0,0 +1,120 @@
+"""
+Glob pattern translation shared by path policies, ignore files and file search
+"""
+
+import fnmatch
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+_MAGIC = re.compile(r"[*?\[]")
+# Innermost {a,b} group
+_BRACES = re.compile(r"\{([^{}]*,[^{}]*)\}")
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a '/'-separated glob into an unanchored regex
+
+    ``*`` and ``?`` never cross a slash, while a ``**`` segment matches any
+    number of directories.
+    """
+    segments = pattern.split("/")
+    regex = []
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == "**":
+            regex.append(".*" if last else "(?:[^/]+/)*")
+        else:
+            regex.append(_translate_segment(segment) + ("" if last else "/"))
+    return "".join(regex)
+
+
+def _translate_segment(segment: str) -> str:
+    regex = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = segment.find("]", i + 2 if segment[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                body = segment[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+@dataclass(frozen=True)
+class GlobPattern:
+    """A compiled workspace glob
+
+    ``prefix`` is the directory holding every possible match, so only that
+    subtree needs to be listed, and only recursively if ``recursive``.
+    """
+    pattern: str
+    prefix: str
+    recursive: bool
+    match: Callable[[str], Optional[re.Match]]
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> GlobPattern:
+    """Compile a glob matched against '/'-separated workspace-relative paths
+
+    Patterns containing a slash are matched segment by segment as in
+    translate_glob, starting at the literal leading directories. A pattern
+    without a slash is matched against the whole path like fnmatch, so
+    ``*.py`` finds Python files in every directory. ``{a,b}`` alternatives
+    are expanded first.
+    """
+    pattern = pattern.strip()
+    while pattern.startswith("./"):
+        pattern = pattern[2:]
+    pattern = pattern.lstrip("/")
+
+    compiled = [_compile_alternative(alternative) for alternative in expand_braces(pattern)]
+    prefixes = {prefix for prefix, _, _ in compiled}
+
+    prefix = os.path.commonpath(list(prefixes)) if len(prefixes) > 1 else prefixes.pop()
+    recursive = any(rec for _, rec, _ in compiled) or any(p != prefix for p, _, _ in compiled)
+    regex = "|".join(regex for _, _, regex in compiled)
+    return GlobPattern(pattern, prefix, recursive, re.compile(f"(?:{regex})").match)
+
+
+def expand_braces(pattern: str) -> List[str]:
+    """Expand ``{a,b}`` alternatives, innermost first, into separate patterns"""
+    match = _BRACES.search(pattern)
+    if match is None:
+        return [pattern]
+
+    expanded = []
+    for alternative in match.group(1).split(","):
+        expanded.extend(expand_braces(pattern[:match.start()] + alternative + pattern[match.end():]))
+    return expanded
+
+
+def _compile_alternative(pattern: str) -> Tuple[str, bool, str]:
+    """(literal prefix, recursive, anchored regex) for a pattern without braces"""
+    if "/" not in pattern:
+        return "", True, fnmatch.translate(pattern)
+
+    segments = pattern.split("/")
+    literal = 0
+    while literal < len(segments) - 1 and not _MAGIC.search(segments[literal]):
+        literal += 1
+    rest = segments[literal:]
+
+    recursive = len(rest) > 1 or rest[0] == "**"
+    return "/".join(segments[:literal]), recursive, f"{translate_glob(pattern)}\\Z"
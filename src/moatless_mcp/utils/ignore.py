@@ -0,0 +1,206 @@
+"""
+Ignore-file engine honouring .gitignore, .git/info/exclude and .moatlessignore
+"""
+
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from moatless_mcp.utils.globbing import translate_glob
+
+logger = logging.getLogger(__name__)
+
+GITIGNORE = ".gitignore"
+MOATLESSIGNORE = ".moatlessignore"
+GIT_EXCLUDE = os.path.join(".git", "info", "exclude")
+
+
+@dataclass(frozen=True)
+class IgnoreRuleGroup:
+    """Consecutive rules from one ignore file sharing negation and directory-only flags
+
+    ``base`` is the directory of the ignore file relative to the root
+    ('' for the root), and ``regex`` matches paths relative to it.
+    """
+    base: str
+    regex: "re.Pattern"
+    negated: bool
+    directory_only: bool
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        if self.directory_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        return self.regex.search(rel_path) is not None
+
+
+def parse_ignore_lines(lines: Iterable[str], base: str = "") -> List[IgnoreRuleGroup]:
+    """Parse gitignore syntax into rule groups, preserving rule order
+
+    Supports comments, ``!`` negation, escaped leading ``#``/``!``, a
+    trailing ``/`` for directory-only rules and anchoring of any pattern
+    containing a slash to the ignore file's directory.
+    """
+    groups: List[IgnoreRuleGroup] = []
+    pending: List[str] = []
+    pending_key: Optional[Tuple[bool, bool]] = None
+
+    def flush() -> None:
+        if pending:
+            regex = re.compile("|".join(pending))
+            groups.append(IgnoreRuleGroup(base, regex, *pending_key))
+            pending.clear()
+
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line or line.startswith("#"):
+            continue
+
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped = stripped[:-1] + " "
+        line = stripped
+        if not line:
+            continue
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\#") or line.startswith("\\!"):
+            line = line[1:]
+
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+        regex = ("^" if anchored else "(?:^|/)") + translate_glob(line) + "$"
+
+        key = (negated, directory_only)
+        if key != pending_key:
+            flush()
+            pending_key = key
+        pending.append(f"(?:{regex})")
+
+    flush()
+    return groups
+
+
+class IgnoreEngine:
+    """Decides whether workspace paths are ignored by ignore files
+
+    Rules are read lazily per directory: every directory may contain a
+    ``.gitignore`` and a ``.moatlessignore``, and the root additionally
+    uses ``.git/info/exclude``. As in git, the last matching rule wins,
+    deeper files take precedence over shallower ones and ``.git``
+    directories are never part of the work tree. Parsed files are
+    re-validated against their mtimes at most every ``refresh_interval``
+    seconds, when a walk calls :meth:`refresh_if_stale`.
+    """
+
+    def __init__(self, root: str, use_gitignore: bool = True, refresh_interval: float = 1.0):
+        self.root = os.fspath(root)
+        self.use_gitignore = use_gitignore
+        self.refresh_interval = refresh_interval
+        self._file_names = (GITIGNORE, MOATLESSIGNORE) if use_gitignore else (MOATLESSIGNORE,)
+
+        # rel dir -> ((path, mtime_ns or None) per ignore file, own rule groups)
+        self._dir_rules: Dict[str, Tuple[Tuple[Tuple[str, Optional[int]], ...], Tuple[IgnoreRuleGroup, ...]]] = {}
+        # rel dir -> rule groups applying inside it, outermost first
+        self._chains: Dict[str, Tuple[IgnoreRuleGroup, ...]] = {}
+        # rel dir -> whether it or one of its ancestors is ignored
+        self._excluded_dirs: Dict[str, bool] = {}
+        self._validated_at = time.monotonic()
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Check a '/'-separated path relative to the root"""
+        parent, _, name = rel_path.rpartition("/")
+        if is_dir and name == ".git" and self.use_gitignore:
+            return True
+        
+        for group in reversed(self.rules_for(parent)):
+            if group.matches(rel_path, is_dir):
+                return not group.negated
+        return False
+
+    def is_excluded(self, rel_path: str, is_dir: bool) -> bool:
+        """Like is_ignored, but also true for paths inside an ignored directory"""
+        parent = rel_path.rpartition("/")[0]
+        if parent and self._is_dir_excluded(parent):
+            return True
+        return self.is_ignored(rel_path, is_dir)
+    
+    def _is_dir_excluded(self, rel_dir: str) -> bool:
+        excluded = self._excluded_dirs.get(rel_dir)
+        if excluded is None:
+            parent = rel_dir.rpartition("/")[0]
+            excluded = (bool(parent) and self._is_dir_excluded(parent)) or self.is_ignored(rel_dir, True)
+            self._excluded_dirs[rel_dir] = excluded
+        return excluded
+    
+    def rules_for(self, rel_dir: str) -> Tuple[IgnoreRuleGroup, ...]:
+        """Rule groups that apply to entries of a directory"""
+        chain = self._chains.get(rel_dir)
+        if chain is None:
+            parent_chain = self.rules_for(rel_dir.rpartition("/")[0]) if rel_dir else ()
+            chain = parent_chain + self._own_rules(rel_dir)
+            self._chains[rel_dir] = chain
+        return chain
+
+    def refresh_if_stale(self) -> bool:
+        """Drop cached rules if any ignore file changed; returns True if dropped"""
+        now = time.monotonic()
+        if now - self._validated_at < self.refresh_interval:
+            return False
+        self._validated_at = now
+
+        for sources, _ in self._dir_rules.values():
+            for path, mtime in sources:
+                if _mtime_ns(path) != mtime:
+                    self.clear()
+                    return True
+        return False
+
+    def clear(self) -> None:
+        self._dir_rules = {}
+        self._chains = {}
+        self._excluded_dirs = {}
+
+    def _own_rules(self, rel_dir: str) -> Tuple[IgnoreRuleGroup, ...]:
+        directory = os.path.join(self.root, rel_dir) if rel_dir else self.root
+        names = self._file_names
+        if not rel_dir and self.use_gitignore:
+            names = (GIT_EXCLUDE,) + names
+
+        sources = []
+        groups: List[IgnoreRuleGroup] = []
+        for name in names:
+            path = os.path.join(directory, name)
+            mtime = _mtime_ns(path)
+            sources.append((path, mtime))
+            if mtime is None:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    groups.extend(parse_ignore_lines(f, rel_dir))
+            except OSError as e:
+                logger.debug(f"Could not read ignore file {path}: {e}")
+
+        self._dir_rules[rel_dir] = (tuple(sources), tuple(groups))
+        return tuple(groups)
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
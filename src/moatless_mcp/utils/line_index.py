@@ -0,0 +1,76 @@
+"""
+Line-offset table for mapping character offsets to line numbers
+"""
+
+import re
+from bisect import bisect_left
+from typing import Iterable, List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+_NEWLINE = re.compile("\n")
+
+
+class LineIndex:
+    """Offsets of the newlines in a text, built once and queried by binary search
+
+    Turns the offset of a regex match into its line number in O(log n),
+    where ``content[:offset].count('\\n')`` costs O(offset) per match and
+    makes files with many matches quadratic. Build one per version of the
+    content and share it between all lookups on that content.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        if NUMPY_AVAILABLE:
+            # Character offsets: one array element per character
+            if content.isascii():
+                codes = np.frombuffer(content.encode("ascii"), dtype=np.uint8)
+            else:
+                codes = np.frombuffer(content.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+            self._newlines = np.flatnonzero(codes == 10)
+        else:
+            self._newlines = [match.start() for match in _NEWLINE.finditer(content)]
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines, as in len(content.split('\\n'))"""
+        return len(self._newlines) + 1
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number of the character at offset"""
+        if NUMPY_AVAILABLE:
+            return int(np.searchsorted(self._newlines, offset, side="left")) + 1
+        return bisect_left(self._newlines, offset) + 1
+
+    def lines_of(self, offsets: Iterable[int]) -> List[int]:
+        """1-based line numbers of many offsets at once"""
+        offsets = list(offsets)
+        if NUMPY_AVAILABLE:
+            return (np.searchsorted(self._newlines, offsets, side="left") + 1).tolist()
+        return [bisect_left(self._newlines, offset) + 1 for offset in offsets]
+
+    def line_start(self, line: int) -> int:
+        """Offset of the first character of a 1-based line; len(content) past the end"""
+        if line <= 1:
+            return 0
+        if line > self.line_count:
+            return len(self.content)
+        return int(self._newlines[line - 2]) + 1
+
+    def line_end(self, line: int) -> int:
+        """Offset just past the last character of a line, before its newline"""
+        if line > len(self._newlines):
+            return len(self.content)
+        return int(self._newlines[line - 1])
+
+    def line_text(self, line: int) -> str:
+        """Text of a 1-based line without its newline; empty past the end"""
+        if line < 1 or line > self.line_count:
+            return ""
+        return self.content[self.line_start(line):self.line_end(line)]
@@ -0,0 +1,65 @@
+"""
+Asyncio locking primitives shared by concurrent clients
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class AsyncRWLock:
+    """Readers-writer lock for coroutines on a single event loop
+
+    Any number of readers may hold the lock at once, while a writer holds it
+    exclusively. Waiting writers block new readers so a steady stream of
+    read-only tool calls cannot starve an edit.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @property
+    def readers(self) -> int:
+        return self._readers
+
+    @property
+    def locked_for_write(self) -> bool:
+        return self._writer
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        """Hold the lock in shared mode"""
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: not self._writer and not self._waiting_writers
+            )
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        """Hold the lock exclusively"""
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: not self._writer and not self._readers
+                )
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
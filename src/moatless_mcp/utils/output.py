@@ -0,0 +1,142 @@
+"""
+Serialization of tool results into MCP response content
+"""
+
+import json
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.cursors import CursorStore
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CURSOR_KIND = "response"
+
+# Separator between a page and its footer when fetch_page joins them
+_FOOTER_SEPARATOR = "\n\n"
+
+# Strings shorter than this are never considered duplicated content
+_MIN_DUPLICATE_LENGTH = 64
+
+
+def dumps(value: Any) -> str:
+    """Serialize a value to compact JSON, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            value,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        ).decode("utf-8")
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+def drop_duplicated_content(value: Any, message: str) -> Any:
+    """Return a copy of value without long strings already present in message"""
+    if isinstance(value, dict):
+        return {
+            key: drop_duplicated_content(item, message)
+            for key, item in value.items()
+            if not _is_duplicate(item, message)
+        }
+    if isinstance(value, (list, tuple)):
+        return [
+            drop_duplicated_content(item, message)
+            for item in value
+            if not _is_duplicate(item, message)
+        ]
+    return value
+
+
+def _is_duplicate(value: Any, message: str) -> bool:
+    return isinstance(value, str) and len(value) >= _MIN_DUPLICATE_LENGTH and value in message
+
+
+def render_result_texts(message: str, properties: Optional[Dict[str, Any]],
+                        config: Config) -> List[str]:
+    """Render a tool result into the text blocks sent to the client"""
+    texts = []
+    if message:
+        texts.append(message)
+
+    if not properties:
+        return texts
+
+    properties = {key: value for key, value in properties.items() if key != "message"}
+
+    if config.output_mode == "structured":
+        if config.drop_duplicate_content and message:
+            properties = drop_duplicated_content(properties, message)
+        if properties:
+            texts.append(dumps(properties))
+    else:
+        for key, value in properties.items():
+            texts.append(f"{key}: {value}")
+
+    return texts
+
+
+def split_into_pages(text: str, page_size: int) -> List[str]:
+    """Split text into pages of at most page_size characters, preferring line breaks"""
+    pages = []
+    start = 0
+    while len(text) - start > page_size:
+        end = text.rfind("\n", start, start + page_size)
+        if end <= start:
+            end = start + page_size
+        pages.append(text[start:end])
+        start = end + 1 if text[end:end + 1] == "\n" else end
+    pages.append(text[start:])
+    return pages
+
+
+def paginate_texts(texts: List[str], max_chars: int, cursors: CursorStore) -> List[str]:
+    """Enforce the response budget, storing overflow behind a cursor
+
+    Returns the texts unchanged when they fit into max_chars. Otherwise the
+    first page is returned with a footer naming the cursor that the
+    fetch_page tool accepts for the next page. Pages leave room for that
+    footer, so a page fetched with it still fits and is not paginated again.
+    """
+    total = sum(len(text) for text in texts)
+    if max_chars <= 0 or total <= max_chars:
+        return texts
+
+    pages: Deque[str] = deque()
+    cursor = cursors.put(RESPONSE_CURSOR_KIND, pages)
+    # There are never more pages than characters, which bounds the footer
+    reserved = len(_FOOTER_SEPARATOR) + len(page_footer(cursor, total))
+    pages.extend(split_into_pages("\n\n".join(texts), max(max_chars - reserved, 1)))
+    first = pages.popleft()
+    return [first, page_footer(cursor, len(pages))]
+
+
+def next_page(cursor: str, cursors: CursorStore) -> Optional[List[str]]:
+    """Return the next stored page for a response cursor, or None if unknown"""
+    pages = cursors.get(cursor, RESPONSE_CURSOR_KIND)
+    if pages is None:
+        return None
+
+    page = pages.popleft()
+    if not pages:
+        cursors.discard(cursor)
+        return [page]
+    return [page, page_footer(cursor, len(pages))]
+
+
+def join_page(page: List[str]) -> str:
+    """Join a page and its footer into one text block"""
+    return _FOOTER_SEPARATOR.join(page)
+
+
+def page_footer(cursor: str, remaining: int) -> str:
+    return (f"... response truncated ({remaining} more page(s)). "
+            f"Call fetch_page with cursor=\"{cursor}\" to continue.")
@@ -0,0 +1,284 @@
+"""
+Compiled file access policy used by workspace scans
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Union
+
+from moatless_mcp.utils.globbing import translate_glob
+from moatless_mcp.utils.ignore import IgnoreEngine
+
+PathLike = Union[str, os.PathLike]
+
+VERSION_CONTROL_DIRS = frozenset({".git", ".svn", ".hg"})
+
+# Common text files without extensions
+TEXT_FILE_NAMES = frozenset({
+    'readme', 'license', 'changelog', 'makefile', 'dockerfile',
+    'pipfile', 'gemfile', 'rakefile', 'gulpfile', 'gruntfile',
+    'procfile', 'buildfile', 'justfile'
+})
+
+# Directory verdicts are cheap to recompute, so the memo is simply reset
+# when it grows past this many entries
+MAX_MEMOIZED_DIRS = 65536
+
+
+def path_suffix(name: str) -> str:
+    """Return the suffix of a file name with the same rules as Path.suffix"""
+    index = name.rfind(".")
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ""
+
+
+def compile_ignore_patterns(patterns: Iterable[str]) -> Optional[Callable[[str, bool], bool]]:
+    """Compile gitignore-style patterns into a single matcher
+
+    The matcher takes a '/'-separated path and whether it is a directory.
+    Patterns without a leading slash match trailing path components
+    (``*.log``, ``build/out``), a leading slash anchors a pattern to the
+    start of the path, ``**`` spans directories and a trailing slash
+    restricts a pattern to directories. Returns None if there are no
+    patterns.
+    """
+    file_parts = []
+    dir_parts = []
+
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            continue
+
+        directory_only = pattern.endswith("/")
+        anchored = pattern.startswith("/")
+        pattern = pattern.strip("/")
+        if not pattern:
+            continue
+
+        regex = ("^" if anchored else "(?:^|/)") + translate_glob(pattern) + "$"
+        dir_parts.append(regex)
+        if not directory_only:
+            file_parts.append(regex)
+
+    if not dir_parts:
+        return None
+
+    file_regex = re.compile("|".join(file_parts)) if file_parts else None
+    dir_regex = re.compile("|".join(dir_parts))
+
+    def matches(path: str, is_dir: bool) -> bool:
+        regex = dir_regex if is_dir else file_regex
+        return regex is not None and regex.search(path) is not None
+
+    return matches
+
+
+class PathPolicy:
+    """File access policy compiled from a Config
+
+    Directory verdicts (forbidden names, version control, hidden entries and
+    ignore patterns for every component) are memoized per directory, so
+    checking a file costs one dictionary lookup plus a suffix lookup.
+    ``iter_files`` prunes rejected directories instead of descending into
+    them.
+
+    With a ``root``, the root and its ancestors are always allowed and
+    ignore patterns are matched against root-relative paths.
+    """
+
+    def __init__(
+        self,
+        forbidden_names: Iterable[str],
+        allowed_suffixes: Iterable[str],
+        allow_hidden: bool = True,
+        allow_version_control: bool = True,
+        ignore_patterns: Iterable[str] = (),
+        root: Optional[PathLike] = None,
+        respect_gitignore: bool = True,
+    ):
+        blocked = set(forbidden_names)
+        if not allow_version_control:
+            blocked |= VERSION_CONTROL_DIRS
+        self._blocked_names = frozenset(blocked)
+        self._allow_hidden = allow_hidden
+        self._allowed_suffixes = frozenset(suffix.lower() for suffix in allowed_suffixes)
+        self._ignored = compile_ignore_patterns(ignore_patterns)
+        self._dir_verdicts: Dict[str, bool] = {}
+
+        self.root = os.fspath(root) if root is not None else None
+        self._root_prefix = os.path.join(self.root, "") if self.root else None
+        
+        # Ignore files only apply to scans of a workspace, not to direct access
+        self.ignore_engine = None
+        if self.root is not None:
+            self.ignore_engine = IgnoreEngine(self.root, use_gitignore=respect_gitignore)
+
+    @classmethod
+    def from_config(cls, config, root: Optional[PathLike] = None) -> "PathPolicy":
+        return cls(
+            forbidden_names=config.forbidden_paths,
+            allowed_suffixes=config.allowed_file_extensions,
+            allow_hidden=config.allow_hidden_files,
+            allow_version_control=config.allow_version_control,
+            ignore_patterns=config.ignore_patterns,
+            root=root,
+            respect_gitignore=config.respect_gitignore,
+        )
+
+    def is_name_allowed(self, name: str) -> bool:
+        """Check a single path component against the name rules"""
+        if name in self._blocked_names:
+            return False
+        if not self._allow_hidden and name.startswith(".") and name not in (".", ".."):
+            return False
+        return True
+
+    def is_dir_allowed(self, directory: PathLike) -> bool:
+        """Check that no component of a directory path is rejected"""
+        return self._dir_verdict(os.fspath(directory))
+
+    def is_file_allowed(self, file_path: PathLike) -> bool:
+        """Check if a file is allowed to be accessed"""
+        path = os.fspath(file_path)
+        directory, name = os.path.split(path)
+
+        if directory and not self._dir_verdict(directory):
+            return False
+        return self._file_name_allowed(name, path)
+
+    def iter_files(self, base_path: PathLike, recursive: bool = True) -> Iterator[Path]:
+        """Yield allowed files under base_path, pruning rejected directories
+
+        Under the policy root, entries excluded by ignore files are skipped
+        as well; an ignored directory is never entered. Symlinked
+        directories are not followed, matching Path.rglob.
+        """
+        base = os.fspath(base_path)
+        if not self.is_dir_allowed(base):
+            return
+
+        ignore = self.ignore_engine
+        rel_base = self._relative(base) if ignore is not None else None
+        if rel_base is not None:
+            ignore.refresh_if_stale()
+
+        stack = [(base, rel_base)]
+        while stack:
+            directory, rel_dir = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        rel_path = None
+                        if rel_dir is not None:
+                            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if (recursive and self._child_dir_allowed(name, entry.path) and
+                                        (rel_path is None or not ignore.is_ignored(rel_path, True))):
+                                    subdirs.append((entry.path, rel_path))
+                            elif (entry.is_file() and self._file_name_allowed(name, entry.path) and
+                                    (rel_path is None or not ignore.is_ignored(rel_path, False))):
+                                yield Path(entry.path)
+                        except OSError:
+                            continue
+            except (PermissionError, FileNotFoundError, NotADirectoryError):
+                continue
+
+            stack.extend(reversed(subdirs))
+
+    def is_ignored(self, file_path: PathLike, is_dir: bool = False) -> bool:
+        """Check whether ignore files exclude a path under the root from scans"""
+        if self.ignore_engine is None:
+            return False
+        rel_path = self._relative(os.fspath(file_path))
+        if not rel_path:
+            return False
+        return self.ignore_engine.is_excluded(rel_path, is_dir)
+
+    def filter_relative(self, rel_paths: Iterable[str]) -> Iterator[str]:
+        """Yield the root-relative file paths that a walk would have produced
+
+        Used for listings that come from elsewhere (e.g. the git index).
+        """
+        ignore = self.ignore_engine
+        if ignore is not None:
+            ignore.refresh_if_stale()
+
+        for rel_path in rel_paths:
+            full_path = os.path.join(self.root, rel_path)
+            if not self.is_file_allowed(full_path):
+                continue
+            if ignore is not None and ignore.is_excluded(rel_path, False):
+                continue
+            yield rel_path
+
+    def _file_name_allowed(self, name: str, path: str) -> bool:
+        if not self.is_name_allowed(name):
+            return False
+        if self._ignored is not None and self._ignored(self._match_path(path), False):
+            return False
+
+        suffix = path_suffix(name).lower()
+        if suffix in self._allowed_suffixes or suffix == "":
+            return True
+        return name.lower() in TEXT_FILE_NAMES
+
+    def _child_dir_allowed(self, name: str, path: str) -> bool:
+        # Only called while walking, where the parent is known to be allowed
+        verdict = self._dir_verdicts.get(path)
+        if verdict is None:
+            verdict = self._name_and_pattern_allowed(name, path)
+            self._remember(path, verdict)
+        return verdict
+
+    def _dir_verdict(self, directory: str) -> bool:
+        verdict = self._dir_verdicts.get(directory)
+        if verdict is not None:
+            return verdict
+
+        parent, name = os.path.split(directory)
+        if not name or self._is_root_or_above(directory):
+            verdict = True
+        else:
+            verdict = self._name_and_pattern_allowed(name, directory)
+            if verdict and parent and parent != directory:
+                verdict = self._dir_verdict(parent)
+
+        self._remember(directory, verdict)
+        return verdict
+
+    def _name_and_pattern_allowed(self, name: str, path: str) -> bool:
+        if not self.is_name_allowed(name):
+            return False
+        if self._ignored is not None and self._ignored(self._match_path(path), True):
+            return False
+        return True
+
+    def _is_root_or_above(self, directory: str) -> bool:
+        if self.root is None:
+            return False
+        return self._root_prefix.startswith(os.path.join(directory, ""))
+
+    def _relative(self, path: str) -> Optional[str]:
+        """'/'-separated path relative to the root, or None if outside it"""
+        if path == self.root:
+            return ""
+        if not path.startswith(self._root_prefix):
+            return None
+        rel_path = path[len(self._root_prefix):]
+        return rel_path if os.sep == "/" else rel_path.replace(os.sep, "/")
+
+    def _match_path(self, path: str) -> str:
+        if self._root_prefix and path.startswith(self._root_prefix):
+            path = path[len(self._root_prefix):]
+        return path if os.sep == "/" else path.replace(os.sep, "/")
+
+    def _remember(self, directory: str, verdict: bool) -> None:
+        if len(self._dir_verdicts) >= MAX_MEMOIZED_DIRS:
+            self._dir_verdicts.clear()
+        self._dir_verdicts[directory] = verdict
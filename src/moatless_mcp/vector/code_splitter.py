@@ -4,12 +4,14 @@ Code splitting using tree-sitter for semantic chunks.
 
 import logging
 import hashlib
+import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
-from moatless_mcp.treesitter import CodeParser, detect_language, is_tree_sitter_available
+from moatless_mcp.treesitter import detect_language, get_code_parser, is_tree_sitter_available
 from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.file_types import file_classifier
 
 try:
     import tiktoken
@@ -20,9 +22,14 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CodeChunk:
-    """Represents a semantic code chunk for embedding."""
+    """Represents a semantic code chunk for embedding.
+    
+    Chunks are slotted and immutable, with the strings repeated across an
+    index (file path, language, chunk type, parent name) interned, so a
+    large in-memory index pays little per chunk beyond its content.
+    """
     id: str  # Unique identifier
     content: str  # The actual code content
     file_path: str  # Relative path to the file
@@ -32,16 +39,33 @@ class CodeChunk:
     name: str  # Name of the code element (class name, function name, etc.)
     parent_name: Optional[str] = None  # Parent class name for methods
     language: str = "unknown"  # Programming language
-    metadata: Dict[str, Any] = None  # Additional metadata
+    metadata: Optional[Dict[str, Any]] = None  # Additional metadata, None when there is none
     
     def __post_init__(self):
-        if self.metadata is None:
-            self.metadata = {}
+        self._intern()
         
         # Generate ID from content hash if not provided
         if not self.id:
             content_hash = hashlib.md5(self.content.encode()).hexdigest()[:8]
-            self.id = f"{self.file_path}:{self.start_line}:{content_hash}"
+            object.__setattr__(self, "id", f"{self.file_path}:{self.start_line}:{content_hash}")
+    
+    def _intern(self):
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                object.__setattr__(self, name, sys.intern(value))
+    
+    def __getstate__(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+    
+    def __setstate__(self, state):
+        # Also restores chunks pickled before chunks were slotted
+        for f in fields(self):
+            object.__setattr__(self, f.name, state.get(f.name, f.default))
+        self._intern()
+
+
+_INTERNED_FIELDS = ("file_path", "chunk_type", "parent_name", "language")
 
 
 class CodeSplitter:
@@ -50,7 +74,7 @@ class CodeSplitter:
     def __init__(self, config: Config, workspace_root: str = "."):
         self.config = config
         self.workspace_root = Path(workspace_root)
-        self.parser = CodeParser() if is_tree_sitter_available() else None
+        self.parser = get_code_parser() if is_tree_sitter_available() else None
         
         # Configuration for chunk sizes (in tokens)
         self.max_tokens = 7000      # Max tokens per chunk (leave buffer for Jina's 8194 limit)
@@ -159,7 +183,7 @@ class CodeSplitter:
                 name=name,
                 parent_name=parent_name,
                 language=language,
-                metadata=metadata or {}
+                metadata=metadata or None
             )]
         
         # Content too large, split into multiple chunks
@@ -218,11 +242,13 @@ class CodeSplitter:
             # Read content if not provided
             if content is None:
                 try:
-                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
+                    content = file_classifier.read_text(full_path)
                 except Exception as e:
                     logger.debug(f"Failed to read file {file_path}: {e}")
                     return []
+                if content is None:
+                    logger.debug(f"Skipping binary file: {file_path}")
+                    return []
             
             if not content.strip():
                 return []
@@ -277,7 +303,7 @@ class CodeSplitter:
                 
                 # Add methods as individual chunks
                 for method in cls.methods:
-                    method_content = self._extract_block_content(method, lines)
+                    method_content = self._extract_block_content(method)
                     if method_content and len(method_content) >= self.min_chunk_size:
                         method_chunks = self._create_chunks_from_content(
                             content=method_content,
@@ -298,7 +324,7 @@ class CodeSplitter:
             
             # Process standalone functions
             for func in result.functions:
-                func_content = self._extract_block_content(func, lines)
+                func_content = self._extract_block_content(func)
                 if func_content and len(func_content) >= self.min_chunk_size:
                     func_chunks = self._create_chunks_from_content(
                         content=func_content,
@@ -352,12 +378,10 @@ class CodeSplitter:
         except:
             return ""
     
-    def _extract_block_content(self, block, lines: List[str]) -> str:
+    def _extract_block_content(self, block) -> str:
         """Extract content of a code block."""
         try:
-            start_idx = block.start_line - 1
-            end_idx = min(block.end_line, len(lines))
-            content = '\n'.join(lines[start_idx:end_idx])
+            content = block.text
             
             # Truncate if too large
             if len(content) > self.max_chunk_size:
@@ -436,10 +460,8 @@ class CodeSplitter:
                 files_to_process.extend(self.workspace_root.glob(pattern))
         else:
             # Process all allowed files
-            files_to_process = []
-            for file_path in self.workspace_root.rglob("*"):
-                if file_path.is_file() and self.config.is_file_allowed(file_path):
-                    files_to_process.append(file_path)
+            policy = self.config.path_policy_for(self.workspace_root)
+            files_to_process = list(policy.iter_files(self.workspace_root))
         
         logger.info(f"Processing {len(files_to_process)} files for code splitting")
         
@@ -6,7 +6,7 @@ import logging
 import json
 import pickle
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 import numpy as np
 
 try:
@@ -37,6 +37,7 @@ class VectorIndex:
         self.index = None
         self.chunks = []  # Store chunk metadata
         self.chunk_map = {}  # Map chunk IDs to indices
+        self.state: Dict[str, Any] = {}  # Build state used for incremental updates
         
         # Ensure index directory exists
         self.index_dir.mkdir(parents=True, exist_ok=True)
@@ -48,6 +49,7 @@ class VectorIndex:
         self.index_file = self.index_dir / "vector_index.faiss"
         self.metadata_file = self.index_dir / "chunks_metadata.json"
         self.chunk_data_file = self.index_dir / "chunks_data.pkl"
+        self.state_file = self.index_dir / "index_state.json"
     
     def create_index(self, embeddings: List[List[float]], chunks: List[CodeChunk]) -> bool:
         """
@@ -114,7 +116,7 @@ class VectorIndex:
                     "name": chunk.name,
                     "parent_name": chunk.parent_name,
                     "language": chunk.language,
-                    "metadata": chunk.metadata
+                    "metadata": chunk.metadata or {}
                 }
                 metadata.append(chunk_dict)
             
@@ -125,6 +127,9 @@ class VectorIndex:
             with open(self.chunk_data_file, 'wb') as f:
                 pickle.dump(self.chunks, f)
             
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2)
+            
             logger.info(f"Saved vector index to {self.index_dir}")
             return True
             
@@ -140,6 +145,7 @@ class VectorIndex:
                 self.index = faiss.IndexFlatIP(self.dimension)
                 self.chunks = []
                 self.chunk_map = {}
+                self.state = {}
                 return True
             
             # Load FAISS index
@@ -152,6 +158,12 @@ class VectorIndex:
             # Rebuild chunk map
             self.chunk_map = {chunk.id: i for i, chunk in enumerate(self.chunks)}
             
+            # Indexes saved before build state was recorded have none
+            self.state = {}
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            
             logger.info(f"Loaded vector index with {len(self.chunks)} chunks from {self.index_dir}")
             return True
             
@@ -161,6 +173,7 @@ class VectorIndex:
             self.index = faiss.IndexFlatIP(self.dimension)
             self.chunks = []
             self.chunk_map = {}
+            self.state = {}
             return False
     
     def search(self, query_embedding: List[float], k: int = 10) -> List[Tuple[CodeChunk, float]]:
@@ -240,6 +253,30 @@ class VectorIndex:
             logger.error(f"Failed to add chunks to index: {e}")
             return False
     
+    def remove_files(self, file_paths: Set[str]) -> int:
+        """
+        Remove all chunks belonging to the given files.
+        
+        Args:
+            file_paths: Workspace-relative paths whose chunks should be dropped
+            
+        Returns:
+            Number of chunks removed
+        """
+        positions = [i for i, chunk in enumerate(self.chunks) if chunk.file_path in file_paths]
+        if not positions or self.index is None:
+            return 0
+        
+        # Flat indexes renumber the remaining vectors in order, like the list below
+        self.index.remove_ids(np.array(positions, dtype=np.int64))
+        
+        removed = set(positions)
+        self.chunks = [chunk for i, chunk in enumerate(self.chunks) if i not in removed]
+        self.chunk_map = {chunk.id: i for i, chunk in enumerate(self.chunks)}
+        
+        logger.info(f"Removed {len(positions)} chunks from {len(file_paths)} files")
+        return len(positions)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get index statistics."""
         stats = {
@@ -277,7 +314,7 @@ class VectorIndex:
         """Clear the index and delete files."""
         try:
             # Remove files
-            for file_path in [self.index_file, self.metadata_file, self.chunk_data_file]:
+            for file_path in [self.index_file, self.metadata_file, self.chunk_data_file, self.state_file]:
                 if file_path.exists():
                     file_path.unlink()
             
@@ -285,6 +322,7 @@ class VectorIndex:
             self.index = faiss.IndexFlatIP(self.dimension)
             self.chunks = []
             self.chunk_map = {}
+            self.state = {}
             
             logger.info("Cleared vector index")
             return True
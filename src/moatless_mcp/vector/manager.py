@@ -4,16 +4,26 @@ Vector database manager coordinating embedding, indexing, and search.
 
 import logging
 import os
+import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 
 from .embeddings import JinaEmbeddingProvider, EmbeddingResult
 from .code_splitter import CodeSplitter, CodeChunk
 from .index import VectorIndex
+from moatless_mcp.adapters.git_index import GitFileIndex, file_fingerprints
 from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.globbing import translate_glob
 
 logger = logging.getLogger(__name__)
 
+# Runs a function while no other tool call uses the workspace and returns its result
+ExclusiveRunner = Callable[[Callable[[], Any]], Any]
+
+
+def _run_directly(func: Callable[[], Any]) -> Any:
+    return func()
+
 
 class VectorManager:
     """Manages the complete vector database pipeline."""
@@ -64,13 +74,20 @@ class VectorManager:
             return False
     
     def build_index(self, file_patterns: Optional[List[str]] = None, 
-                   force_rebuild: bool = False) -> Dict[str, Any]:
+                   force_rebuild: bool = False,
+                   git_index: Optional[GitFileIndex] = None,
+                   exclusive: ExclusiveRunner = _run_directly) -> Dict[str, Any]:
         """
         Build the vector index from code files.
         
         Args:
             file_patterns: Optional list of glob patterns to filter files
             force_rebuild: Force rebuild even if index exists
+            git_index: Git file index of the workspace; when given, an existing
+                index is updated incrementally from the files changed since
+                the commit it was built at
+            exclusive: Runs the final swap of the index and its save to disk;
+                splitting and embedding happen outside of it
             
         Returns:
             Dictionary with build results and statistics
@@ -84,6 +101,11 @@ class VectorManager:
             
             # Check if index already exists
             if not force_rebuild and self.vector_index.exists():
+                if git_index is not None:
+                    update = self.update_index(git_index, file_patterns, exclusive)
+                    if update is not None:
+                        return update
+                
                 stats = self.vector_index.get_stats()
                 if stats["total_chunks"] > 0:
                     return {
@@ -121,27 +143,26 @@ class VectorManager:
             
             logger.info(f"Generated {len(embedding_result.embeddings)} embeddings")
             
-            # Step 3: Create vector index
-            logger.info("Building vector index...")
-            if force_rebuild:
-                self.vector_index.clear()
-            
-            success = self.vector_index.create_index(embedding_result.embeddings, chunks)
-            
-            if not success:
-                return {
-                    "success": False,
-                    "error": "Failed to create vector index"
-                }
-            
-            # Step 4: Save index to disk
-            logger.info("Saving vector index...")
-            save_success = self.vector_index.save()
-            
-            if not save_success:
+            # Steps 3 and 4 replace the index on disk
+            def swap() -> Optional[str]:
+                logger.info("Building vector index...")
+                if force_rebuild:
+                    self.vector_index.clear()
+                
+                if not self.vector_index.create_index(embedding_result.embeddings, chunks):
+                    return "Failed to create vector index"
+                
+                logger.info("Saving vector index...")
+                self.vector_index.state = self._build_state(git_index, file_patterns)
+                if not self.vector_index.save():
+                    return "Failed to save vector index"
+                return None
+            
+            error = exclusive(swap)
+            if error is not None:
                 return {
                     "success": False,
-                    "error": "Failed to save vector index"
+                    "error": error
                 }
             
             # Get final statistics
@@ -165,6 +186,141 @@ class VectorManager:
                 "error": f"Index build failed: {str(e)}"
             }
     
+    def update_index(self, git_index: GitFileIndex,
+                     file_patterns: Optional[List[str]] = None,
+                     exclusive: ExclusiveRunner = _run_directly) -> Optional[Dict[str, Any]]:
+        """
+        Re-embed only the files changed since the index was last built.
+        
+        Candidates are the files git reports as changed relative to the
+        recorded commit, plus files that were already dirty at the last build;
+        the latter are skipped if their mtime and size (or absence) are
+        unchanged. New chunks are embedded before anything is removed, and
+        the saved index is reloaded if the update fails after that, so a
+        failed update leaves the previous index intact.
+        
+        Args:
+            git_index: Git file index of the workspace
+            file_patterns: Glob patterns the index was built with
+            exclusive: Runs the swap of the new chunks and the save, as for
+                build_index
+            
+        Returns:
+            Build result, or None if the index has no usable build state
+            (built without git, with other patterns, or history rewritten)
+        """
+        state = self.vector_index.state
+        base_commit = state.get("commit")
+        if not base_commit or state.get("file_patterns") != file_patterns:
+            return None
+        
+        try:
+            changes = git_index.changed_since(base_commit)
+        except ValueError as e:
+            logger.info(f"Cannot update vector index incrementally: {e}")
+            return None
+        
+        dirty = state.get("dirty", {})
+        candidates = changes.changed | set(changes.deleted) | set(dirty)
+        current = file_fingerprints(self.workspace_root, candidates)
+        stale = {
+            path for path in candidates
+            if path not in dirty or current.get(path) != dirty[path]
+        }
+        
+        chunks: List[CodeChunk] = []
+        for path in sorted(self._indexable(stale & set(current), file_patterns)):
+            chunks.extend(self.code_splitter.split_file(path))
+        
+        usage = {}
+        embeddings: List[List[float]] = []
+        if chunks:
+            texts = [self._chunk_to_text(chunk) for chunk in chunks]
+            embedding_result = self.embedding_provider.embed_texts_batch(texts, task="retrieval.passage")
+            if not embedding_result.success:
+                return {
+                    "success": False,
+                    "error": f"Failed to generate embeddings: {embedding_result.error}"
+                }
+            usage = embedding_result.usage
+            embeddings = embedding_result.embeddings
+        
+        def swap() -> Tuple[int, Optional[str]]:
+            removed = self.vector_index.remove_files(stale)
+            error = None
+            if chunks and not self.vector_index.add_chunks(embeddings, chunks):
+                error = "Failed to add chunks to vector index"
+            else:
+                self.vector_index.state = self._build_state(git_index, file_patterns)
+                if not self.vector_index.save():
+                    error = "Failed to save vector index"
+            if error is not None:
+                # Back to the last saved index rather than one missing the stale files
+                self.vector_index.load()
+            return removed, error
+        
+        removed, error = exclusive(swap)
+        if error is not None:
+            return {
+                "success": False,
+                "error": error
+            }
+        
+        logger.info(f"Vector index updated: {len(stale)} files changed, "
+                    f"{removed} chunks removed, {len(chunks)} chunks added")
+        
+        return {
+            "success": True,
+            "message": "Vector index updated incrementally",
+            "stats": self.vector_index.get_stats(),
+            "embedding_usage": usage,
+            "rebuild_required": False,
+            "incremental": True,
+            "base_commit": base_commit,
+            "updated_files": sorted(stale),
+            "removed_chunks": removed,
+            "added_chunks": len(chunks)
+        }
+    
+    def _build_state(self, git_index: Optional[GitFileIndex],
+                     file_patterns: Optional[List[str]]) -> Dict[str, Any]:
+        """Record the commit the index reflects and the files differing from it."""
+        if git_index is None:
+            return {}
+        
+        head = git_index.head_commit()
+        if head is None:
+            return {}
+        
+        # Deleted files are recorded without a fingerprint
+        changes = git_index.changed_since(head)
+        dirty = dict.fromkeys(changes.deleted)
+        dirty.update(file_fingerprints(self.workspace_root, changes.changed))
+        return {
+            "commit": head,
+            "file_patterns": file_patterns,
+            "dirty": dirty
+        }
+    
+    def _indexable(self, paths: Set[str], file_patterns: Optional[List[str]]) -> Set[str]:
+        """Select the paths a full build would have split"""
+        try:
+            index_prefix = self.index_dir.resolve().relative_to(self.workspace_root.resolve()).as_posix() + "/"
+        except ValueError:
+            index_prefix = None
+        paths = {p for p in paths if index_prefix is None or not p.startswith(index_prefix)}
+        
+        if file_patterns:
+            regex = re.compile("|".join(f"^{translate_glob(p)}$" for p in file_patterns))
+            return {p for p in paths if regex.match(p)}
+        
+        policy = self.config.path_policy_for(self.workspace_root)
+        return {
+            p for p in paths
+            if policy.is_file_allowed(self.workspace_root / p)
+            and not policy.is_ignored(self.workspace_root / p)
+        }
+    
     def search(self, query: str, k: int = 10, filter_type: Optional[str] = None) -> Dict[str, Any]:
         """
         Search the vector index with a natural language query.
@@ -223,7 +379,7 @@ class VectorManager:
                     "language": chunk.language,
                     "similarity_score": score,
                     "content_preview": chunk.content[:200] + "..." if len(chunk.content) > 200 else chunk.content,
-                    "metadata": chunk.metadata
+                    "metadata": chunk.metadata or {}
                 })
             
             return {
@@ -0,0 +1,353 @@
+"""
+Tests for the advanced code search tools
+"""
+
+import os
+
+import pytest
+
+from moatless_mcp.adapters.workspace import WorkspaceAdapter
+from moatless_mcp.tools.advanced_search import AdvancedSearchTools
+from moatless_mcp.treesitter import (
+    extract_references, is_tree_sitter_available, reference_indexes, span_index_cache,
+    symbol_search_indexes, symbol_table_cache
+)
+from moatless_mcp.treesitter.spans import build_span_index
+from moatless_mcp.utils.config import Config
+
+requires_tree_sitter = pytest.mark.skipif(not is_tree_sitter_available(), reason="tree-sitter not installed")
+
+JAVA_SOURCE = """package shop;
+
+public class Outer {
+    public static class Inner {
+        public void process(int amount) {
+            System.out.println(amount);
+        }
+    }
+
+    public void process() {}
+}
+"""
+
+
+@pytest.fixture
+def search_tools(tmp_path, tmp_path_factory):
+    (tmp_path / "Outer.java").write_text(JAVA_SOURCE)
+    span_index_cache.clear()
+    symbol_table_cache.clear()
+    symbol_search_indexes.clear()
+    reference_indexes.clear()
+    config = Config(index_cache_dir=str(tmp_path_factory.mktemp("index_cache")))
+    return AdvancedSearchTools(config, str(tmp_path))
+
+
+@requires_tree_sitter
+class TestSpanIndex:
+    """Tests for the span index"""
+
+    def test_qualified_names(self):
+        """Test that definitions are found by every suffix of their qualified name"""
+        index = build_span_index("Outer.java", JAVA_SOURCE)
+
+        inner_process = index.lookup("Outer.Inner.process")
+        assert [(s.start_line, s.end_line, s.type) for s in inner_process] == [(5, 7, "method")]
+        assert index.lookup("Inner.process") == inner_process
+        assert [s.start_line for s in index.lookup("process")] == [5, 10]
+        assert index.lookup("Outer")[0].type == "class"
+        assert index.lookup("Missing") == []
+
+    def test_unknown_language(self):
+        """Test that files in unsupported languages have no index"""
+        assert build_span_index("notes.txt", "class Foo:") is None
+
+
+@requires_tree_sitter
+class TestViewCodeSpans:
+    """Tests for view_code with span_ids"""
+
+    @pytest.mark.asyncio
+    async def test_nested_span_ids(self, search_tools):
+        """Test that nested paths resolve in the file's own language"""
+        result = await search_tools.view_code("Outer.java", span_ids=["Outer.Inner.process", "Outer.process"])
+
+        sections = result["content_sections"]
+        assert [(s["span_id"], s["start_line"], s["end_line"]) for s in sections] == [
+            ("Outer.Inner.process", 5, 7), ("Outer.process", 10, 10)
+        ]
+        assert sections[0]["content"].strip().startswith("public void process(int amount)")
+
+    @pytest.mark.asyncio
+    async def test_index_cached_until_modified(self, search_tools, tmp_path):
+        """Test that the span index is reused while the file's mtime is unchanged"""
+        path = tmp_path / "Outer.java"
+        await search_tools.view_code("Outer.java", span_ids=["Outer"])
+        cached = span_index_cache.get(path, JAVA_SOURCE, path.stat().st_mtime_ns)
+
+        await search_tools.view_code("Outer.java", span_ids=["Inner"])
+        assert span_index_cache.get(path, JAVA_SOURCE, path.stat().st_mtime_ns) is cached
+
+        updated = JAVA_SOURCE.replace("public void process() {}", "public void process() {}\n    void close() {}")
+        path.write_text(updated)
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+
+        result = await search_tools.view_code("Outer.java", span_ids=["Outer.close"])
+        assert result["content_sections"][0]["start_line"] == 11
+
+
+@requires_tree_sitter
+class TestFindSymbols:
+    """Tests for batched symbol lookup"""
+
+    @pytest.mark.asyncio
+    async def test_grouped_results(self, search_tools, tmp_path):
+        """Test that several names of different kinds are resolved in one call"""
+        (tmp_path / "util.py").write_text("def process(items):\n    return items\n\nclass Outer:\n    pass\n")
+
+        result = await search_tools.find_symbols([
+            {"name": "Outer", "kind": "class"},
+            {"name": "process", "kind": "method"},
+            "Outer.Inner.process",
+            {"name": "Missing"},
+        ])
+
+        groups = result["results"]
+        assert sorted((m["file_path"], m["line_number"]) for m in groups["Outer"]) == [("Outer.java", 3), ("util.py", 4)]
+        assert [(m["line_number"], m["parent_class"]) for m in groups["process"]] == [(5, "Outer.Inner"), (10, "Outer")]
+        assert [m["qualified_name"] for m in groups["Outer.Inner.process"]] == ["Outer.Inner.process"]
+        assert groups["Outer.Inner.process"][0]["parameters"] == ["amount"]
+        assert result["not_found"] == ["Missing"]
+        assert result["total_matches"] == 5
+
+    @pytest.mark.asyncio
+    async def test_function_kind_includes_methods(self, search_tools, tmp_path):
+        """Test that kind 'function' matches top-level functions and methods alike"""
+        (tmp_path / "util.py").write_text("def process(items):\n    return items\n")
+
+        result = await search_tools.find_symbols([{"name": "process", "kind": "function"}])
+
+        assert sorted(m["kind"] for m in result["results"]["process"]) == ["function", "method", "method"]
+
+    @pytest.mark.asyncio
+    async def test_symbol_tables_reused(self, search_tools, tmp_path):
+        """Test that unchanged files are not parsed again by later calls"""
+        await search_tools.find_symbols(["Outer"])
+        table = symbol_table_cache.get(tmp_path / "Outer.java")
+
+        await search_tools.find_symbols(["Inner"])
+        assert symbol_table_cache.get(tmp_path / "Outer.java") is table
+
+    @pytest.mark.asyncio
+    async def test_invalid_kind(self, search_tools):
+        """Test that an unknown kind is reported as an error"""
+        result = await search_tools.find_symbols([{"name": "Outer", "kind": "struct"}])
+
+        assert "Invalid kind" in result["error"]
+
+
+@requires_tree_sitter
+class TestSearchSymbols:
+    """Tests for fuzzy symbol search"""
+
+    @pytest.fixture
+    def workspace(self, search_tools, tmp_path):
+        (tmp_path / "billing").mkdir()
+        (tmp_path / "billing" / "invoices.py").write_text(
+            "class InvoiceRenderer:\n"
+            "    def render_invoice(self, invoice):\n"
+            "        pass\n"
+        )
+        (tmp_path / "reports").mkdir()
+        (tmp_path / "reports" / "render.py").write_text("def render_invoice(invoice):\n    pass\n")
+        return search_tools
+
+    @pytest.mark.asyncio
+    async def test_misspelt_name(self, workspace):
+        """Test that a misspelt name still finds the definition"""
+        result = await workspace.search_symbols("InvoiceRendrer")
+
+        assert result["results"][0]["qualified_name"] == "InvoiceRenderer"
+
+    @pytest.mark.asyncio
+    async def test_word_order_and_style(self, workspace):
+        """Test that camelCase queries match snake_case names"""
+        result = await workspace.search_symbols("renderInvoice", kind="function")
+
+        assert {m["qualified_name"] for m in result["results"]} == {
+            "InvoiceRenderer.render_invoice", "render_invoice"
+        }
+
+    @pytest.mark.asyncio
+    async def test_exact_and_nearby_rank_first(self, workspace):
+        """Test that exact names rank above partial ones and nearby files break ties"""
+        result = await workspace.search_symbols("render_invoice", near="reports/summary.py")
+
+        assert [m["file_path"] for m in result["results"][:2]] == ["reports/render.py", "billing/invoices.py"]
+        assert result["results"][0]["score"] > result["results"][1]["score"]
+
+    @pytest.mark.asyncio
+    async def test_parent_in_query(self, workspace):
+        """Test that a qualified query prefers methods of the named class"""
+        result = await workspace.search_symbols("InvoiceRenderer.render_invoice", limit=1)
+
+        assert result["results"][0]["qualified_name"] == "InvoiceRenderer.render_invoice"
+
+    @pytest.mark.asyncio
+    async def test_index_follows_changes(self, workspace, tmp_path):
+        """Test that edited and deleted files are reflected in later searches"""
+        await workspace.search_symbols("render_invoice")
+        (tmp_path / "reports" / "render.py").unlink()
+        (tmp_path / "billing" / "invoices.py").write_text("def issue_credit_note(invoice):\n    pass\n")
+
+        result = await workspace.search_symbols("render_invoice")
+        assert [m["qualified_name"] for m in result["results"]] == []
+
+        result = await workspace.search_symbols("credit_note")
+        assert [m["qualified_name"] for m in result["results"]] == ["issue_credit_note"]
+
+
+PYTHON_REFERENCES = """from billing.invoices import Invoice, render
+
+
+class CreditNote(Invoice):
+    def issue(self):
+        total = self.amount
+        render(self)
+        return Invoice.create(total)
+"""
+
+
+@requires_tree_sitter
+class TestExtractReferences:
+    """Tests for reference extraction"""
+
+    def test_python_reference_kinds(self):
+        """Test that imports, bases, calls and attributes are told apart"""
+        references = extract_references("credit.py", PYTHON_REFERENCES)
+
+        assert [(r.name, r.line, r.kind) for r in references] == [
+            ("Invoice", 1, "import"), ("render", 1, "import"),
+            ("Invoice", 4, "inherit"),
+            ("amount", 6, "attr"),
+            ("render", 7, "call"),
+            ("create", 8, "call"),
+        ]
+
+    def test_java_reference_kinds(self):
+        """Test that method calls, constructions and interfaces are found in Java"""
+        references = extract_references("Outer.java", JAVA_SOURCE.replace(
+            "public class Outer {", "public class Outer implements Runnable {"
+        ))
+
+        assert [(r.name, r.kind) for r in references] == [
+            ("Runnable", "inherit"), ("out", "attr"), ("println", "call")
+        ]
+
+    def test_unknown_language(self):
+        """Test that files without a reference query have no references"""
+        assert extract_references("notes.txt", "render(x)") is None
+
+
+@requires_tree_sitter
+class TestFindReferences:
+    """Tests for the cross-reference index"""
+
+    @pytest.fixture
+    def workspace(self, search_tools, tmp_path):
+        (tmp_path / "credit.py").write_text(PYTHON_REFERENCES)
+        (tmp_path / "views.py").write_text("def show(invoice):\n    return render(invoice)\n")
+        return search_tools
+
+    @pytest.mark.asyncio
+    async def test_callers_with_context(self, workspace):
+        """Test that calls report their enclosing definition and source line"""
+        result = await workspace.find_references("render", kinds=["call"])
+
+        assert [(r["file_path"], r["line_number"], r["enclosing"], r["code"]) for r in result["results"]] == [
+            ("credit.py", 7, "CreditNote.issue", "render(self)"),
+            ("views.py", 2, "show", "return render(invoice)"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_all_kinds(self, workspace):
+        """Test that imports and inheritance are included by default"""
+        result = await workspace.find_references("Invoice")
+
+        assert [(r["line_number"], r["kind"]) for r in result["results"]] == [(1, "import"), (4, "inherit")]
+
+    @pytest.mark.asyncio
+    async def test_callees(self, workspace):
+        """Test that callees are the calls made inside the named definition"""
+        result = await workspace.find_references("CreditNote.issue", direction="callees")
+
+        assert [r["name"] for r in result["results"]] == ["render", "create"]
+
+    @pytest.mark.asyncio
+    async def test_persisted_and_incremental(self, workspace, tmp_path):
+        """Test that the index is saved, reloaded and updated for changed files only"""
+        await workspace.find_references("render")
+        assert list((workspace.config.index_cache_path / "references").glob("*.json"))
+
+        (tmp_path / "views.py").write_text("def show(invoice):\n    return draw(invoice)\n")
+        os.utime(tmp_path / "views.py", ns=(0, 1_000_000_000))
+        reference_indexes.clear()
+
+        result = await workspace.find_references("render", kinds=["call"])
+        assert [r["file_path"] for r in result["results"]] == ["credit.py"]
+        assert reference_indexes.get(tmp_path.resolve()).file_count == 3
+
+    @pytest.mark.asyncio
+    async def test_written_files_dropped(self, workspace, tmp_path):
+        """Test that writing a file through the workspace drops it from the indexes"""
+        await workspace.find_references("render")
+        await workspace.search_symbols("show")
+        adapter = WorkspaceAdapter(str(tmp_path), workspace.config)
+
+        adapter.file_context.write_file_content("./views.py", "def show(invoice):\n    return draw(invoice)\n")
+
+        root = tmp_path.resolve()
+        assert reference_indexes.get(root).in_range("views.py", 1, 2) == []
+        assert reference_indexes.get(root).file_count == 2
+        assert symbol_search_indexes.get(str(root)).file_count == 2
+        assert str(root / "views.py") not in symbol_table_cache._entries
+
+    @pytest.mark.asyncio
+    async def test_index_outside_workspace(self, workspace, tmp_path):
+        """Test that the saved index is not found by a workspace grep"""
+        await workspace.find_references("render")
+
+        adapter = WorkspaceAdapter(str(tmp_path), workspace.config)
+        assert {match["file"] for match in adapter.grep_files("render", "*")} == {"credit.py", "views.py"}
+
+
+class TestRegexSpans:
+    """Tests for the regex fallback used for files without a definition query"""
+
+    @pytest.mark.asyncio
+    async def test_class_method_span(self, tmp_path):
+        """Test that a method is found inside its class and not in a later class"""
+        source = (
+            "class Greeter() {\n"
+            "    fun greet() = \"hi\"\n"
+            "}\n"
+            "\n"
+            "class Other() {\n"
+            "    fun greet() = \"ho\"\n"
+            "}\n"
+        )
+        (tmp_path / "Greeter.kt").write_text(source)
+        tools = AdvancedSearchTools(Config(), str(tmp_path))
+
+        result = await tools.view_code("Greeter.kt", span_ids=["Other.greet"])
+
+        assert [s["start_line"] for s in result["content_sections"]] == [6]
+
+    @pytest.mark.asyncio
+    async def test_class_header_on_last_line(self, tmp_path):
+        """Test that a class header on the unterminated last line is searched without error"""
+        (tmp_path / "Greeter.kt").write_text("val x = 1\nclass Foo() : Base()")
+        tools = AdvancedSearchTools(Config(), str(tmp_path))
+
+        result = await tools.view_code("Greeter.kt", span_ids=["Foo.bar"])
+
+        assert result["content_sections"][0]["error"] == "No matches found for span_ids: Foo.bar"
@@ -0,0 +1,83 @@
+"""
+Tests for the file I/O thread pool
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from moatless_mcp.utils.aio import IOExecutor
+
+
+class TestIOExecutor:
+    """Tests for IOExecutor"""
+
+    @pytest.mark.asyncio
+    async def test_run_off_event_loop(self):
+        """Test that calls run on a pool thread"""
+        executor = IOExecutor(max_workers=2)
+
+        name = await executor.run(lambda: threading.current_thread().name)
+
+        assert name.startswith("moatless-io")
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_imap_preserves_order_and_overlaps(self):
+        """Test that imap yields in order while running calls concurrently"""
+        executor = IOExecutor(max_workers=8)
+
+        def slow_square(n):
+            time.sleep(0.05)
+            return n * n
+
+        started = time.monotonic()
+        results = [r async for r in executor.imap(slow_square, range(8))]
+        elapsed = time.monotonic() - started
+
+        assert results == [n * n for n in range(8)]
+        assert elapsed < 0.05 * 8 / 2
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self):
+        """Test that no more than max_workers calls run at once"""
+        executor = IOExecutor(max_workers=3)
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def work(_):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        async for _ in executor.imap(work, range(20)):
+            pass
+
+        assert peak[0] <= 3
+        executor.shutdown()
+
+
+class TestAsyncFileContext:
+    """Tests for the async FileContext methods"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_and_writes(self, file_context):
+        """Test that async reads and writes share the content cache"""
+        await asyncio.gather(*(
+            file_context.write_file_content_async(f"gen/file{i}.py", f"value = {i}\n")
+            for i in range(10)
+        ))
+
+        contents = await asyncio.gather(*(
+            file_context.get_file_content_async(f"gen/file{i}.py") for i in range(10)
+        ))
+
+        assert contents == [f"value = {i}\n" for i in range(10)]
+        assert file_context.cache_bytes == sum(len(c) for c in contents)
@@ -0,0 +1,77 @@
+"""
+Tests for code chunks and the code splitter
+"""
+
+import pickle
+
+import pytest
+
+from moatless_mcp.treesitter import is_tree_sitter_available
+from moatless_mcp.utils.config import Config
+from moatless_mcp.vector.code_splitter import CodeChunk, CodeSplitter
+
+
+def make_chunk(**overrides):
+    values = dict(
+        id="", content="def run():\n    pass", file_path="".join(["src/", "app.py"]),
+        start_line=1, end_line=2, chunk_type="function", name="run", language="python",
+    )
+    values.update(overrides)
+    return CodeChunk(**values)
+
+
+class TestCodeChunk:
+    """Tests for the compact chunk representation"""
+
+    def test_slotted_and_frozen(self):
+        """Test that chunks have no instance dict and cannot be modified"""
+        chunk = make_chunk()
+
+        assert not hasattr(chunk, "__dict__")
+        assert chunk.metadata is None
+        assert chunk.id.startswith("src/app.py:1:")
+        with pytest.raises(AttributeError):
+            chunk.name = "other"
+
+    def test_repeated_strings_interned(self):
+        """Test that file paths built separately end up as one string object"""
+        first = make_chunk()
+        second = make_chunk(start_line=5, end_line=6)
+
+        assert first.file_path is second.file_path
+        assert first.chunk_type is second.chunk_type
+
+    def test_pickle_round_trip(self):
+        """Test that chunks survive pickling, including chunks pickled as plain attribute dicts"""
+        chunk = make_chunk(parent_name="App", metadata={"parameters": ["self"]})
+
+        restored = pickle.loads(pickle.dumps([chunk]))[0]
+        assert restored == chunk
+
+        legacy = CodeChunk.__new__(CodeChunk)
+        legacy.__setstate__({"id": "old", "content": "x = 1", "file_path": "old.py", "start_line": 1,
+                             "end_line": 1, "chunk_type": "text_chunk", "name": "chunk_1",
+                             "language": "python", "metadata": {}})
+        assert (legacy.id, legacy.parent_name, legacy.metadata) == ("old", None, {})
+
+
+@pytest.mark.skipif(not is_tree_sitter_available(), reason="tree-sitter not installed")
+class TestCodeSplitter:
+    """Tests for splitting files into chunks"""
+
+    def test_method_chunks(self, tmp_path):
+        """Test that methods become chunks carrying their class and parameters"""
+        source = (
+            "class Ledger:\n"
+            "    def post(self, entry, amount):\n"
+            "        total = self.balance + amount\n"
+            "        self.entries.append((entry, amount))\n"
+            "        return total\n"
+        )
+        splitter = CodeSplitter(Config(), str(tmp_path))
+
+        chunks = splitter.split_file("ledger.py", source)
+
+        method = next(c for c in chunks if c.chunk_type == "method")
+        assert (method.name, method.parent_name, method.start_line) == ("post", "Ledger", 2)
+        assert method.metadata["parameters"] == ["self", "entry", "amount"]
@@ -0,0 +1,113 @@
+"""
+Tests for the replacement engine and diffs
+"""
+
+import shutil
+import subprocess
+
+import pytest
+
+from moatless_mcp.adapters.edits import (
+    EditError, Replacement, apply_replacements, edits_diff, replace_occurrences
+)
+
+
+def replacement(old_str, new_str, occurrence=1, regex=False):
+    return Replacement("f.py", old_str, new_str, occurrence, regex)
+
+
+class TestApplyReplacements:
+    """Tests for apply_replacements"""
+
+    def test_nth_occurrence(self):
+        """Test that occurrences are counted without overlap"""
+        content, made, total = replace_occurrences("f.py", "aaaa", "aa", "b", occurrence=2)
+
+        assert (content, made, total) == ("aab", 1, 2)
+
+    def test_independent_replacements_in_one_pass(self):
+        """Test that all replacements match the original content"""
+        content, counts, edits = apply_replacements("f.py", "a = 1\nb = 2\n", [
+            replacement("a", "b"),
+            replacement("b", "a"),
+        ])
+
+        assert content == "b = 1\na = 2\n"
+        assert counts == [(1, 1), (1, 1)]
+        assert [edit[0] for edit in edits] == [0, 6]
+
+    def test_regex_with_groups(self):
+        """Test regex replacements expanding groups"""
+        content, counts, _ = apply_replacements("f.py", "get_a()\nget_b()\n", [
+            replacement(r"get_(\w+)\(\)", r'fetch("\1")', occurrence=0, regex=True),
+        ])
+
+        assert content == 'fetch("a")\nfetch("b")\n'
+        assert counts == [(2, 2)]
+
+    @pytest.mark.parametrize("replacements,message", [
+        ([replacement("x", "y")], "not found"),
+        ([replacement("a", "b", occurrence=3)], "Occurrence 3"),
+        ([replacement("(", "x", regex=True)], "Invalid regular expression"),
+        ([replacement("a = 1", "x"), replacement("= 1", "y")], "Overlapping"),
+    ])
+    def test_errors(self, replacements, message):
+        """Test that invalid replacements raise EditError"""
+        with pytest.raises(EditError, match=message):
+            apply_replacements("f.py", "a = 1\na = 2\n", replacements)
+
+
+class TestEditsDiff:
+    """Tests for edits_diff"""
+
+    def test_hunks_around_edits(self):
+        """Test that distant edits produce separate hunks with correct line numbers"""
+        content = "".join(f"line {i}\n" for i in range(1, 21))
+        _, _, edits = apply_replacements("f.py", content, [
+            replacement("line 2\n", "line two\nline 2b\n"),
+            replacement("line 18", "line eighteen"),
+        ])
+
+        diff = edits_diff("f.py", content, edits)
+
+        assert diff.startswith("--- a/f.py\n+++ b/f.py\n@@ -1,5 +1,6 @@\n line 1\n-line 2\n+line two\n+line 2b\n")
+        assert "@@ -15,6 +16,6 @@\n" in diff
+        assert "-line 18\n+line eighteen\n" in diff
+
+    def test_missing_final_newline(self):
+        """Test the no-newline marker on the last line"""
+        _, _, edits = apply_replacements("f.py", "a\nb", [replacement("b", "c")])
+
+        assert edits_diff("f.py", "a\nb", edits) == (
+            "--- a/f.py\n+++ b/f.py\n@@ -1,2 +1,2 @@\n a\n-b\n\\ No newline at end of file\n"
+            "+c\n\\ No newline at end of file\n"
+        )
+
+    def test_replacement_joining_lines(self):
+        """Test that new text without a final newline takes the following line into its hunk"""
+        content = "foo\nbar\nqux\nbaz\n"
+        _, _, edits = apply_replacements("f.py", content, [replacement("qux\n", "Y\nZ")])
+
+        assert edits_diff("f.py", content, edits) == (
+            "--- a/f.py\n+++ b/f.py\n@@ -1,4 +1,4 @@\n foo\n bar\n-qux\n-baz\n+Y\n+Zbaz\n"
+        )
+
+    @pytest.mark.skipif(shutil.which("patch") is None, reason="patch not installed")
+    @pytest.mark.parametrize("content, edits", [
+        ("foo\nbar\nqux\nbaz\n", [("qux\n", "Y\nZ")]),
+        ("foo\nbar\nqux\nbaz", [("qux\n", "Y\nZ")]),
+        ("a\nb\nc\nd\n", [("a\n", "x"), ("b\n", "y")]),
+        ("one\ntwo\nthree", [("three", "3\n")]),
+        ("one\ntwo\nthree\n", [("two\n", "")]),
+    ])
+    def test_diff_applies_with_patch(self, tmp_path, content, edits):
+        """Test that patch turns the original into the new content using the diff"""
+        new_content, _, spans = apply_replacements(
+            "f.py", content, [replacement(old, new) for old, new in edits]
+        )
+        (tmp_path / "f.py").write_text(content)
+
+        subprocess.run(["patch", "-p1", "--quiet"], input=edits_diff("f.py", content, spans),
+                       cwd=tmp_path, text=True, check=True)
+
+        assert (tmp_path / "f.py").read_text() == new_content
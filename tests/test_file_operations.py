@@ -2,6 +2,8 @@
 Tests for file operation tools
 """
 
+import os
+
 import pytest
 from pathlib import Path
 
@@ -9,7 +11,8 @@ from moatless_mcp.tools.file_operations import (
     ReadFileTool,
     WriteFileTool,
     ListFilesTool,
-    StringReplaceTool
+    StringReplaceTool,
+    ApplyEditsTool
 )
 
 
@@ -113,6 +116,17 @@ class TestWriteFileTool:
         assert result.success
         assert result.properties["lines_written"] == 2
     
+    @pytest.mark.asyncio
+    async def test_write_through_symlink(self, tool, temp_workspace):
+        """Test that writing a symlinked file changes its target and keeps the link"""
+        (temp_workspace / "src" / "linked.py").symlink_to(temp_workspace / "src" / "utils.py")
+        
+        result = await tool.execute({"file_path": "src/linked.py", "content": "x = 1\n"})
+        
+        assert result.success
+        assert (temp_workspace / "src" / "linked.py").is_symlink()
+        assert (temp_workspace / "src" / "utils.py").read_text() == "x = 1\n"
+    
     @pytest.mark.asyncio
     async def test_overwrite_existing_file(self, tool):
         """Test overwriting an existing file"""
@@ -125,6 +139,37 @@ class TestWriteFileTool:
         
         assert result.success
         assert result.properties["lines_written"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_content_not_rewritten(self, tool, temp_workspace):
+        """Test that writing the current content leaves the file untouched"""
+        path = temp_workspace / "README.md"
+        content = path.read_text()
+        mtime = path.stat().st_mtime_ns
+        
+        result = await tool.execute({"file_path": "README.md", "content": content})
+        
+        assert result.success
+        assert result.properties["changed"] is False
+        assert path.stat().st_mtime_ns == mtime
+    
+    @pytest.mark.asyncio
+    async def test_reports_changed_hunks(self, tool, temp_workspace):
+        """Test the hunk summary and change notification for a partial rewrite"""
+        (temp_workspace / "lines.txt").write_text("".join(f"{i}\n" for i in range(1, 11)))
+        changes = []
+        tool.workspace.get_file_context().add_change_listener(changes.append)
+        
+        result = await tool.execute({
+            "file_path": "lines.txt",
+            "content": "1\n2\nthree\n4\n5\n6\n7\n8\n9\n10\n11\n"
+        })
+        
+        assert result.properties["changed"] is True
+        assert result.properties["created"] is False
+        assert result.properties["hunks"] == ["@@ -3 +3 @@", "@@ -10,0 +11 @@"]
+        assert (result.properties["lines_added"], result.properties["lines_removed"]) == (2, 1)
+        assert [change.file_path for change in changes] == ["lines.txt"]
 
 
 class TestListFilesTool:
@@ -175,6 +220,24 @@ class TestListFilesTool:
         assert result.success
         assert result.properties["file_count"] <= 2
     
+    @pytest.mark.asyncio
+    async def test_list_with_cursor(self, tool):
+        """Test paging through a recursive listing"""
+        first = await tool.execute({"recursive": True, "max_results": 2})
+        
+        assert first.properties["truncated"] is True
+        second = await tool.execute({
+            "recursive": True,
+            "max_results": 1000,
+            "cursor": first.properties["next_cursor"]
+        })
+        
+        assert second.success
+        assert second.properties["offset"] == 2
+        assert second.properties["truncated"] is False
+        assert second.properties["next_cursor"] is None
+        assert first.properties["file_count"] + second.properties["file_count"] == 5
+    
     @pytest.mark.asyncio
     async def test_list_nonexistent_directory(self, tool):
         """Test listing nonexistent directory"""
@@ -182,6 +245,38 @@ class TestListFilesTool:
         
         assert not result.success
         assert "not found" in result.message.lower()
+    
+    @pytest.mark.asyncio
+    async def test_tree_summaries(self, tool, temp_workspace):
+        """Test that tree mode aggregates files of directories below max_depth"""
+        (temp_workspace / "src" / "pkg" / "deep").mkdir(parents=True)
+        (temp_workspace / "src" / "pkg" / "deep" / "mod.py").write_text("x = 1\n")
+        
+        result = await tool.execute({"directory": "src", "tree": True, "max_depth": 1})
+        
+        assert result.success
+        assert result.properties["file_count"] == 3
+        assert result.properties["language"] == "python"
+        assert result.properties["directories"] == [
+            {"path": "src/pkg", "file_count": 1, "total_bytes": 6, "language": "python"}
+        ]
+        assert "src/ (3 files" in result.message
+        assert "deep" not in result.message
+    
+    @pytest.mark.asyncio
+    async def test_tree_truncates_by_directory(self, tool, temp_workspace):
+        """Test that the directory limit keeps shallow directories"""
+        for name in ("a", "b", "c"):
+            (temp_workspace / name / "inner").mkdir(parents=True)
+            (temp_workspace / name / "inner" / "notes.txt").write_text(name)
+        
+        result = await tool.execute({"tree": True, "max_depth": 2, "max_results": 5})
+        
+        paths = [d["path"] for d in result.properties["directories"]]
+        assert result.properties["truncated"] is True
+        assert len(paths) == 5
+        assert not any(path.endswith("inner") for path in paths)
+        assert "... 1 more directory" in result.message
 
 
 class TestStringReplaceTool:
@@ -191,6 +286,39 @@ class TestStringReplaceTool:
     def tool(self, workspace_adapter):
         return StringReplaceTool(workspace_adapter)
     
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("encoding,newline", [
+        ("latin-1", "\r\n"),
+        ("utf-16", "\n"),
+        ("utf-8", "\r\n"),
+    ])
+    async def test_encoding_and_line_endings_kept(self, tool, temp_workspace, encoding, newline):
+        """Test that a replacement writes the file back in its encoding and line endings"""
+        path = temp_workspace / "src" / "legacy.py"
+        path.write_bytes(f"# café{newline}value = 1{newline}".encode(encoding))
+        
+        result = await tool.execute({
+            "file_path": "src/legacy.py",
+            "old_str": "café\nvalue = 1",
+            "new_str": "crème\nvalue = 2"
+        })
+        
+        assert result.success
+        assert path.read_bytes() == f"# crème{newline}value = 2{newline}".encode(encoding)
+    
+    @pytest.mark.asyncio
+    async def test_unencodable_replacement_fails(self, tool, temp_workspace):
+        """Test that text the file's encoding cannot hold is refused and the file left as is"""
+        path = temp_workspace / "src" / "legacy.py"
+        path.write_bytes("# café\n".encode("latin-1"))
+        
+        result = await tool.execute({"file_path": "src/legacy.py", "old_str": "café", "new_str": "→"})
+        
+        assert not result.success
+        assert "latin-1" in result.message
+        assert path.read_bytes() == "# café\n".encode("latin-1")
+        assert sorted(p.name for p in path.parent.iterdir()) == ["legacy.py", "main.py", "utils.py"]
+    
     @pytest.mark.asyncio
     async def test_simple_replacement(self, tool):
         """Test simple string replacement"""
@@ -274,4 +402,176 @@ class TestStringReplaceTool:
         })
         
         assert not result.success
-        assert "not found" in result.message.lower()
\ No newline at end of file
+        assert "not found" in result.message.lower()
+    
+    @pytest.mark.asyncio
+    async def test_regex_replacement_with_diff(self, tool, temp_workspace):
+        """Test regex replacement and the returned unified diff"""
+        (temp_workspace / "names.py").write_text("get_a()\nkeep()\nget_b()\n")
+        
+        result = await tool.execute({
+            "file_path": "names.py",
+            "old_str": r"get_(\w+)\(\)",
+            "new_str": r"fetch_\1()",
+            "occurrence": 0,
+            "regex": True
+        })
+        
+        assert result.success
+        assert result.properties["replacements_made"] == 2
+        assert (temp_workspace / "names.py").read_text() == "fetch_a()\nkeep()\nfetch_b()\n"
+        assert result.properties["diff"] == (
+            "--- a/names.py\n+++ b/names.py\n@@ -1,3 +1,3 @@\n"
+            "-get_a()\n+fetch_a()\n keep()\n-get_b()\n+fetch_b()\n"
+        )
+    
+    @pytest.mark.asyncio
+    async def test_multiple_replacements_in_one_pass(self, tool, temp_workspace):
+        """Test that replacements match the original content, not each other's output"""
+        (temp_workspace / "swap.py").write_text("x = left\ny = right\n")
+        
+        result = await tool.execute({
+            "file_path": "swap.py",
+            "replacements": [
+                {"old_str": "left", "new_str": "right"},
+                {"old_str": "right", "new_str": "left"}
+            ],
+            "show_diff": False
+        })
+        
+        assert result.success
+        assert "diff" not in result.properties
+        assert [r["replacements_made"] for r in result.properties["replacements"]] == [1, 1]
+        assert (temp_workspace / "swap.py").read_text() == "x = right\ny = left\n"
+    
+    @pytest.mark.asyncio
+    async def test_overlapping_replacements_fail(self, tool, temp_workspace):
+        """Test that overlapping replacements leave the file unchanged"""
+        (temp_workspace / "overlap.py").write_text("value = 1\n")
+        
+        result = await tool.execute({
+            "file_path": "overlap.py",
+            "replacements": [
+                {"old_str": "value = 1", "new_str": "value = 2"},
+                {"old_str": "= 1", "new_str": "= 3"}
+            ]
+        })
+        
+        assert not result.success
+        assert "overlapping" in result.message.lower()
+        assert (temp_workspace / "overlap.py").read_text() == "value = 1\n"
+
+
+class TestApplyEditsTool:
+    """Tests for ApplyEditsTool"""
+    
+    @pytest.fixture
+    def tool(self, workspace_adapter):
+        return ApplyEditsTool(workspace_adapter)
+    
+    @pytest.mark.asyncio
+    async def test_edits_across_files(self, tool, temp_workspace):
+        """Test applying ordered edits to several files in one call"""
+        result = await tool.execute({"edits": [
+            {"file_path": "src/main.py", "old_str": "hello_world", "new_str": "greet", "occurrence": 0},
+            {"file_path": "src/main.py", "old_str": "def greet", "new_str": "def greet_all"},
+            {"file_path": "src/utils.py", "old_str": "format_string", "new_str": "normalize"}
+        ]})
+        
+        assert result.success
+        assert result.properties["edits_applied"] == 3
+        assert result.properties["files_modified"] == ["src/main.py", "src/utils.py"]
+        main = (temp_workspace / "src" / "main.py").read_text()
+        assert "def greet_all():" in main
+        assert "    greet()" in main
+        assert "def normalize(text):" in (temp_workspace / "src" / "utils.py").read_text()
+    
+    @pytest.mark.asyncio
+    async def test_failed_edit_changes_nothing(self, tool, temp_workspace):
+        """Test that one invalid edit leaves every file untouched"""
+        before = (temp_workspace / "src" / "main.py").read_text()
+        
+        result = await tool.execute({"edits": [
+            {"file_path": "src/main.py", "old_str": "hello_world", "new_str": "greet"},
+            {"file_path": "src/utils.py", "old_str": "nonexistent_string", "new_str": "x"}
+        ]})
+        
+        assert not result.success
+        assert result.properties["failed_edit"] == 2
+        assert "Edit 2:" in result.message
+        assert "not found" in result.message.lower()
+        assert (temp_workspace / "src" / "main.py").read_text() == before
+    
+    @pytest.mark.asyncio
+    async def test_no_temporary_files_left(self, tool, temp_workspace):
+        """Test that writes go through temporary files that are moved into place"""
+        (temp_workspace / "src" / "main.py").chmod(0o640)
+        
+        result = await tool.execute({"edits": [
+            {"file_path": "src/main.py", "old_str": "Calculator", "new_str": "Calc"}
+        ]})
+        
+        assert result.success
+        assert sorted(p.name for p in (temp_workspace / "src").iterdir()) == ["main.py", "utils.py"]
+        assert (temp_workspace / "src" / "main.py").stat().st_mode & 0o777 == 0o640
+    
+    @pytest.mark.asyncio
+    async def test_edit_through_symlink(self, tool, temp_workspace):
+        """Test that editing a symlinked file changes its target and keeps the link"""
+        (temp_workspace / "src" / "linked.py").symlink_to(temp_workspace / "src" / "utils.py")
+        
+        result = await tool.execute({"edits": [
+            {"file_path": "src/linked.py", "old_str": "format_string", "new_str": "normalize"}
+        ]})
+        
+        assert result.success
+        assert (temp_workspace / "src" / "linked.py").is_symlink()
+        assert "def normalize(text):" in (temp_workspace / "src" / "utils.py").read_text()
+        assert sorted(p.name for p in (temp_workspace / "src").iterdir()) == ["linked.py", "main.py", "utils.py"]
+    
+    @pytest.mark.asyncio
+    async def test_paths_normalized(self, tool, temp_workspace):
+        """Test that differently spelled paths to one file are edited as one file"""
+        result = await tool.execute({"edits": [
+            {"file_path": "src/main.py", "old_str": "hello_world", "new_str": "greet", "occurrence": 0},
+            {"file_path": "./src/main.py", "old_str": "def greet", "new_str": "def greet_all"}
+        ]})
+        
+        assert result.success
+        assert result.properties["files_modified"] == ["src/main.py"]
+        main = (temp_workspace / "src" / "main.py").read_text()
+        assert "def greet_all():" in main
+        assert "    greet()" in main
+    
+    @pytest.mark.asyncio
+    async def test_failed_replace_restores_files(self, tool, temp_workspace, monkeypatch):
+        """Test that files already moved into place are restored when a later move fails"""
+        before = {name: (temp_workspace / "src" / name).read_text() for name in ("main.py", "utils.py")}
+        replace = os.replace
+        
+        def fail_on_utils(src, dst):
+            if Path(dst).name == "utils.py":
+                raise OSError("disk full")
+            replace(src, dst)
+        
+        monkeypatch.setattr(os, "replace", fail_on_utils)
+        result = await tool.execute({"edits": [
+            {"file_path": "src/main.py", "old_str": "hello_world", "new_str": "greet"},
+            {"file_path": "src/utils.py", "old_str": "format_string", "new_str": "normalize"}
+        ]})
+        monkeypatch.undo()
+        
+        assert not result.success
+        assert {name: (temp_workspace / "src" / name).read_text() for name in before} == before
+        assert sorted(p.name for p in (temp_workspace / "src").iterdir()) == ["main.py", "utils.py"]
+    
+    @pytest.mark.asyncio
+    async def test_cache_updated(self, tool, workspace_adapter):
+        """Test that edited content is served from the cache"""
+        await tool.execute({"edits": [
+            {"file_path": "src/utils.py", "old_str": "lower()", "new_str": "casefold()"}
+        ]})
+        
+        file_context = workspace_adapter.get_file_context()
+        assert "src/utils.py" in file_context._file_cache
+        assert "casefold()" in file_context.get_file_content("src/utils.py")
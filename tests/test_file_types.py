@@ -0,0 +1,127 @@
+"""
+Tests for binary and encoding detection
+"""
+
+import codecs
+import io
+
+import pytest
+
+from moatless_mcp.adapters.workspace import WorkspaceAdapter
+from moatless_mcp.utils import file_types
+from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.file_types import SNIFF_BYTES, FileClassifier, sniff_bytes
+
+
+class TestSniffBytes:
+    """Tests for sniff_bytes"""
+
+    @pytest.mark.parametrize("sample,is_binary,encoding", [
+        (b"print('hello')\n", False, "utf-8"),
+        (b"", False, "utf-8"),
+        ("café\n".encode("utf-8"), False, "utf-8"),
+        ("café\n".encode("latin-1"), False, "latin-1"),
+        (codecs.BOM_UTF8 + b"x = 1\n", False, "utf-8"),
+        ("x = 1\n".encode("utf-16"), False, "utf-16"),
+        (b"\x7fELF\x02\x01\x01\x00\x00\x00", True, None),
+        (b"\x01\x02\x03\x04abc", True, None),
+    ])
+    def test_classification(self, sample, is_binary, encoding):
+        """Test NUL, control byte, BOM and UTF-8 detection"""
+        kind = sniff_bytes(sample)
+
+        assert kind.is_binary is is_binary
+        assert kind.encoding == encoding
+
+    @pytest.mark.parametrize("sample,newline", [
+        (b"a\r\nb\r\n", "\r\n"),
+        (b"a\nb\n", "\n"),
+        ("a\r\né".encode("latin-1"), "\r\n"),
+        ("a\r\nb".encode("utf-16"), "\r\n"),
+    ])
+    def test_line_endings(self, sample, newline):
+        """Test that CRLF line endings are detected in every encoding"""
+        assert sniff_bytes(sample).newline == newline
+
+    def test_truncated_multibyte_character(self):
+        """Test that a character cut off at the sample boundary is still UTF-8"""
+        sample = ("a" * 10 + "€").encode("utf-8")[:-1]
+
+        assert sniff_bytes(sample).encoding == "utf-8"
+
+
+class TestFileClassifier:
+    """Tests for FileClassifier"""
+
+    def test_verdict_cached_until_modified(self, tmp_path):
+        """Test that verdicts are reused while mtime and size are unchanged"""
+        path = tmp_path / "data.txt"
+        path.write_bytes(b"text\n")
+        classifier = FileClassifier()
+
+        assert not classifier.is_binary(path)
+        assert str(path) in classifier._verdicts
+
+        path.write_bytes(b"\0binary\0")
+
+        assert classifier.is_binary(path)
+
+    def test_read_text_decodes_past_sample(self, tmp_path):
+        """Test that invalid UTF-8 after the sample falls back to latin-1"""
+        path = tmp_path / "mixed.txt"
+        path.write_bytes(b"a" * SNIFF_BYTES + "é".encode("latin-1"))
+
+        assert FileClassifier().read_text(path).endswith("é")
+
+    def test_read_text_normalizes_line_endings(self, tmp_path):
+        """Test that CRLF and CR line endings are read as LF"""
+        path = tmp_path / "windows.txt"
+        path.write_bytes(b"one\r\ntwo\rthree\n")
+
+        assert FileClassifier().read_text(path) == "one\ntwo\nthree\n"
+
+    def test_read_text_binary(self, tmp_path):
+        """Test that binary files are not decoded"""
+        path = tmp_path / "image.png"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR")
+
+        assert FileClassifier().read_text(path) is None
+
+    def test_read_text_binary_reads_sample_only(self, tmp_path, monkeypatch):
+        """Test that a large binary file is rejected after reading its first bytes"""
+        path = tmp_path / "blob.dat"
+        path.write_bytes(b"\0" * (SNIFF_BYTES * 4))
+        read_sizes = []
+
+        class TrackingFile(io.FileIO):
+            def read(self, size=-1):
+                data = super().read(size)
+                read_sizes.append(len(data))
+                return data
+
+        monkeypatch.setattr(file_types, "open", lambda path, mode: TrackingFile(path, "r"), raising=False)
+
+        assert FileClassifier().read_text(path) is None
+        assert read_sizes == [SNIFF_BYTES]
+
+
+class TestBinaryFilesInWorkspace:
+    """Tests for binary handling in workspace reads"""
+
+    def test_grep_skips_binary_files(self, tmp_path):
+        """Test that grep does not report matches in binary files"""
+        (tmp_path / "notes.txt").write_text("needle\n")
+        (tmp_path / "blob.dat").write_bytes(b"needle\0\0\0")
+        adapter = WorkspaceAdapter(str(tmp_path), Config(allowed_file_extensions={".txt", ".dat"}))
+
+        matches = {m["file"] for m in adapter.iter_grep("needle")}
+
+        assert matches == {"notes.txt"}
+
+    def test_read_binary_file_fails(self, tmp_path):
+        """Test that reading a binary file raises ValueError"""
+        (tmp_path / "blob.dat").write_bytes(b"\0\0\0")
+        adapter = WorkspaceAdapter(str(tmp_path), Config(allowed_file_extensions={".dat"}))
+
+        with pytest.raises(ValueError, match="Binary file"):
+            adapter.get_file_context().get_file_content("blob.dat")
@@ -0,0 +1,39 @@
+"""
+Tests for the identifier fuzzy matching helpers
+"""
+
+import pytest
+
+from moatless_mcp.utils.fuzzy import edit_distance, similarity, split_identifier, trigrams
+
+
+class TestSplitIdentifier:
+    """Tests for splitting identifiers into words"""
+
+    @pytest.mark.parametrize("name", ["HTTPServerConfig", "http_server_config", "httpServerConfig"])
+    def test_naming_styles(self, name):
+        """Test that camelCase, PascalCase and snake_case split into the same words"""
+        assert split_identifier(name) == ["http", "server", "config"]
+
+    def test_digits(self):
+        """Test that digits form their own word"""
+        assert split_identifier("parse_v2Header") == ["parse", "v", "2", "header"]
+
+
+class TestEditDistance:
+    """Tests for edit distance and similarity"""
+
+    def test_distance(self):
+        """Test insertions, deletions and substitutions"""
+        assert edit_distance("kitten", "sitting") == 3
+        assert edit_distance("", "abc") == 3
+        assert edit_distance("same", "same") == 0
+
+    def test_similarity(self):
+        """Test that similarity is scaled by the longer string"""
+        assert similarity("abcd", "abcx") == 0.75
+        assert similarity("", "") == 1.0
+
+    def test_trigrams_padded(self):
+        """Test that trigrams include the word boundaries"""
+        assert trigrams("ab") == {"$ab", "ab$"}
@@ -0,0 +1,138 @@
+"""
+Tests for git-index-backed listing and change detection
+"""
+
+import git
+import pytest
+
+from moatless_mcp.adapters.git_index import GitFileIndex
+from moatless_mcp.adapters.workspace import WorkspaceAdapter
+from moatless_mcp.utils.config import Config
+from moatless_mcp.vector.embeddings import EmbeddingResult
+from moatless_mcp.vector.manager import VectorManager
+
+
+SOURCE = '''def compute_total(values):
+    """Add up all values"""
+    return sum(value for value in values)
+'''
+
+
+def write(root, rel, text=SOURCE):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Create a git repository with one commit"""
+    repository = git.Repo.init(tmp_path)
+    with repository.config_writer() as writer:
+        writer.set_value("user", "name", "Test")
+        writer.set_value("user", "email", "test@example.com")
+
+    write(tmp_path, ".gitignore", "*.log\n.vector_cache/\n")
+    for rel in ("src/app.py", "src/util.py", "README.md"):
+        write(tmp_path, rel)
+    repository.index.add([".gitignore", "src/app.py", "src/util.py", "README.md"])
+    repository.index.commit("initial")
+    return repository
+
+
+class FakeEmbeddings:
+    """Embedding provider returning constant vectors"""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed_texts_batch(self, texts, task="retrieval.passage"):
+        self.texts.extend(texts)
+        return EmbeddingResult(embeddings=[[1.0] * 1024 for _ in texts], model="fake", usage={})
+
+
+class TestGitFileIndex:
+    """Tests for GitFileIndex"""
+
+    def test_list_files(self, repo):
+        """Test that listings include untracked files but not ignored or deleted ones"""
+        index = GitFileIndex(repo)
+        write(index.root, "new.py")
+        write(index.root, "debug.log")
+        (index.root / "src" / "util.py").unlink()
+
+        assert sorted(index.list_files()) == [".gitignore", "README.md", "new.py", "src/app.py"]
+        assert index.list_files("src") == ["src/app.py"]
+
+    def test_changed_since(self, repo):
+        """Test that modified, added, deleted and untracked files are reported"""
+        index = GitFileIndex(repo)
+        base = index.head_commit()
+        write(index.root, "src/app.py", "x = 2\n")
+        (index.root / "README.md").unlink()
+        write(index.root, "src/new.py")
+        write(index.root, "debug.log")
+
+        changes = index.changed_since(base)
+
+        assert changes.modified == ["src/app.py"]
+        assert changes.deleted == ["README.md"]
+        assert changes.added == ["src/new.py"]
+        assert changes.changed == {"src/app.py", "src/new.py"}
+
+    def test_unknown_commit(self, repo):
+        """Test that an unknown base commit raises ValueError"""
+        with pytest.raises(ValueError):
+            GitFileIndex(repo).changed_since("0" * 40)
+
+    def test_workspace_lists_through_git(self, repo):
+        """Test that workspace scans use the git index and the file policy"""
+        adapter = WorkspaceAdapter(repo.working_tree_dir, Config(allowed_file_extensions={".py"}))
+        write(adapter.workspace_path, "debug.log")
+        write(adapter.workspace_path, "node_modules/pkg/index.py")
+
+        files = sorted(adapter.get_file_context().iter_files("", recursive=True))
+
+        assert adapter.git_index is not None
+        assert files == [".gitignore", "src/app.py", "src/util.py"]
+
+    def test_vector_index_updates_incrementally(self, repo, tmp_path):
+        """Test that a second build only re-embeds changed files"""
+        manager = VectorManager(repo.working_tree_dir, Config())
+        manager.embedding_provider = FakeEmbeddings()
+        index = GitFileIndex(repo)
+
+        first = manager.build_index(["src/*.py"], git_index=index)
+        assert first["success"], first
+        assert manager.vector_index.state["commit"] == index.head_commit()
+
+        write(tmp_path, "src/app.py", SOURCE.replace("compute_total", "compute_changed"))
+        (tmp_path / "src" / "util.py").unlink()
+        manager.embedding_provider.texts = []
+
+        second = manager.build_index(["src/*.py"], git_index=index)
+
+        assert second["incremental"]
+        assert second["updated_files"] == ["src/app.py", "src/util.py"]
+        assert {c.file_path for c in manager.vector_index.chunks} == {"src/app.py"}
+        assert all("compute_changed" in text for text in manager.embedding_provider.texts)
+
+        third = manager.build_index(["src/*.py"], git_index=index)
+
+        assert third["updated_files"] == []
+
+    def test_failed_update_keeps_index(self, repo, tmp_path, monkeypatch):
+        """Test that a failed incremental update leaves the previous chunks in place"""
+        manager = VectorManager(repo.working_tree_dir, Config())
+        manager.embedding_provider = FakeEmbeddings()
+        index = GitFileIndex(repo)
+        assert manager.build_index(["src/*.py"], git_index=index)["success"]
+        before = sorted(c.file_path for c in manager.vector_index.chunks)
+
+        write(tmp_path, "src/app.py", SOURCE.replace("compute_total", "compute_changed"))
+        monkeypatch.setattr(manager.vector_index, "add_chunks", lambda embeddings, chunks: False)
+
+        result = manager.build_index(["src/*.py"], git_index=index)
+
+        assert not result["success"]
+        assert sorted(c.file_path for c in manager.vector_index.chunks) == before
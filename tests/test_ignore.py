@@ -0,0 +1,86 @@
+"""
+Tests for ignore-file aware workspace scans
+"""
+
+import pytest
+
+from moatless_mcp.adapters.workspace import WorkspaceAdapter
+from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.ignore import IgnoreEngine, parse_ignore_lines
+
+
+def write(root, rel, text="x\n"):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Create a repository with nested ignore files"""
+    write(tmp_path, ".gitignore", "dist/\n*.log\n!keep.log\n/generated.py\n")
+    write(tmp_path, ".git/info/exclude", "scratch/\n")
+    write(tmp_path, ".moatlessignore", "vendor/\n")
+    write(tmp_path, "web/.gitignore", "*.min.js\n")
+    for rel in ("src/app.py", "src/generated.py", "generated.py", "debug.log", "keep.log",
+                "dist/bundle.js", "web/app.js", "web/app.min.js", "scratch/notes.txt",
+                "vendor/lib.py"):
+        write(tmp_path, rel)
+    return tmp_path
+
+
+def scan(root, config=None):
+    adapter = WorkspaceAdapter(str(root), config or Config())
+    return sorted(adapter.get_file_context().iter_files("", recursive=True))
+
+
+class TestIgnoreEngine:
+    """Tests for IgnoreEngine"""
+
+    def test_walk_honours_ignore_files(self, repo):
+        """Test nested .gitignore, negation, info/exclude and .moatlessignore"""
+        files = scan(repo)
+
+        assert files == [
+            ".gitignore", ".moatlessignore", "keep.log",
+            "src/app.py", "src/generated.py", "web/.gitignore", "web/app.js",
+        ]
+
+    def test_gitignore_can_be_disabled(self, repo):
+        """Test that only .moatlessignore applies without respect_gitignore"""
+        files = scan(repo, Config(respect_gitignore=False))
+
+        assert "dist/bundle.js" in files
+        assert "debug.log" in files
+        assert "vendor/lib.py" not in files
+
+    def test_direct_access_not_affected(self, repo):
+        """Test that ignored files can still be read explicitly"""
+        adapter = WorkspaceAdapter(str(repo), Config())
+
+        assert adapter.get_file_context().get_file_content("dist/bundle.js") == "x\n"
+        assert adapter.get_file_context().path_policy.is_ignored(repo / "dist" / "bundle.js")
+
+    def test_grep_skips_ignored(self, repo):
+        """Test that grep does not search ignored files"""
+        adapter = WorkspaceAdapter(str(repo), Config())
+
+        matches = {m["file"] for m in adapter.iter_grep("x", "*.js")}
+
+        assert matches == {"web/app.js"}
+
+    def test_changed_ignore_file_reloaded(self, repo):
+        """Test that edits to ignore files are picked up"""
+        engine = IgnoreEngine(str(repo), refresh_interval=0)
+        assert engine.is_ignored("debug.log", False)
+
+        write(repo, ".gitignore", "dist/\n# nothing else\n")
+        engine.refresh_if_stale()
+
+        assert not engine.is_ignored("debug.log", False)
+
+    def test_last_matching_rule_wins(self):
+        """Test ordering of negated rules"""
+        groups = parse_ignore_lines(["*.txt", "!important.txt", "important.txt"])
+
+        assert [g.negated for g in groups] == [False, True, False]
@@ -0,0 +1,53 @@
+"""
+Tests for the line-offset table
+"""
+
+import pytest
+
+from moatless_mcp.utils import line_index as line_index_module
+from moatless_mcp.utils.line_index import LineIndex
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "bisect"])
+def numpy_mode(request, monkeypatch):
+    if request.param and not line_index_module.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(line_index_module, "NUMPY_AVAILABLE", request.param)
+
+
+class TestLineIndex:
+    """Tests for LineIndex"""
+
+    @pytest.mark.parametrize("content", [
+        "first\nsecond\n\nfourth",
+        "trailing newline\n",
+        "",
+        "naïve café\n→ arrows\nend",
+    ])
+    def test_matches_counting_newlines(self, numpy_mode, content):
+        """Test that every offset maps to the line that counting newlines gives"""
+        index = LineIndex(content)
+        lines = content.split("\n")
+
+        offsets = range(len(content) + 1)
+        expected = [content[:offset].count("\n") + 1 for offset in offsets]
+        assert [index.line_of(offset) for offset in offsets] == expected
+        assert index.lines_of(offsets) == expected
+        assert index.line_count == len(lines)
+        assert [index.line_text(n) for n in range(1, len(lines) + 1)] == lines
+
+    def test_line_bounds(self, numpy_mode):
+        """Test line start and end offsets and lines out of range"""
+        index = LineIndex("ab\ncd\n")
+
+        assert (index.line_start(2), index.line_end(2)) == (3, 5)
+        assert index.line_text(0) == ""
+        assert index.line_text(4) == ""
+
+    @pytest.mark.parametrize("content", ["ab\ncd", "ab\ncd\n", ""])
+    def test_line_start_past_end(self, numpy_mode, content):
+        """Test that lines after the last one start at the end of the content"""
+        index = LineIndex(content)
+
+        assert index.line_start(index.line_count + 1) == len(content)
+        assert index.line_start(index.line_count + 5) == len(content)
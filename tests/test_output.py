@@ -0,0 +1,144 @@
+"""
+Tests for result serialization and response pagination
+"""
+
+import json
+
+import pytest
+
+from moatless_mcp.tools.pagination import FetchPageTool
+from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.cursors import CursorStore
+from moatless_mcp.utils.output import (
+    paginate_texts,
+    render_result_texts,
+    split_into_pages,
+)
+
+
+class TestRenderResultTexts:
+    """Tests for render_result_texts"""
+
+    def test_text_mode_keeps_key_value_blocks(self):
+        """Test that text mode renders one block per property"""
+        config = Config()
+        texts = render_result_texts("done", {"count": 2, "message": "x"}, config)
+
+        assert texts == ["done", "count: 2"]
+
+    def test_structured_mode_serializes_once(self):
+        """Test that structured mode emits a single JSON document"""
+        config = Config(output_mode="structured")
+        texts = render_result_texts("done", {"count": 2, "items": [1, 2]}, config)
+
+        assert len(texts) == 2
+        assert json.loads(texts[1]) == {"count": 2, "items": [1, 2]}
+
+    def test_structured_mode_drops_duplicated_content(self):
+        """Test that long strings already in the message are dropped"""
+        body = "def hello_world():\n    print('Hello, World!')\n" * 3
+        config = Config(output_mode="structured")
+        texts = render_result_texts(
+            f"Code view:\n\n{body}",
+            {"sections": [{"start_line": 1, "content": body}]},
+            config
+        )
+
+        assert json.loads(texts[1]) == {"sections": [{"start_line": 1}]}
+
+
+class TestPagination:
+    """Tests for response pagination"""
+
+    def test_split_prefers_line_breaks(self):
+        """Test that pages are split on newlines"""
+        pages = split_into_pages("aaaa\nbbbb\ncccc", 8)
+
+        assert pages == ["aaaa", "bbbb", "cccc"]
+
+    def test_small_response_untouched(self):
+        """Test that responses within budget are returned as-is"""
+        cursors = CursorStore()
+
+        assert paginate_texts(["short"], 100, cursors) == ["short"]
+        assert len(cursors) == 0
+
+    @pytest.mark.asyncio
+    async def test_fetch_remaining_pages(self, workspace_adapter):
+        """Test that overflow pages can be fetched through fetch_page"""
+        text = "\n".join(f"line {i}" for i in range(100))
+        first = paginate_texts([text], 200, workspace_adapter.cursors)
+        cursor = first[-1].split('cursor="')[1].split('"')[0]
+
+        tool = FetchPageTool(workspace_adapter)
+        collected = [first[0]]
+        while True:
+            result = await tool.execute({"cursor": cursor})
+            assert result.success
+            if "fetch_page" not in result.message:
+                collected.append(result.message)
+                break
+            collected.append(result.message.rsplit("\n\n", 1)[0])
+
+        assert "\n".join(collected) == text
+        assert len(workspace_adapter.cursors) == 0
+
+    @pytest.mark.asyncio
+    async def test_fetched_pages_fit_budget(self, workspace_adapter):
+        """Test that a fetched page with its footer is not paginated again"""
+        text = "\n".join(f"line {i}" for i in range(1000))
+        first = paginate_texts([text], 200, workspace_adapter.cursors)
+        cursor = first[-1].split('cursor="')[1].split('"')[0]
+        assert sum(len(part) for part in first) <= 200
+
+        tool = FetchPageTool(workspace_adapter)
+        remaining = len(workspace_adapter.cursors)
+        while remaining:
+            result = await tool.execute({"cursor": cursor})
+            assert paginate_texts([result.message], 200, workspace_adapter.cursors) == [result.message]
+            remaining = len(workspace_adapter.cursors)
+
+    @pytest.mark.asyncio
+    async def test_unknown_cursor(self, workspace_adapter):
+        """Test fetching with an unknown cursor"""
+        result = await FetchPageTool(workspace_adapter).execute({"cursor": "missing"})
+
+        assert not result.success
+        assert "Unknown or expired cursor" in result.message
+
+
+class TestCursorStore:
+    """Tests for CursorStore"""
+
+    def test_expired_cursors_are_evicted(self):
+        """Test TTL eviction closes the stored value"""
+        closed = []
+
+        class Resource:
+            def close(self):
+                closed.append(True)
+
+        cursors = CursorStore(ttl=0)
+        token = cursors.put("test", Resource())
+
+        assert cursors.get(token) is None
+        assert closed == [True]
+
+    def test_kind_mismatch(self):
+        """Test that cursors are only returned for their own kind"""
+        cursors = CursorStore()
+        token = cursors.put("grep", [1])
+
+        assert cursors.get(token, "list_files") is None
+        assert cursors.get(token, "grep") == [1]
+
+    def test_max_entries(self):
+        """Test that the least recently used cursor is evicted first"""
+        cursors = CursorStore(max_entries=2)
+        first = cursors.put("test", 1)
+        second = cursors.put("test", 2)
+        cursors.get(first)
+        cursors.put("test", 3)
+
+        assert cursors.get(first) == 1
+        assert cursors.get(second) is None
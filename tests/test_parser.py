@@ -0,0 +1,327 @@
+"""
+Tests for tree-sitter code extraction
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from moatless_mcp.treesitter import CodeParser, get_code_parser, get_parser_for_language, is_tree_sitter_available
+from moatless_mcp.treesitter.extraction import get_definition_query
+from moatless_mcp.treesitter.languages import LANGUAGE_EXTENSIONS, load_language
+
+pytestmark = pytest.mark.skipif(not is_tree_sitter_available(), reason="tree-sitter not installed")
+
+PYTHON_SOURCE = '''import os
+
+@register
+@retry(times=3)
+async def fetch(url, timeout=10, *args, verbose: bool = False):
+    def helper():
+        pass
+    return url
+
+class Service(Base, mixins.Logged):
+    @staticmethod
+    def create(config):
+        pass
+
+    class Options:
+        def validate(self):
+            pass
+
+    if os.name == "nt":
+        def close(self):
+            pass
+'''
+
+
+@pytest.fixture
+def parser():
+    return CodeParser()
+
+
+class TestParserPool:
+    """Tests for the per-thread parser pool"""
+
+    def test_parser_reused_within_thread(self):
+        """Test that a thread gets the same parser for a language on every call"""
+        parser = get_parser_for_language("python")
+
+        assert parser is get_parser_for_language("python")
+        assert parser is not get_parser_for_language("java")
+        assert get_parser_for_language("cobol") is None
+        assert load_language("python") is load_language("python")
+
+    def test_parser_per_thread(self):
+        """Test that threads do not share parsers"""
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            other = pool.submit(get_parser_for_language, "python").result()
+
+        assert other is not None
+        assert other is not get_parser_for_language("python")
+
+    def test_concurrent_parsing(self):
+        """Test that the shared CodeParser gives correct results from a thread pool"""
+        code_parser = get_code_parser()
+        sources = [f"class Model{i}:\n    def method_{i}(self):\n        pass\n" for i in range(200)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda source: code_parser.parse_file("model.py", source), sources))
+
+        assert code_parser is get_code_parser()
+        assert [r.classes[0].name for r in results] == [f"Model{i}" for i in range(200)]
+        assert [r.classes[0].methods[0].name for r in results] == [f"method_{i}" for i in range(200)]
+
+
+class TestPythonExtraction:
+    """Tests for Python definitions"""
+
+    def test_structure(self, parser):
+        """Test that methods attach to the innermost class and local functions are skipped"""
+        result = parser.parse_file("service.py", PYTHON_SOURCE)
+
+        assert result.success
+        assert [f.name for f in result.functions] == ["fetch"]
+        assert [c.name for c in result.classes] == ["Service", "Options"]
+        service, options = result.classes
+        assert [m.name for m in service.methods] == ["create", "close"]
+        assert [m.name for m in options.methods] == ["validate"]
+        assert options.parent is service
+
+    def test_function_details(self, parser):
+        """Test parameters, decorators and async detection from query captures"""
+        fetch = parser.find_functions("service.py", "fetch", PYTHON_SOURCE)[0]
+
+        assert fetch.parameters == ["url", "timeout", "verbose"]
+        assert fetch.decorators == ["@register", "@retry(times=3)"]
+        assert fetch.is_async
+        assert (fetch.start_line, fetch.end_line) == (5, 8)
+        assert fetch.text.startswith("async def fetch(")
+
+    def test_class_details(self, parser):
+        """Test base classes and static methods"""
+        service = parser.find_classes("service.py", "Service", PYTHON_SOURCE)[0]
+
+        assert service.base_classes == ["Base", "mixins.Logged"]
+        assert service.methods[0].is_static
+
+    def test_text_decoded_from_shared_source(self, parser):
+        """Test that blocks decode whole lines from one shared buffer, including non-ASCII text"""
+        source = 'x = "café"\nclass Menu:\n    def crème(self):  # brûlée\n        return "ü"\n'
+
+        result = parser.parse_file("menu.py", source)
+
+        menu = result.classes[0]
+        method = menu.methods[0]
+        assert menu.source is method.source
+        assert method.text == '    def crème(self):  # brûlée\n        return "ü"'
+        assert menu.text == source[len('x = "café"\n'):-1]
+        assert method.first_line == "    def crème(self):  # brûlée"
+
+    def test_query_cached(self):
+        """Test that each language's query is compiled once"""
+        assert get_definition_query("python") is get_definition_query("python")
+        assert get_definition_query("cobol") is None
+
+    def test_every_language_has_query(self):
+        """Test that every language with registered extensions has a definition query"""
+        for language in LANGUAGE_EXTENSIONS:
+            assert get_definition_query(language) is not None, language
+
+
+class TestJavaScriptExtraction:
+    """Tests for JavaScript and TypeScript definitions"""
+
+    def test_javascript(self, parser):
+        """Test classes, methods and functions bound to variables"""
+        source = (
+            "class Cart extends Base {\n"
+            "  add(item, qty = 1) { const log = () => 1; }\n"
+            "}\n"
+            "function total(items) {}\n"
+            "const format = (value) => `${value}`;\n"
+        )
+
+        result = parser.parse_file("cart.js", source)
+
+        assert [c.name for c in result.classes] == ["Cart"]
+        assert [(m.name, m.parameters) for m in result.classes[0].methods] == [("add", ["item", "qty"])]
+        assert [(f.name, f.parameters) for f in result.functions] == [("total", ["items"]), ("format", ["value"])]
+
+    def test_typescript_classes(self, parser):
+        """Test that TypeScript classes named by type identifiers are found"""
+        source = "export class Store<T> {\n  get(key: string, fallback?: T): T { return fallback; }\n}\n"
+
+        result = parser.parse_file("store.ts", source)
+
+        assert [c.name for c in result.classes] == ["Store"]
+        assert result.classes[0].methods[0].parameters == ["key", "fallback"]
+
+
+class TestJavaExtraction:
+    """Tests for Java definitions"""
+
+    def test_classes_and_members(self, parser):
+        """Test nested types, constructors, annotations and static methods"""
+        source = (
+            "@Entity\n"
+            "public class Order extends Base implements Serializable, Comparable<Order> {\n"
+            "    public Order(String id) {}\n"
+            "    @Override\n"
+            "    public static int compare(@NotNull Order a, Order... rest) {\n"
+            "        Runnable r = new Runnable() { public void run() {} };\n"
+            "        return 0;\n"
+            "    }\n"
+            "    interface Listener { void changed(Order order); }\n"
+            "}\n"
+        )
+
+        result = parser.parse_file("Order.java", source)
+
+        order, listener = result.classes
+        assert order.base_classes == ["Base", "Serializable", "Comparable<Order>"]
+        assert order.decorators == ["@Entity"]
+        assert [m.name for m in order.methods] == ["Order", "compare"]
+        compare = order.methods[1]
+        assert compare.parameters == ["a", "rest"]
+        assert compare.decorators == ["@Override"]
+        assert compare.is_static
+        assert listener.parent is order
+        assert [m.name for m in listener.methods] == ["changed"]
+        assert result.functions == []
+
+
+class TestCFamilyExtraction:
+    """Tests for C and C++ definitions"""
+
+    def test_c(self, parser):
+        """Test structs and functions, including pointer returning ones"""
+        source = (
+            "struct point { int x; int y; };\n"
+            "static int clamp(int value, int *limit) { return value; }\n"
+            "char *name(void) { return 0; }\n"
+            "int declared_only(int);\n"
+        )
+
+        result = parser.parse_file("geometry.c", source)
+
+        assert [c.name for c in result.classes] == ["point"]
+        assert [(f.name, f.parameters) for f in result.functions] == [
+            ("clamp", ["value", "limit"]), ("name", [])
+        ]
+        assert result.functions[0].is_static
+
+    def test_cpp(self, parser):
+        """Test that in-class and qualified out-of-class definitions become methods"""
+        source = (
+            "namespace geo {\n"
+            "class Shape : public Base {\n"
+            "public:\n"
+            "    virtual ~Shape();\n"
+            "    static Shape* make(int kind);\n"
+            "    int area() const { return 0; }\n"
+            "};\n"
+            "}\n"
+            "int geo::Shape::perimeter(int scale) { return 0; }\n"
+            "template <typename T> T largest(T a, T b) { return a; }\n"
+        )
+
+        result = parser.parse_file("shape.cpp", source)
+
+        shape = result.classes[0]
+        assert shape.name == "Shape"
+        assert shape.base_classes == ["Base"]
+        assert [m.name for m in shape.methods] == ["~Shape", "make", "area", "perimeter"]
+        assert shape.methods[1].is_static
+        assert shape.methods[3].parent is shape
+        assert [(f.name, f.parameters) for f in result.functions] == [("largest", ["a", "b"])]
+
+
+class TestGoRustExtraction:
+    """Tests for Go and Rust definitions"""
+
+    def test_go(self, parser):
+        """Test that methods attach to their receiver type"""
+        source = (
+            "package main\n"
+            "type Server struct { addr string }\n"
+            "type Handler interface { Serve(w Writer, r *Request) }\n"
+            "func (s *Server) Start(host, port string, opts ...Option) error { return nil }\n"
+            "func (c Client) Call() {}\n"
+            "func main() { run := func() {}; run() }\n"
+        )
+
+        result = parser.parse_file("main.go", source)
+
+        server, handler = result.classes
+        assert [(m.name, m.parameters) for m in server.methods] == [("Start", ["host", "port", "opts"])]
+        assert [m.name for m in handler.methods] == ["Serve"]
+        # Client is declared in another file
+        assert [f.name for f in result.functions] == ["main", "Call"]
+
+    def test_rust(self, parser):
+        """Test that functions in impl blocks attach to the implemented type"""
+        source = (
+            "struct Point { x: i32 }\n"
+            "trait Area { fn area(&self) -> f64; }\n"
+            "impl<T> Point { pub fn new(x: i32) -> Self { fn local() {} Point { x } } }\n"
+            "impl Area for Point { fn area(&self) -> f64 { 0.0 } }\n"
+            "fn main() {}\n"
+        )
+
+        result = parser.parse_file("point.rs", source)
+
+        point, area = result.classes
+        assert [(m.name, m.parameters) for m in point.methods] == [("new", ["x"]), ("area", ["self"])]
+        assert [m.name for m in area.methods] == ["area"]
+        assert [f.name for f in result.functions] == ["main"]
+
+
+class TestOtherLanguages:
+    """Tests for C#, Ruby and PHP definitions"""
+
+    def test_c_sharp(self, parser):
+        """Test classes, attributes and parameters"""
+        source = (
+            "[Serializable]\n"
+            "public class Account : Entity, IAudited {\n"
+            "    public Account() {}\n"
+            "    [Obsolete] public static void Move(int amount, params string[] notes) {}\n"
+            "}\n"
+        )
+
+        account = parser.parse_file("Account.cs", source).classes[0]
+
+        assert account.base_classes == ["Entity", "IAudited"]
+        assert account.decorators == ["[Serializable]"]
+        assert [(m.name, m.parameters) for m in account.methods] == [
+            ("Account", []), ("Move", ["amount", "notes"])
+        ]
+        assert account.methods[1].is_static
+
+    def test_ruby(self, parser):
+        """Test classes, modules and methods"""
+        source = "class Billing::Invoice < Record\n  def total(tax, rate = 1)\n  end\nend\nmodule Helpers\nend\n"
+
+        result = parser.parse_file("invoice.rb", source)
+
+        assert [(c.name, c.base_classes) for c in result.classes] == [("Invoice", ["Record"]), ("Helpers", [])]
+        assert result.classes[0].methods[0].parameters == ["tax", "rate"]
+
+    def test_php(self, parser):
+        """Test classes, interfaces and functions"""
+        source = (
+            "<?php\n"
+            "class Cart extends Base implements Countable {\n"
+            "    public function add(Item $item, $qty = 1) {}\n"
+            "}\n"
+            "function helper() {}\n"
+        )
+
+        result = parser.parse_file("cart.php", source)
+
+        cart = result.classes[0]
+        assert cart.base_classes == ["Base", "Countable"]
+        assert [(m.name, m.parameters) for m in cart.methods] == [("add", ["$item", "$qty"])]
+        assert [f.name for f in result.functions] == ["helper"]
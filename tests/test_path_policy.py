@@ -0,0 +1,89 @@
+"""
+Tests for the compiled path policy
+"""
+
+from pathlib import Path
+
+import pytest
+
+from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.path_policy import PathPolicy, compile_ignore_patterns
+
+
+class TestIgnorePatterns:
+    """Tests for compile_ignore_patterns"""
+
+    @pytest.mark.parametrize("pattern,path,is_dir,expected", [
+        ("*.log", "logs/app.log", False, True),
+        ("*.log", "app.logger", False, False),
+        ("build/", "src/build", True, True),
+        ("build/", "src/build", False, False),
+        ("/dist", "dist", True, True),
+        ("/dist", "pkg/dist", True, False),
+        ("docs/*.md", "a/docs/x.md", False, True),
+        ("docs/*.md", "docs/sub/x.md", False, False),
+        ("**/gen/*.py", "a/b/gen/x.py", False, True),
+        ("vendor/**", "vendor/a/b.go", False, True),
+        ("data[0-9].csv", "data7.csv", False, True),
+    ])
+    def test_matching(self, pattern, path, is_dir, expected):
+        """Test gitignore-style pattern semantics"""
+        matches = compile_ignore_patterns([pattern])
+
+        assert matches(path, is_dir) is expected
+
+    def test_no_patterns(self):
+        """Test that comments and blanks compile to no matcher"""
+        assert compile_ignore_patterns(["", "# comment"]) is None
+
+
+class TestPathPolicy:
+    """Tests for PathPolicy"""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        for rel in ("src/app.py", "src/app.log", "node_modules/pkg/index.js",
+                    "build/out.py", ".hidden/secret.py", "tool.exe"):
+            path = tmp_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+        return tmp_path
+
+    def test_iter_files_prunes_rejected_directories(self, tree):
+        """Test that walks skip forbidden and ignored directories"""
+        policy = PathPolicy.from_config(
+            Config(allow_hidden_files=False, ignore_patterns=["*.log", "/build"]),
+            root=tree
+        )
+
+        files = sorted(str(p.relative_to(tree)) for p in policy.iter_files(tree))
+
+        assert files == ["src/app.py"]
+
+    def test_root_ancestors_allowed(self, tmp_path):
+        """Test that a forbidden name above the root does not hide the workspace"""
+        root = tmp_path / "venv" / "project"
+        (root / "src").mkdir(parents=True)
+        (root / "src" / "main.py").write_text("x")
+        config = Config()
+
+        assert not config.is_file_allowed(root / "src" / "main.py")
+        assert config.path_policy_for(root).is_file_allowed(root / "src" / "main.py")
+
+    def test_directory_verdicts_memoized(self, tree):
+        """Test that directory checks are cached per directory"""
+        policy = PathPolicy.from_config(Config(), root=tree)
+
+        assert policy.is_file_allowed(tree / "src" / "app.py")
+        assert policy._dir_verdicts[str(tree / "src")] is True
+        assert not policy.is_file_allowed(tree / "node_modules" / "pkg" / "index.js")
+        assert policy._dir_verdicts[str(tree / "node_modules" / "pkg")] is False
+
+    def test_config_assignment_rebuilds_policy(self):
+        """Test that changing a policy field invalidates the cached policy"""
+        config = Config()
+        assert config.is_file_allowed(Path(".env"))
+
+        config.allow_hidden_files = False
+
+        assert not config.is_file_allowed(Path(".env"))
@@ -0,0 +1,160 @@
+"""
+Tests for multi-workspace hosting
+"""
+
+import pytest
+import pytest_asyncio
+
+from moatless_mcp import server
+from moatless_mcp.adapters.pool import WorkspacePool
+from moatless_mcp.tools.registry import ToolRegistry
+from moatless_mcp.utils.config import Config
+
+
+@pytest.fixture
+def workspace_root(tmp_path):
+    """Create a root holding three small repositories"""
+    for name in ("alpha", "beta", "gamma"):
+        repo = tmp_path / name
+        repo.mkdir()
+        (repo / "main.py").write_text(f"NAME = '{name}'\n")
+    return tmp_path
+
+
+class TestWorkspacePool:
+    """Tests for WorkspacePool"""
+
+    @pytest.fixture
+    def pool(self, workspace_root):
+        config = Config(workspace_roots=[str(workspace_root)], max_workspaces=2)
+        pool = WorkspacePool(config, ToolRegistry)
+        yield pool
+        pool.close_all()
+
+    def test_opens_relative_to_root(self, pool, workspace_root):
+        """Test that workspaces are resolved under the configured roots"""
+        entry = pool.get("alpha")
+
+        assert entry.path == (workspace_root / "alpha").resolve()
+        assert entry.registry.workspace is entry.adapter
+        assert pool.get(str(workspace_root / "alpha")) is entry
+
+    def test_rejects_outside_roots(self, pool, workspace_root):
+        """Test that paths escaping the roots are refused"""
+        with pytest.raises(PermissionError):
+            pool.get("../")
+        with pytest.raises(FileNotFoundError):
+            pool.get("missing")
+
+    def test_evicts_least_recently_used(self, pool):
+        """Test that opening past capacity closes the oldest workspace"""
+        alpha = pool.get("alpha")
+        alpha.adapter.cursors.put("test", [1])
+        pool.get("beta")
+        pool.get("gamma")
+
+        assert len(pool) == 2
+        assert "alpha" not in [p.rsplit("/", 1)[-1] for p in pool.paths]
+        assert len(alpha.adapter.cursors) == 0
+
+    def test_active_workspace_not_evicted(self, pool):
+        """Test that a workspace with a call in flight survives eviction"""
+        with pool.acquire("alpha") as alpha:
+            pool.get("beta")
+            pool.get("gamma")
+
+            assert str(alpha.path) in pool.paths
+
+    def test_new_workspace_kept_over_capacity(self, pool):
+        """Test that the workspace being opened is not evicted when the others are in use"""
+        with pool.acquire("alpha") as alpha, pool.acquire("beta") as beta:
+            with pool.acquire("gamma") as gamma:
+                assert pool.paths == [str(alpha.path), str(beta.path), str(gamma.path)]
+
+            # Back to capacity once the extra workspace is no longer in use
+            assert pool.paths == [str(alpha.path), str(beta.path)]
+
+    def test_single_workspace_capacity(self, workspace_root):
+        """Test that a pinned workspace at capacity one does not close newly opened ones"""
+        config = Config(workspace_roots=[str(workspace_root)], max_workspaces=1)
+        pool = WorkspacePool(config, ToolRegistry)
+        pinned = pool.open_pinned(str(workspace_root / "alpha"))
+
+        with pool.acquire("beta") as beta:
+            assert pool.paths == [str(pinned.path), str(beta.path)]
+
+        assert pool.paths == [str(pinned.path)]
+        pool.close_all()
+
+    def test_idle_workspaces_closed(self, workspace_root):
+        """Test idle TTL eviction, sparing pinned workspaces"""
+        config = Config(workspace_roots=[str(workspace_root)], workspace_idle_ttl=1)
+        pool = WorkspacePool(config, ToolRegistry)
+        pinned = pool.open_pinned(str(workspace_root / "alpha"))
+        beta = pool.get("beta")
+        beta.last_used -= 10
+        pinned.last_used -= 10
+
+        assert pool.evict_idle() == [str(beta.path)]
+        assert pool.paths == [str(pinned.path)]
+
+
+class TestFileCacheBudget:
+    """Tests for the per-workspace file content cache"""
+
+    def test_cache_stays_within_budget(self, workspace_root):
+        """Test that least recently read files are dropped first"""
+        config = Config(workspace_roots=[str(workspace_root)], file_cache_bytes=40)
+        pool = WorkspacePool(config, ToolRegistry)
+        file_context = pool.get("alpha").adapter.get_file_context()
+        (workspace_root / "alpha" / "other.py").write_text("x = 1\n" * 3)
+        (workspace_root / "alpha" / "third.py").write_text("y = 2\n" * 2)
+
+        file_context.get_file_content("main.py")
+        file_context.get_file_content("other.py")
+        file_context.get_file_content("main.py")
+        file_context.get_file_content("third.py")
+
+        assert file_context.cache_bytes <= 40
+        assert list(file_context._file_cache) == ["main.py", "third.py"]
+
+    def test_cache_refreshed_after_change(self, file_context, temp_workspace):
+        """Test that a modified file is re-read"""
+        assert "Utility" in file_context.get_file_content("src/utils.py")
+
+        (temp_workspace / "src" / "utils.py").write_text("changed = True\n")
+
+        assert file_context.get_file_content("src/utils.py") == "changed = True\n"
+
+
+class TestServerWorkspaceSelection:
+    """Tests for choosing a workspace per tool call"""
+
+    @pytest_asyncio.fixture
+    async def hosted(self, workspace_root):
+        config = Config(workspace_roots=[str(workspace_root)])
+        await server.init_server(str(workspace_root / "alpha"), config)
+        yield
+        server.workspace_pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_workspace_argument(self, hosted):
+        """Test that the workspace argument routes the call and is advertised"""
+        default = await server.handle_call_tool("read_file", {"file_path": "main.py"})
+        other = await server.handle_call_tool(
+            "read_file", {"file_path": "main.py", "workspace": "beta"}
+        )
+        tools = await server.handle_list_tools()
+
+        assert "'alpha'" in default[0].text
+        assert "'beta'" in other[0].text
+        assert all("workspace" in tool.inputSchema["properties"] for tool in tools)
+
+    @pytest.mark.asyncio
+    async def test_workspace_outside_roots(self, hosted):
+        """Test that disallowed workspaces produce an error result"""
+        result = await server.handle_call_tool(
+            "read_file", {"file_path": "main.py", "workspace": "/"}
+        )
+
+        assert "outside the allowed roots" in result[0].text
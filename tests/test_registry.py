@@ -0,0 +1,85 @@
+"""
+Tests for the tool registry
+"""
+
+import pytest
+
+from moatless_mcp.tools import registry as registry_module
+from moatless_mcp.tools.registry import ToolRegistry
+from moatless_mcp.tools.search_tools import WorkspaceInfoTool
+
+
+class RenamedInfoTool(WorkspaceInfoTool):
+    """Workspace info tool registered under another name"""
+
+    @property
+    def name(self) -> str:
+        return "workspace_info_copy"
+
+
+class FakeEntryPoint:
+    """Entry point whose factory is given directly"""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+
+    def load(self):
+        return self._factory
+
+
+class TestToolRegistry:
+    """Tests for ToolRegistry"""
+
+    @pytest.fixture
+    def registry(self, workspace_adapter):
+        return ToolRegistry(workspace_adapter)
+
+    def test_get_tools_is_cached(self, registry):
+        """Test that repeated listings reuse the same Tool objects"""
+        first = registry.get_tools()
+        second = registry.get_tools()
+
+        assert len(first) == len(registry.tools)
+        assert all(a is b for a, b in zip(first, second))
+
+    def test_register_tool_rebuilds_list(self, registry, workspace_adapter):
+        """Test that registering a tool refreshes the cached list"""
+        before = registry.get_tools()
+        registry.register_tool(RenamedInfoTool(workspace_adapter))
+        after = registry.get_tools()
+
+        assert len(after) == len(before) + 1
+        assert "workspace_info_copy" in [tool.name for tool in after]
+
+    def test_change_listener_notified_once_per_batch(self, registry, workspace_adapter):
+        """Test that listeners fire once for a batch registration"""
+        calls = []
+        registry.add_change_listener(lambda: calls.append(True))
+
+        registry.register_tools([
+            RenamedInfoTool(workspace_adapter),
+            WorkspaceInfoTool(workspace_adapter),
+        ])
+
+        assert len(calls) == 1
+
+    def test_load_plugins_without_entry_points(self, registry):
+        """Test that loading plugins with no installed plugins is a no-op"""
+        calls = []
+        registry.add_change_listener(lambda: calls.append(True))
+
+        assert registry.load_plugins(group="moatless_mcp.tests.none") == []
+        assert calls == []
+
+    def test_bad_plugins_skipped(self, registry, monkeypatch):
+        """Test that plugins returning something other than tools are skipped"""
+        plugins = [
+            FakeEntryPoint("not_iterable", lambda workspace: 42),
+            FakeEntryPoint("not_tools", lambda workspace: ["tool"]),
+            FakeEntryPoint("good", RenamedInfoTool),
+        ]
+        monkeypatch.setattr(registry_module, "entry_points", lambda group: plugins)
+
+        assert registry.load_plugins() == ["workspace_info_copy"]
+        assert "workspace_info_copy" in registry.tools
@@ -79,6 +79,38 @@ class TestGrepTool:
         if result.properties["match_count"] == 5:
             assert result.properties["truncated"] is True
     
+    @pytest.mark.asyncio
+    async def test_cursor_resumes_scan(self, tool):
+        """Test paging through matches with a cursor"""
+        first = await tool.execute({"pattern": "def", "max_results": 2})
+        
+        assert first.properties["truncated"] is True
+        cursor = first.properties["next_cursor"]
+        
+        seen = first.properties["match_count"]
+        while cursor:
+            page = await tool.execute({"pattern": "def", "max_results": 2, "cursor": cursor})
+            assert page.success
+            assert page.properties["offset"] == seen
+            seen += page.properties["match_count"]
+            cursor = page.properties.get("next_cursor")
+        
+        full = await tool.execute({"pattern": "def", "max_results": 1000})
+        assert seen == full.properties["match_count"]
+    
+    @pytest.mark.asyncio
+    async def test_cursor_for_other_pattern_rejected(self, tool):
+        """Test that a cursor cannot be reused for a different query"""
+        first = await tool.execute({"pattern": "def", "max_results": 1})
+        
+        result = await tool.execute({
+            "pattern": "class",
+            "cursor": first.properties["next_cursor"]
+        })
+        
+        assert not result.success
+        assert "cursor" in result.message
+    
     @pytest.mark.asyncio
     async def test_no_matches_found(self, tool):
         """Test when no matches are found"""
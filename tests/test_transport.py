@@ -0,0 +1,225 @@
+"""
+Tests for the HTTP transports and workspace locking
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from moatless_mcp.tools.base import ToolResult
+from moatless_mcp.tools.file_operations import ReadFileTool, WriteFileTool
+from moatless_mcp.tools.registry import ToolRegistry
+from moatless_mcp.tools.vector_tools import BuildVectorIndexTool
+from moatless_mcp.transport import ConnectionLimitMiddleware
+from moatless_mcp.utils.locks import AsyncRWLock
+
+
+class TestAsyncRWLock:
+    """Tests for AsyncRWLock"""
+
+    @pytest.mark.asyncio
+    async def test_readers_share_lock(self):
+        """Test that several readers hold the lock at once"""
+        lock = AsyncRWLock()
+
+        async with lock.read():
+            async with lock.read():
+                assert lock.readers == 2
+
+    @pytest.mark.asyncio
+    async def test_writer_waits_for_readers(self):
+        """Test that a writer only runs once readers are done"""
+        lock = AsyncRWLock()
+        events = []
+
+        async def writer():
+            async with lock.write():
+                events.append("write")
+
+        async with lock.read():
+            task = asyncio.create_task(writer())
+            await asyncio.sleep(0)
+            events.append("read")
+        await task
+
+        assert events == ["read", "write"]
+
+    @pytest.mark.asyncio
+    async def test_waiting_writer_blocks_new_readers(self):
+        """Test that readers arriving after a writer wait for it"""
+        lock = AsyncRWLock()
+        events = []
+
+        async def writer():
+            async with lock.write():
+                events.append("write")
+
+        async def reader():
+            async with lock.read():
+                events.append("late read")
+
+        async with lock.read():
+            tasks = [asyncio.create_task(writer())]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(reader()))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        assert events == ["write", "late read"]
+
+
+class TestRegistryLocking:
+    """Tests for workspace locking around tool execution"""
+
+    def test_mutating_tools_flagged(self, workspace_adapter):
+        """Test that write tools take the exclusive lock"""
+        assert WriteFileTool(workspace_adapter).mutates_workspace
+        assert not ReadFileTool(workspace_adapter).mutates_workspace
+
+    @pytest.mark.asyncio
+    async def test_write_holds_exclusive_lock(self, workspace_adapter):
+        """Test that a mutating tool runs while the workspace is write-locked"""
+        registry = ToolRegistry(workspace_adapter)
+        observed = []
+
+        class ProbeTool(WriteFileTool):
+            async def execute(self, arguments):
+                observed.append(self.workspace.lock.locked_for_write)
+                return await super().execute(arguments)
+
+        registry.register_tool(ProbeTool(workspace_adapter))
+        result = await registry.execute_tool("write_file", {"file_path": "new.txt", "content": "x"})
+
+        assert result.success
+        assert observed == [True]
+        assert not workspace_adapter.lock.locked_for_write
+
+    @pytest.mark.asyncio
+    async def test_index_build_locks_only_swap(self, workspace_adapter):
+        """Test that build_vector_index holds the write lock only around its final swap"""
+        registry = ToolRegistry(workspace_adapter)
+        lock = workspace_adapter.lock
+        observed = []
+
+        class ProbeTool(BuildVectorIndexTool):
+            async def execute(self, arguments):
+                observed.append(("build", lock.locked_for_write, lock.readers))
+                exclusive = self._exclusive_runner()
+                swap = lambda: observed.append(("swap", lock.locked_for_write))
+                await asyncio.to_thread(exclusive, swap)
+                return ToolResult(message="built")
+
+        registry.register_tool(ProbeTool(workspace_adapter))
+        result = await registry.execute_tool("build_vector_index", {})
+
+        assert result.success
+        assert observed == [("build", False, 0), ("swap", True)]
+        assert not lock.locked_for_write
+
+
+class TestConnectionLimit:
+    """Tests for ConnectionLimitMiddleware"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_over_limit(self):
+        """Test that requests beyond the limit get a 503"""
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        limited = ConnectionLimitMiddleware(app, max_connections=1)
+        transport = httpx.ASGITransport(app=limited)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/mcp"))
+            while not limited.active:
+                await asyncio.sleep(0)
+
+            rejected = await client.get("/mcp")
+            release.set()
+            accepted = await first
+
+        assert rejected.status_code == 503
+        assert accepted.status_code == 200
+        assert limited.active == 0
+
+    @pytest.mark.asyncio
+    async def test_streamable_sessions_counted(self):
+        """Test that established sessions hold slots until deleted and fake ids gain nothing"""
+        async def app(scope, receive, send):
+            headers = []
+            if scope["method"] == "POST" and not any(name == b"mcp-session-id" for name, _ in scope["headers"]):
+                headers.append((b"mcp-session-id", b"a" * 32))
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        limited = ConnectionLimitMiddleware(app, max_connections=1)
+        transport = httpx.ASGITransport(app=limited)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            initialized = await client.post("/mcp", json={})
+            session = {"mcp-session-id": initialized.headers["mcp-session-id"]}
+
+            in_session = await client.post("/mcp", json={}, headers=session)
+            new_session = await client.post("/mcp", json={})
+            made_up = await client.post("/mcp", json={}, headers={"mcp-session-id": "made-up"})
+            made_up_sse = await client.post("/messages/?session_id=abc", json={})
+            assert limited.active == 1
+
+            deleted = await client.delete("/mcp", headers=session)
+            after_delete = await client.post("/mcp", json={})
+
+        assert (initialized.status_code, in_session.status_code, deleted.status_code) == (200, 200, 200)
+        assert (new_session.status_code, made_up.status_code, made_up_sse.status_code) == (503, 503, 503)
+        assert after_delete.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_sse_session_counted_while_streaming(self):
+        """Test that an SSE session holds a slot while its stream is open"""
+        release = asyncio.Event()
+        session_id = "b" * 32
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            if scope["method"] == "GET":
+                endpoint = f"event: endpoint\ndata: /messages/?session_id={session_id}\n\n"
+                await send({"type": "http.response.body", "body": endpoint.encode(), "more_body": True})
+                await release.wait()
+            await send({"type": "http.response.body", "body": b""})
+
+        limited = ConnectionLimitMiddleware(app, max_connections=1)
+        transport = httpx.ASGITransport(app=limited)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            stream = asyncio.create_task(client.get("/sse"))
+            while not limited.sessions:
+                await asyncio.sleep(0)
+
+            message = await client.post(f"/messages/?session_id={session_id}", json={})
+            new_session = await client.get("/sse")
+            release.set()
+            await stream
+
+        assert message.status_code == 200
+        assert new_session.status_code == 503
+        assert limited.active == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_sessions_expire(self):
+        """Test that sessions without requests stop counting after the idle timeout"""
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"mcp-session-id", b"c" * 32)]})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        limited = ConnectionLimitMiddleware(app, max_connections=1, session_idle_timeout=0)
+        transport = httpx.ASGITransport(app=limited)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/mcp", json={})
+            second = await client.post("/mcp", json={"other": True})
+
+        assert (first.status_code, second.status_code) == (200, 200)
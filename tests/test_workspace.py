@@ -7,6 +7,7 @@ from pathlib import Path
 
 from moatless_mcp.adapters.workspace import WorkspaceAdapter, FileContext
 from moatless_mcp.utils.config import Config
+from moatless_mcp.utils.globbing import compile_glob
 
 
 class TestFileContext:
@@ -124,6 +125,48 @@ class TestWorkspaceAdapter:
         
         assert len(files) == 0
     
+    @pytest.mark.asyncio
+    async def test_search_files_lists_only_prefix(self, workspace_adapter, monkeypatch):
+        """Test that a pattern's literal directories limit the listed subtree"""
+        listed = []
+        original = workspace_adapter.file_context.iter_relative_files
+        
+        def spy(directory="", recursive=True):
+            listed.append((directory, recursive))
+            return original(directory, recursive)
+        
+        monkeypatch.setattr(workspace_adapter.file_context, "iter_relative_files", spy)
+        
+        assert workspace_adapter.search_files("src/**/*.py") == ["src/main.py", "src/utils.py"]
+        assert workspace_adapter.search_files("src/*.py") == ["src/main.py", "src/utils.py"]
+        assert listed == [("src", True), ("src", False)]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("pattern", ["../*.txt", "sub/../../*.txt", "src/../../**/*.txt"])
+    async def test_search_files_outside_workspace(self, workspace_adapter, temp_workspace, pattern):
+        """Test that patterns leading out of the workspace match nothing"""
+        (temp_workspace / "sub").mkdir()
+        (temp_workspace.parent / f"{temp_workspace.name}-secret.txt").write_text("secret\n")
+        
+        try:
+            assert workspace_adapter.search_files(pattern) == []
+        finally:
+            (temp_workspace.parent / f"{temp_workspace.name}-secret.txt").unlink()
+    
+    @pytest.mark.asyncio
+    async def test_search_files_after_cached_tree(self, workspace_adapter, temp_workspace):
+        """Test that searches see files created outside the tools after a tree listing"""
+        file_context = workspace_adapter.file_context
+        file_context.file_tree()
+        file_context.write_file_content("src/api/routes.py", "routes = []\n")
+        (temp_workspace / "src" / "created.py").write_text("created = True\n")
+        
+        files = workspace_adapter.search_files("{src,tests}/**/*.{py,json}")
+        
+        assert "src/api/routes.py" in files
+        assert "src/created.py" in files
+        assert "tests/test_main.py" in files
+    
     @pytest.mark.asyncio
     async def test_grep_files(self, workspace_adapter):
         """Test grep functionality"""
@@ -189,4 +232,23 @@ class TestConfig:
         
         assert config.get_language_for_file(Path("test.py")) == "python"
         assert config.get_language_for_file(Path("Test.java")) == "java"
-        assert config.get_language_for_file(Path("test.txt")) is None
\ No newline at end of file
+        assert config.get_language_for_file(Path("test.txt")) is None
+
+
+class TestCompileGlob:
+    """Tests for compile_glob"""
+    
+    @pytest.mark.parametrize("pattern,prefix,recursive,matches,rejects", [
+        ("*.py", "", True, ["main.py", "src/a/main.py"], ["main.pyc"]),
+        ("src/**/*.py", "src", True, ["src/main.py", "src/a/b/c.py"], ["lib/src/main.py"]),
+        ("src/api/*.py", "src/api", False, ["src/api/views.py"], ["src/api/v1/views.py"]),
+        ("src/{api,web}/*.py", "src", True, ["src/web/app.py"], ["src/cli/app.py"]),
+        ("./docs/index.md", "docs", False, ["docs/index.md"], ["docs/index.mdx"]),
+    ])
+    def test_prefix_and_matching(self, pattern, prefix, recursive, matches, rejects):
+        """Test literal prefix extraction and segment-aware matching"""
+        glob = compile_glob(pattern)
+        
+        assert (glob.prefix, glob.recursive) == (prefix, recursive)
+        assert all(glob.match(path) for path in matches)
+        assert not any(glob.match(path) for path in rejects)